@@ -0,0 +1,114 @@
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import contains_eager
+from models import db, User, Role, Course
+
+MAX_PER_PAGE = 100
+
+
+class KeysetPage:
+    """Página de una lista paginada por clave, sin OFFSET ni COUNT; los cursores son ids."""
+
+    def __init__(self, items, has_prev, has_next):
+        self.items = items
+        self.has_prev = has_prev and bool(items)
+        self.has_next = has_next and bool(items)
+
+    @property
+    def prev_before(self):
+        """Id a usar como `before` para la página anterior."""
+        return self.items[0].id if self.has_prev else None
+
+    @property
+    def next_after(self):
+        """Id a usar como `after` para la página siguiente."""
+        return self.items[-1].id if self.has_next else None
+
+    def __iter__(self):
+        return iter(self.items)
+
+
+def keyset_paginate(query, column, after=None, before=None, per_page=50, order_column=None):
+    """Pagina `query` por `column` leyendo como máximo `per_page + 1` filas.
+
+    Con `after` devuelve las filas siguientes a ese valor; con `before`, las anteriores (en
+    orden ascendente). La fila extra solo indica si hay más páginas en esa dirección.
+
+    Con `order_column` se ordena por `(order_column, column)`: así un filtro por rango sobre
+    `order_column` recorre solo su tramo del índice `(order_column, id)` en lugar de ordenar
+    todas las coincidencias. Los cursores siguen siendo valores de `column`; el de
+    `order_column` se lee de esa fila (una consulta por clave primaria).
+    """
+    per_page = max(1, min(per_page, MAX_PER_PAGE))
+
+    def past(value, descending=False):
+        """Condición "después de la fila `value`" en el orden de la página, o None."""
+        if order_column is None:
+            return column < value if descending else column > value
+        order_value = db.session.query(order_column).filter(column == value).scalar()
+        if order_value is None:
+            # La fila del cursor ya no existe: se vuelve al principio de la lista
+            return None
+        # Desarrollado en lugar de (order_column, column) > (...): con la comparación de tuplas
+        # SQLite limita el rango del índice por el filtro de prefijo y no por el cursor
+        if descending:
+            return or_(order_column < order_value, and_(order_column == order_value, column < value))
+        return or_(order_column > order_value, and_(order_column == order_value, column > value))
+
+    def ordered(descending=False):
+        columns = [column] if order_column is None else [order_column, column]
+        return [c.desc() for c in columns] if descending else columns
+
+    before_filter = past(before, descending=True) if before is not None else None
+    if before_filter is not None:
+        rows = query.filter(before_filter).order_by(*ordered(descending=True)).limit(per_page + 1).all()
+        return KeysetPage(rows[:per_page][::-1], has_prev=len(rows) > per_page, has_next=True)
+
+    after_filter = past(after) if after else None
+    if after_filter is not None:
+        query = query.filter(after_filter)
+    rows = query.order_by(*ordered()).limit(per_page + 1).all()
+    return KeysetPage(rows[:per_page], has_prev=after_filter is not None, has_next=len(rows) > per_page)
+
+
+def _prefix_filter(column, prefix):
+    # Rango en lugar de LIKE para que SQLite use el índice de la columna (distingue mayúsculas)
+    return (column >= prefix) & (column < prefix + '\uffff')
+
+
+def users_page(after=None, before=None, per_page=50, role=None, prefix=None):
+    """Usuarios con su rol (un JOIN), filtrados por rol y por prefijo del usuario.
+
+    Si el prefijo contiene '@' se busca por correo. Sin prefijo la lista va por id; con prefijo,
+    por usuario (o correo) e id, para recorrer solo el tramo del prefijo en el índice.
+    """
+    query = User.query.join(User.role).options(contains_eager(User.role))
+    if role:
+        query = query.filter(Role.name == role)
+    order_column = None
+    if prefix:
+        order_column = User.email if '@' in prefix else User.username
+        query = query.filter(_prefix_filter(order_column, prefix))
+    return keyset_paginate(query, User.id, after, before, per_page, order_column)
+
+
+def courses_page(after=None, before=None, per_page=50, prefix=None):
+    """Cursos con su instructor (un JOIN), filtrados por prefijo del nombre (ordenados por nombre e id)."""
+    query = Course.query.join(Course.instructor).options(contains_eager(Course.instructor))
+    order_column = None
+    if prefix:
+        order_column = Course.name
+        query = query.filter(_prefix_filter(Course.name, prefix))
+    return keyset_paginate(query, Course.id, after, before, per_page, order_column)
+
+
+def user_to_dict(user):
+    return {'id': user.id, 'username': user.username, 'email': user.email, 'role': user.role.name}
+
+
+def course_to_dict(course):
+    return {
+        'id': course.id,
+        'name': course.name,
+        'description': course.description,
+        'instructor': {'id': course.instructor.id, 'username': course.instructor.username},
+    }
@@ -1,27 +1,115 @@
-from flask import Flask, render_template, redirect, url_for, request, flash, abort, send_from_directory
+from flask import Flask, Blueprint, current_app, render_template, redirect, url_for, request, flash, abort, \
+    send_from_directory, jsonify, Response, stream_template, stream_with_context
 from flask_bcrypt import Bcrypt
 from flask_login import LoginManager, login_user, login_required, logout_user, current_user
 from flask_migrate import Migrate
 from flask_wtf.csrf import CSRFProtect
+from werkzeug.security import safe_join
 from werkzeug.utils import secure_filename
 from models import db, User, Role, Course, Module, ContentItem, CourseEnrollment, StudentResponse, QuizQuestion
-from functools import wraps
+from functools import wraps, partial
 from datetime import datetime, timedelta
 import os
 from forms import DeleteUserForm
 from urllib.parse import urlparse, parse_qs
 import json
+import click
 from content_strategies import TextContentStrategy, VideoContentStrategy, FileContentStrategy, QuizContentStrategy
- 
-# Application Configuration
-app = Flask(__name__, template_folder="app/templates", static_folder="app/static")
-app.config.from_object('config.Config')
+from metrics import get_course_metrics
+from progress import reconcile_counters, recompute_progress
+from query_profiles import get_with_profile_or_404
+from instrumentation import PerfInstrumentation
+from catalog_search import search_catalog, rebuild_search_index
+from admin_lists import users_page, courses_page, user_to_dict, course_to_dict
+from reports import completed_modules_report, completed_courses_report, completed_courses_csv
+from user_cache import user_cache, get_role_name
+from quiz_cache import quiz_cache
+from fragment_cache import fragment_cache, create_backend
+from uploads import ChunkedUploadStore, UploadError
+from passwords import PasswordHasher, LoginThrottle, HasherBusy
+from user_import import import_users, BackgroundImports
+from synthetic_data import generate_dataset, SCALES
+from sqlite_profile import configure_engine_options, install_pragmas
+from db_routing import ReplicaRouting, read_only, replicate, REPLICA_BIND
+from cascade_deletes import BackgroundDeletes, delete_courses, delete_module_tree, delete_user_tree, delete_content_item, \
+    course_responses, user_tree_rows
+import io
+import time
+from blob_store import BlobStore
+from media import send_media
+from assets import StaticAssets, build_assets
+
+# Extensiones y servicios: se crean sin aplicación y se inicializan en `create_app`
+bp = Blueprint('main', __name__, cli_group=None)
+bcrypt = Bcrypt()
+login_manager = LoginManager()
+login_manager.login_view = 'main.login'
+migrate = Migrate()
+csrf = CSRFProtect()
+perf = PerfInstrumentation()
+assets = StaticAssets()
+blob_store = BlobStore()
+chunked_uploads = ChunkedUploadStore(blob_store)
+password_hasher = PasswordHasher(bcrypt)
+login_throttle = LoginThrottle()
+replica_routing = ReplicaRouting()
+background_deletes = BackgroundDeletes()
+background_imports = BackgroundImports()
+
+
+def create_app(config='config.Config'):
+    """Crea la aplicación. `config` es un objeto o la ruta de importación de uno.
+
+    Importar este módulo no tiene efectos: la base de datos, las carpetas y los servicios se
+    preparan aquí, y los roles y el usuario admin se crean con `flask seed`.
+    """
+    app = Flask(__name__, template_folder="app/templates", static_folder="app/static")
+    app.config.from_object(config)
+    app.config.setdefault('UPLOAD_FOLDER', os.path.join(app.root_path, 'app/static/uploads'))
+
+    configure_engine_options(app)
+    db.init_app(app)
+    with app.app_context():
+        for engine in db.engines.values():
+            install_pragmas(engine, app.config['SQLITE_PRAGMAS'])
+    replica_routing.init_app(app, db)
+    bcrypt.init_app(app)
+    login_manager.init_app(app)
+    migrate.init_app(app, db)
+    csrf.init_app(app)
+    perf.init_app(app)
+    blob_store.init_app(app)
+    chunked_uploads.init_app(app)
+    password_hasher.init_app(app)
+    login_throttle.init_app(app)
+    background_deletes.init_app(app)
+    background_imports.init_app(app)
+
+    quiz_cache.ttl = app.config.get('QUIZ_CACHE_TTL', 300)
+    user_cache.ttl = app.config.get('USER_CACHE_TTL', 0)
+    fragment_cache.backend = create_backend(
+        app.config['FRAGMENT_CACHE_BACKEND'],
+        app.config['FRAGMENT_CACHE_PATH'] or os.path.join(
+            app.instance_path, 'fragment_cache.sqlite' if app.config['FRAGMENT_CACHE_BACKEND'] == 'sqlite' else 'fragment_cache'
+        ),
+        app.config['FRAGMENT_CACHE_MAX_ENTRIES']
+    )
+
+    # Registrar `enumerate` en el entorno Jinja
+    app.jinja_env.globals.update(enumerate=enumerate)
 
-# Static Upload Folder
-UPLOAD_FOLDER = os.path.join(app.root_path, 'app/static/uploads')
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
-app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024
+    app.register_blueprint(bp)
+    # Después del blueprint: el manifiesto reemplaza la vista `static` de la aplicación
+    assets.init_app(app)
+    return app
+
+def cleanup_deleted(deleted, user_id=None):
+    """Limpia fuera de la base lo eliminado con cascade_deletes, después del commit."""
+    blob_store.release(deleted.file_paths)
+    for quiz_id in deleted.quiz_ids:
+        quiz_cache.invalidate(quiz_id)
+    if user_id is not None:
+        user_cache.invalidate(user_id)
 
 def allowed_file(filename):
     ALLOWED_EXTENSIONS = {'pdf', 'docx', 'txt', 'mp4'}
@@ -29,33 +117,53 @@ def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 # Ruta para servir los archivos subidos
-@app.route('/uploads/<filename>')
+@bp.route('/uploads/<path:filename>')
+@login_required
 def uploaded_file(filename):
-    return send_from_directory(app.config['UPLOAD_FOLDER'], filename)
-
-# Initialize Extensions
-db.init_app(app)
-bcrypt = Bcrypt(app)
-login_manager = LoginManager(app)
-login_manager.login_view = 'login'
-migrate = Migrate(app, db)
-csrf = CSRFProtect(app)
-csrf.init_app(app)
+    path = safe_join(current_app.config['UPLOAD_FOLDER'], filename)
+    if path is None or filename.startswith('.tmp/'):
+        abort(404)
+    if not can_access_upload(filename):
+        abort(403)
+    return send_media(
+        path,
+        blob_store.digest(filename),
+        current_app.config['MEDIA_MAX_AGE'],
+        delivery=current_app.config['MEDIA_DELIVERY'],
+        internal_uri=current_app.config['MEDIA_ACCEL_PREFIX'] + filename,
+        chunk_size=current_app.config['MEDIA_STREAM_CHUNK_SIZE']
+    )
 
-# Registrar `enumerate` en el entorno Jinja
-app.jinja_env.globals.update(enumerate=enumerate)
+@bp.before_app_request
+def protect_uploads():
+    """Los archivos subidos solo se sirven por `uploaded_file`, que comprueba el acceso."""
+    if request.endpoint == 'static' and request.view_args.get('filename', '').startswith('uploads/'):
+        abort(404)
+
+def can_access_upload(file_path):
+    """Admin, instructor del curso o estudiante inscrito en un curso que usa el archivo."""
+    role = get_role_name(current_user.role_id)
+    if role == 'admin':
+        return True
+    query = db.session.query(ContentItem.id).join(Module).filter(ContentItem.file_path == file_path)
+    if role == 'instructor':
+        query = query.join(Course).filter(Course.instructor_id == current_user.id)
+    else:
+        query = query.join(CourseEnrollment, CourseEnrollment.course_id == Module.course_id) \
+            .filter(CourseEnrollment.student_id == current_user.id)
+    return db.session.query(query.exists()).scalar()
 
-# User Loader
+# User Loader (usuario y rol en una sola consulta, con caché TTL opcional)
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    return user_cache.load(int(user_id))
 
 # Role-based Access Control Decorator
 def role_required(role):
     def decorator(f):
         @wraps(f)
         def decorated_function(*args, **kwargs):
-            if not current_user.is_authenticated or current_user.role.name != role:
+            if not current_user.is_authenticated or get_role_name(current_user.role_id) != role:
                 abort(403)
             return f(*args, **kwargs)
         return decorated_function
@@ -81,43 +189,10 @@ class UserService:
             admin_user = User(username=username, email=email, password=password_hash, role=admin_role)
             db.session.add(admin_user)
             db.session.commit()
+            return admin_user
+        return None
 
-# Database Initialization
-with app.app_context():
-    try:
-        db.create_all()  # Create tables if they don't exist
-
-        # Create default roles
-        roles = ['admin', 'instructor', 'student']
-        for role_name in roles:
-            role = Role.query.filter_by(name=role_name).first()
-            if not role:
-                new_role = Role(name=role_name)
-                db.session.add(new_role)
-        db.session.commit()
-
-        # Create default admin user
-        admin_role = Role.query.filter_by(name='admin').first()
-        admin_user = User.query.filter_by(username='admin').first()
-
-        if not admin_user and admin_role:
-            password_hash = bcrypt.generate_password_hash('admin123').decode('utf-8')
-            admin_user = User(username='admin', email='admin@example.com', password=password_hash, role=admin_role)
-            db.session.add(admin_user)
-            db.session.commit()
-            print("Admin user created successfully. Username: 'admin', Password: 'admin123'")
-    except Exception as e:
-        print(f"Error creating database or admin user: {e}")
-        db.session.rollback()
-
-# Routes for Static Files (Fixing BuildError for Static)
-@app.route('/static/<path:filename>')
-def serve_static(filename):
-    return redirect(url_for('static', filename=filename))
-
-from content_strategies import TextContentStrategy, VideoContentStrategy, FileContentStrategy, QuizContentStrategy
-
-@app.route('/content_display')
+@bp.route('/content_display')
 def render_content(content_type):
     # Diccionario de estrategias disponibles
     strategies = {
@@ -136,35 +211,46 @@ def render_content(content_type):
         abort(404)  # Si el tipo de contenido no existe
 
 # Login Route
-@app.route('/', methods=['GET', 'POST'])
+@bp.route('/', methods=['GET', 'POST'])
 def login():
     if request.method == 'POST':
         username = request.form.get('username')
         password = request.form.get('password')
+        if not login_throttle.allow(username, request.remote_addr):
+            flash('Too many login attempts. Please wait a minute and try again.', 'danger')
+            return render_template('login.html'), 429
+
         user = User.query.filter_by(username=username).first()
-        if user and bcrypt.check_password_hash(user.password, password):
+        try:
+            # Con usuario inexistente se verifica contra un hash ficticio (mismo tiempo de respuesta)
+            valid = password_hasher.verify(user.password if user else None, password or '')
+        except HasherBusy:
+            flash('The server is busy. Please try again in a few seconds.', 'danger')
+            return render_template('login.html'), 503
+        if valid:
             login_user(user)
             flash('Login successful.', 'success')
-            if user.role.name == 'admin':
-                return redirect(url_for('admin_dashboard'))
-            elif user.role.name == 'instructor':
-                return redirect(url_for('instructor_dashboard'))
-            elif user.role.name == 'student':
-                return redirect(url_for('student_dashboard'))
+            role_name = get_role_name(user.role_id)
+            if role_name == 'admin':
+                return redirect(url_for('main.admin_dashboard'))
+            elif role_name == 'instructor':
+                return redirect(url_for('main.instructor_dashboard'))
+            elif role_name == 'student':
+                return redirect(url_for('main.student_dashboard'))
         flash('Invalid credentials.', 'danger')
     return render_template('login.html')
 
 # Logout Route
-@app.route('/logout')
+@bp.route('/logout')
 @login_required
 def logout():
     logout_user()
     flash('Logged out successfully.', 'success')
-    return redirect(url_for('login'))
+    return redirect(url_for('main.login'))
 
 # -------------------- Rutas de Administrador -------------------- #
 
-@app.route('/admin/dashboard')
+@bp.route('/admin/dashboard')
 @login_required
 @role_required('admin')
 def admin_dashboard():
@@ -177,51 +263,159 @@ def admin_dashboard():
         total_courses=total_courses, recent_users=recent_users,
         recent_courses=recent_courses)
 
-@app.route('/admin/register_user', methods=['GET', 'POST'])
+@bp.route('/admin/register_user', methods=['GET', 'POST'])
 @login_required
 @role_required('admin')
 def register_user():
     if request.method == 'POST':
         username = request.form['username']
         email = request.form['email']
-        password = bcrypt.generate_password_hash(request.form['password']).decode('utf-8')
+        try:
+            password = password_hasher.hash(request.form['password'])
+        except HasherBusy:
+            flash('El servidor está ocupado, inténtalo de nuevo en unos segundos.', 'danger')
+            return redirect(url_for('main.register_user'))
         role_name = request.form['role']
         role = Role.query.filter_by(name=role_name).first()
         if not role:
             flash('Rol no encontrado.', 'danger')
-            return redirect(url_for('register_user'))
+            return redirect(url_for('main.register_user'))
         new_user = User(username=username, email=email, password=password, role=role)
         db.session.add(new_user)
         db.session.commit()
         flash('Usuario creado exitosamente.', 'success')
-        return redirect(url_for('admin_dashboard'))
+        return redirect(url_for('main.admin_dashboard'))
     roles = Role.query.all()
     return render_template('admin/register_user.html', roles=roles)
 
-@app.route('/admin/view_users', methods=['GET', 'POST'])
+@bp.route('/admin/users/import', methods=['GET', 'POST'])
 @login_required
 @role_required('admin')
+def import_users_view():
+    """Alta masiva de usuarios desde un CSV (username,email,password[,role]).
+
+    La validación (`dry_run`) se hace en la petición; la importación se ejecuta en segundo
+    plano y esta vista muestra su reporte con `?job=<id>`.
+    """
+    report = None
+    job_id = request.args.get('job')
+    if request.method == 'POST':
+        file = request.files.get('file')
+        if not file or not file.filename:
+            flash('Selecciona un archivo CSV.', 'danger')
+            return redirect(url_for('main.import_users_view'))
+        options = {
+            'batch_size': current_app.config['USER_IMPORT_BATCH_SIZE'],
+            'processes': current_app.config['USER_IMPORT_PROCESSES'],
+            'rounds': current_app.config.get('BCRYPT_LOG_ROUNDS', 12),
+        }
+        if not request.form.get('dry_run'):
+            job_id = background_imports.submit(file.stream, **options)
+            flash('Importación iniciada; el resultado aparecerá aquí al terminar.', 'info')
+            return redirect(url_for('main.import_users_view', job=job_id))
+        lines = io.TextIOWrapper(file.stream, encoding='utf-8-sig', newline='')
+        report = import_users(lines, dry_run=True, **options)
+    elif job_id:
+        report = background_imports.report(job_id)
+        if report is None:
+            abort(404)
+    if report is not None and report.errors and (request.form.get('errors_csv') or request.args.get('errors_csv')):
+        return Response(
+            report.errors_csv(),
+            mimetype='text/csv',
+            headers={'Content-Disposition': 'attachment; filename=errores_importacion.csv'}
+        )
+    return render_template('admin/import_users.html', report=report, job_id=job_id)
+
+def keyset_args():
+    """Parámetros de paginación por clave de la petición (`after`, `before`, `per_page`)."""
+    return {
+        'after': request.args.get('after', type=int),
+        'before': request.args.get('before', type=int),
+        'per_page': request.args.get('per_page', 50, type=int),
+    }
+
+@bp.route('/admin/view_users', methods=['GET', 'POST'])
+@login_required
+@role_required('admin')
+@read_only
 def view_users():
-    users = User.query.all()
+    role = request.args.get('role') or None
+    q = request.args.get('q', '').strip() or None
+    users = users_page(role=role, prefix=q, **keyset_args())
     form = DeleteUserForm()  # Formulario con CSRF
-    return render_template('admin/view_users.html', users=users, form=form)
+    return render_template('admin/view_users.html', users=users, form=form, role=role, q=q)
+
+@bp.route('/admin/users.json', methods=['GET'])
+@login_required
+@role_required('admin')
+@read_only
+def view_users_json():
+    page = users_page(
+        role=request.args.get('role') or None, prefix=request.args.get('q', '').strip() or None, **keyset_args()
+    )
+    return jsonify({
+        'items': [user_to_dict(user) for user in page],
+        'prev_before': page.prev_before,
+        'next_after': page.next_after,
+    })
 
-@app.route('/admin/manage_courses', methods=['GET', 'POST'])
+@bp.route('/admin/manage_courses', methods=['GET', 'POST'])
 @login_required
 @role_required('admin')
+@read_only
 def manage_courses():
-    courses = Course.query.all()  # Obtén todos los cursos
-    return render_template('admin/manage_courses.html', courses=courses)
+    q = request.args.get('q', '').strip() or None
+    courses = courses_page(prefix=q, **keyset_args())
+    return render_template('admin/manage_courses.html', courses=courses, q=q)
 
-@app.route('/admin/course/<int:course_id>', methods=['GET'])
+@bp.route('/admin/courses.json', methods=['GET'])
+@login_required
+@role_required('admin')
+@read_only
+def manage_courses_json():
+    page = courses_page(prefix=request.args.get('q', '').strip() or None, **keyset_args())
+    return jsonify({
+        'items': [course_to_dict(course) for course in page],
+        'prev_before': page.prev_before,
+        'next_after': page.next_after,
+    })
+
+@bp.route('/admin/course/<int:course_id>', methods=['GET'])
 @login_required
 @role_required('admin')  # Si usas decoradores de roles
 def view_course(course_id):
-    course = Course.query.get_or_404(course_id)
+    course = get_with_profile_or_404('course_outline', course_id)
     return render_template('admin/view_course.html', course=course)
 
+@bp.route('/admin/perf', methods=['GET'])
+@login_required
+@role_required('admin')
+def admin_perf():
+    """Métricas de consultas SQL y tiempos por endpoint."""
+    return render_template(
+        'admin/perf.html', stats=perf.snapshot(), passwords=password_metrics()
+    )
+
+def password_metrics():
+    """Latencia del hash de contraseñas e intentos rechazados (pool lleno o limitados)."""
+    return dict(password_hasher.snapshot(), **login_throttle.snapshot())
 
-@app.route('/admin/user/delete/<int:user_id>', methods=['POST'])
+@bp.route('/admin/perf/passwords.json', methods=['GET'])
+@login_required
+@role_required('admin')
+def admin_password_metrics_json():
+    return jsonify(password_metrics())
+
+@bp.route('/admin/perf.json', methods=['GET'])
+@login_required
+@role_required('admin')
+def admin_perf_json():
+    """Métricas de rendimiento en formato JSON."""
+    return jsonify(perf.snapshot())
+
+
+@bp.route('/admin/user/delete/<int:user_id>', methods=['POST'])
 @login_required
 @role_required('admin')
 def delete_user(user_id):
@@ -230,87 +424,33 @@ def delete_user(user_id):
         user = User.query.get_or_404(user_id)
         if user.username == 'admin':
             flash('No puedes eliminar al usuario administrador principal.', 'danger')
-            return redirect(url_for('view_users'))
-        db.session.delete(user)
+            return redirect(url_for('main.view_users'))
+        if background_deletes.should_defer(user_tree_rows(user.id)):
+            background_deletes.submit(delete_user_tree, (user.id,), partial(cleanup_deleted, user_id=user.id))
+            flash('El usuario tiene muchos datos asociados: se está eliminando en segundo plano.', 'info')
+            return redirect(url_for('main.view_users'))
+        deleted = delete_user_tree(user.id)
         db.session.commit()
+        cleanup_deleted(deleted, user_id=user_id)
         flash('Usuario eliminado exitosamente.', 'success')
     else:
         flash('Token CSRF inválido o formulario no válido.', 'danger')
-    return redirect(url_for('view_users'))
+    return redirect(url_for('main.view_users'))
 
 # -------------------- Rutas de Instructor -------------------- #
 
 # Panel principal del Instructor
-@app.route('/instructor/dashboard', methods=['GET'])
+@bp.route('/instructor/dashboard', methods=['GET'])
 @login_required
 @role_required('instructor')
+@read_only
 def instructor_dashboard():
     """Dashboard del instructor con comparación de cursos"""
     # Obtiene todos los cursos del instructor
     courses = Course.query.filter_by(instructor_id=current_user.id).all()
 
-    # Lista para almacenar métricas de los cursos
-    course_metrics = []
-
-    for course in courses:
-        # Total de estudiantes inscritos
-        total_students = len(course.enrollments)
-
-        # Variables para cálculo de métricas
-        total_scores = 0  # Suma de calificaciones
-        total_responses = 0  # Total de respuestas evaluadas
-        students_completed_course = 0  # Estudiantes que completaron todos los quizzes
-
-        # Total de quizzes en el curso
-        total_quizzes = sum(
-            1 for module in course.modules for content in module.content_items if content.type == 'quiz'
-        )
-
-        # Verificar progreso de cada estudiante
-        for enrollment in course.enrollments:
-            # Número de quizzes completados por el estudiante
-            completed_quizzes = db.session.query(
-                ContentItem.id
-            ).join(StudentResponse).filter(
-                StudentResponse.student_id == enrollment.student_id,
-                StudentResponse.completed == True,
-                ContentItem.module_id.in_([module.id for module in course.modules])
-            ).group_by(ContentItem.id).count()
-            # Aseguramos que no cuente duplicados
-
-            # Si el estudiante completó todos los quizzes del curso, cuenta como completado
-            if total_quizzes > 0 and completed_quizzes == total_quizzes:
-                students_completed_course += 1
-
-            # Calcular promedio de calificaciones
-            for response in enrollment.student.responses:
-                if (
-                    response.content_item
-                    and response.content_item.module
-                    and response.content_item.module.course_id == course.id
-                ):
-                    if response.score is not None:
-                        total_scores += response.score
-                        total_responses += 1
-
-        # Cálculo del promedio de calificaciones
-        average_score = (
-            round(total_scores / total_responses, 2) if total_responses > 0 else 0
-        )
-
-        # Cálculo del porcentaje de finalización
-        completion_rate = (
-            round((students_completed_course / total_students) * 100, 2)
-            if total_students > 0 else 0
-        )
-
-        # Agregar métricas a la lista
-        course_metrics.append({
-            'course': course,
-            'total_students': total_students,
-            'average_score': average_score,
-            'completion_rate': completion_rate
-        })
+    # Métricas calculadas con consultas agrupadas (número fijo de consultas)
+    course_metrics = get_course_metrics(courses)
 
     # Ordenar cursos por número de estudiantes, promedio de notas y porcentaje de finalización
     sorted_courses = sorted(
@@ -330,7 +470,7 @@ def instructor_dashboard():
         course_metrics=sorted_courses
     )
 
-@app.route('/instructor/courses', methods=['GET'])
+@bp.route('/instructor/courses', methods=['GET'])
 @login_required
 @role_required('instructor')
 def instructor_courses():
@@ -339,7 +479,7 @@ def instructor_courses():
     return render_template('instructor/courses.html', courses=courses)
 
 # Crear un nuevo curso
-@app.route('/instructor/course/new', methods=['GET', 'POST'])
+@bp.route('/instructor/course/new', methods=['GET', 'POST'])
 @login_required
 @role_required('instructor')
 def new_course():
@@ -350,7 +490,7 @@ def new_course():
 
         if not title or not description:
             flash('Por favor, completa todos los campos.', 'danger')
-            return redirect(url_for('new_course'))
+            return redirect(url_for('main.new_course'))
 
         # Crear el curso asociado al instructor actual
         course = Course(name=title, description=description, instructor_id=current_user.id)
@@ -358,12 +498,12 @@ def new_course():
         db.session.commit()
 
         flash('Curso creado exitosamente.', 'success')
-        return redirect(url_for('instructor_dashboard'))
+        return redirect(url_for('main.instructor_dashboard'))
 
     return render_template('instructor/new_course.html')
 
 # Editar un curso existente
-@app.route('/instructor/course/edit/<int:course_id>', methods=['GET', 'POST'])
+@bp.route('/instructor/course/edit/<int:course_id>', methods=['GET', 'POST'])
 @login_required
 @role_required('instructor')
 def edit_course(course_id):
@@ -371,21 +511,21 @@ def edit_course(course_id):
     course = Course.query.get_or_404(course_id)
     if course.instructor_id != current_user.id:
         flash('No tienes permiso para editar este curso.', 'danger')
-        return redirect(url_for('instructor_dashboard'))
+        return redirect(url_for('main.instructor_dashboard'))
 
     if request.method == 'POST':
         course.name = request.form.get('title')
         course.description = request.form.get('description')
         db.session.commit()
         flash('Curso actualizado exitosamente.', 'success')
-        return redirect(url_for('instructor_dashboard'))
+        return redirect(url_for('main.instructor_dashboard'))
 
     return render_template('instructor/edit_course.html', course=course)
 
 
 # Eliminar un curso
 # Eliminar un curso
-@app.route('/instructor/course/delete/<int:course_id>', methods=['POST'])
+@bp.route('/instructor/course/delete/<int:course_id>', methods=['POST'])
 @login_required
 @role_required('instructor')
 def delete_course(course_id):
@@ -393,37 +533,38 @@ def delete_course(course_id):
     course = Course.query.get_or_404(course_id)
     if course.instructor_id != current_user.id:
         flash('No tienes permiso para eliminar este curso.', 'danger')
-        return redirect(url_for('instructor_dashboard'))
+        return redirect(url_for('main.instructor_dashboard'))
 
-    try:
-        # Eliminar respuestas de estudiantes asociadas a los contenidos del curso
-        for module in course.modules:
-            for content_item in module.content_items:
-                StudentResponse.query.filter_by(content_item_id=content_item.id).delete()
+    if background_deletes.should_defer(course_responses(course_ids=[course.id])):
+        background_deletes.submit(delete_courses, ([course.id],), cleanup_deleted)
+        flash('El curso tiene muchas respuestas: se está eliminando en segundo plano.', 'info')
+        return redirect(url_for('main.instructor_dashboard'))
 
-        # Eliminar el curso (esto elimina automáticamente módulos y contenidos debido a la cascada)
-        db.session.delete(course)
+    try:
+        # Módulos, contenidos, respuestas e inscripciones con unas pocas sentencias DELETE
+        deleted = delete_courses([course.id])
         db.session.commit()
+        cleanup_deleted(deleted)
         flash('Curso eliminado exitosamente.', 'success')
     except Exception as e:
         db.session.rollback()
         flash(f'Error al eliminar el curso: {e}', 'danger')
 
-    return redirect(url_for('instructor_dashboard'))
+    return redirect(url_for('main.instructor_dashboard'))
 
 
 # Ver detalles de un curso
-@app.route('/instructor/course/<int:course_id>', methods=['GET'])
+@bp.route('/instructor/course/<int:course_id>', methods=['GET'])
 @login_required
 @role_required('instructor')
 def course_details(course_id):
     """Ver los detalles de un curso."""
-    course = Course.query.get_or_404(course_id)  # Obtén el curso o lanza un 404
+    course = get_with_profile_or_404('course_outline', course_id)  # Obtén el curso o lanza un 404
 
     # Verifica si el curso pertenece al instructor actual
     if course.instructor_id != current_user.id:
         flash('No tienes permiso para acceder a este curso.', 'danger')
-        return redirect(url_for('instructor_courses'))
+        return redirect(url_for('main.instructor_courses'))
 
     # Recupera los módulos relacionados
     modules = course.get_modules_sorted()
@@ -434,22 +575,22 @@ def course_details(course_id):
         modules=modules
     )
 
-@app.route('/instructor/module/<int:module_id>', methods=['GET'])
+@bp.route('/instructor/module/<int:module_id>', methods=['GET'])
 @login_required
 @role_required('instructor')
 def module_details(module_id):
     """Ver los detalles de un módulo específico."""
-    module = Module.query.get_or_404(module_id)
+    module = get_with_profile_or_404('module_with_content', module_id)
     if module.course.instructor_id != current_user.id:
         flash('No tienes permiso para acceder a este módulo.', 'danger')
-        return redirect(url_for('instructor_dashboard'))
+        return redirect(url_for('main.instructor_dashboard'))
 
     # Los contenidos del módulo se mostrarán en esta vista.
     return render_template('instructor/module_details.html', module=module)
 
 
 # Crear un nuevo módulo en un curso
-@app.route('/instructor/course/<int:course_id>/module/new', methods=['GET', 'POST'])
+@bp.route('/instructor/course/<int:course_id>/module/new', methods=['GET', 'POST'])
 @login_required
 @role_required('instructor')
 def new_module(course_id):
@@ -457,7 +598,7 @@ def new_module(course_id):
     course = Course.query.get_or_404(course_id)
     if course.instructor_id != current_user.id:
         flash('No tienes permiso para agregar módulos a este curso.', 'danger')
-        return redirect(url_for('instructor_courses'))
+        return redirect(url_for('main.instructor_courses'))
 
     if request.method == 'POST':
         title = request.form.get('title')
@@ -465,18 +606,18 @@ def new_module(course_id):
 
         if not title or not description:
             flash('Por favor, completa todos los campos.', 'danger')
-            return redirect(url_for('new_module', course_id=course_id))
+            return redirect(url_for('main.new_module', course_id=course_id))
 
         last_order = max([m.order for m in course.modules], default=0)
         module = Module(title=title, description=description, order=last_order + 1, course_id=course.id)
         db.session.add(module)
         db.session.commit()
         flash('Módulo creado exitosamente.', 'success')
-        return redirect(url_for('course_details', course_id=course_id))
+        return redirect(url_for('main.course_details', course_id=course_id))
 
     return render_template('instructor/new_module.html', course=course)
 
-@app.route('/instructor/module/edit/<int:module_id>', methods=['GET', 'POST'])
+@bp.route('/instructor/module/edit/<int:module_id>', methods=['GET', 'POST'])
 @login_required
 @role_required('instructor')
 def edit_module(module_id):
@@ -486,19 +627,19 @@ def edit_module(module_id):
     # Verifica que el módulo pertenece al instructor actual
     if module.course.instructor_id != current_user.id:
         flash('No tienes permiso para editar este módulo.', 'danger')
-        return redirect(url_for('instructor_courses'))
+        return redirect(url_for('main.instructor_courses'))
 
     if request.method == 'POST':
         module.title = request.form.get('title')
         module.description = request.form.get('description')
         db.session.commit()
         flash('Módulo actualizado exitosamente.', 'success')
-        return redirect(url_for('course_details', course_id=module.course_id))
+        return redirect(url_for('main.course_details', course_id=module.course_id))
 
     return render_template('instructor/edit_module.html', module=module)
 
 
-@app.route('/instructor/module/delete/<int:module_id>', methods=['POST'])
+@bp.route('/instructor/module/delete/<int:module_id>', methods=['POST'])
 @login_required
 @role_required('instructor')
 def delete_module(module_id):
@@ -506,60 +647,53 @@ def delete_module(module_id):
     module = Module.query.get_or_404(module_id)
     if module.course.instructor_id != current_user.id:
         flash('No tienes permiso para eliminar este módulo.', 'danger')
-        return redirect(url_for('instructor_courses'))
+        return redirect(url_for('main.instructor_courses'))
 
-    db.session.delete(module)
+    course_id = module.course_id
+    if background_deletes.should_defer(course_responses(module_id=module.id)):
+        background_deletes.submit(delete_module_tree, (module.id,), cleanup_deleted)
+        flash('El módulo tiene muchas respuestas: se está eliminando en segundo plano.', 'info')
+        return redirect(url_for('main.course_details', course_id=course_id))
+
+    deleted = delete_module_tree(module.id)
     db.session.commit()
+    cleanup_deleted(deleted)
     flash('Módulo eliminado exitosamente.', 'success')
-    return redirect(url_for('course_details', course_id=module.course_id))
+    return redirect(url_for('main.course_details', course_id=course_id))
+
+def parse_date_range(start_date, end_date):
+    """Convierte fechas YYYY-MM-DD en un rango [inicio, fin) que incluye el día final."""
+    start = datetime.strptime(start_date, '%Y-%m-%d')
+    end = datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=1)
+    return start, end
 
-@app.route('/instructor/courses/completed', methods=['GET', 'POST'])
+@bp.route('/instructor/courses/completed', methods=['GET', 'POST'])
 @login_required
 @role_required('instructor')
+@read_only
 def instructor_courses_completed():
-    if request.method == 'POST':
-        start_date = request.form.get('start_date')
-        end_date = request.form.get('end_date')
+    start_date = request.values.get('start_date')
+    end_date = request.values.get('end_date')
 
+    if request.method == 'POST' or start_date or end_date:
         # Validate dates
         if not start_date or not end_date:
             flash('Please provide both start and end dates.', 'danger')
-            return redirect(url_for('instructor_courses_completed'))
+            return redirect(url_for('main.instructor_courses_completed'))
 
         try:
-            start_date = datetime.strptime(start_date, '%Y-%m-%d')
-            end_date = datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=1)
+            start, end = parse_date_range(start_date, end_date)
         except ValueError:
             flash('Invalid date format. Use YYYY-MM-DD.', 'danger')
-            return redirect(url_for('instructor_courses_completed'))
-
-        # Query completed courses
-        completed_courses = Course.query.join(CourseEnrollment).filter(
-            Course.instructor_id == current_user.id,
-            CourseEnrollment.completed == True,
-            CourseEnrollment.completion_date.between(start_date, end_date)
-        ).all()
+            return redirect(url_for('main.instructor_courses_completed'))
 
-        courses_with_modules = []
-        for course in completed_courses:
-            modules_data = []
-            for module in course.modules:
-                module_responses = StudentResponse.query.filter(
-                    StudentResponse.content_item_id.in_([item.id for item in module.content_items]),
-                    StudentResponse.completed == True
-                ).all()
-                for response in module_responses:
-                    modules_data.append({
-                        'module_title': module.title,
-                        'student_id': response.student_id,
-                        'completion_date': response.completion_date
-                    })
-            courses_with_modules.append({
-                'course': course,
-                'modules_data': modules_data
-            })
+        # Cursos completados y sus filas por módulo, enviados a la plantilla a medida que se leen
+        courses_with_modules = (
+            {'course': course, 'modules_data': modules_data}
+            for course, modules_data in completed_courses_report(current_user.id, start, end)
+        )
 
-        return render_template(
+        return stream_template(
             'instructor/courses_completed.html',
             courses=courses_with_modules,
             start_date=start_date,
@@ -568,49 +702,48 @@ def instructor_courses_completed():
 
     return render_template('instructor/courses_completed_form.html')
 
-@app.route('/instructor/modules/completed', methods=['GET', 'POST'])
+@bp.route('/instructor/courses/completed.csv', methods=['GET'])
 @login_required
 @role_required('instructor')
+@read_only
+def instructor_courses_completed_csv():
+    """Exporta el reporte de cursos completados en CSV sin cargarlo completo en memoria."""
+    try:
+        start, end = parse_date_range(request.args.get('start_date', ''), request.args.get('end_date', ''))
+    except ValueError:
+        flash('Invalid date format. Use YYYY-MM-DD.', 'danger')
+        return redirect(url_for('main.instructor_courses_completed'))
+
+    report = completed_courses_report(current_user.id, start, end)
+    return Response(
+        stream_with_context(completed_courses_csv(report)),
+        mimetype='text/csv',
+        headers={'Content-Disposition': 'attachment; filename=cursos_completados.csv'}
+    )
+
+@bp.route('/instructor/modules/completed', methods=['GET', 'POST'])
+@login_required
+@role_required('instructor')
+@read_only
 def instructor_modules_completed():
-    if request.method == 'POST':
-        start_date = request.form.get('start_date')
-        end_date = request.form.get('end_date')
+    start_date = request.values.get('start_date')
+    end_date = request.values.get('end_date')
 
+    if request.method == 'POST' or start_date or end_date:
         # Validate dates
         if not start_date or not end_date:
             flash('Please provide both start and end dates.', 'danger')
-            return redirect(url_for('instructor_modules_completed'))
+            return redirect(url_for('main.instructor_modules_completed'))
 
         try:
-            start_date = datetime.strptime(start_date, '%Y-%m-%d')
-            end_date = datetime.strptime(end_date, '%Y-%m-%d')
+            start, end = parse_date_range(start_date, end_date)
         except ValueError:
             flash('Invalid date format. Use YYYY-MM-DD.', 'danger')
-            return redirect(url_for('instructor_modules_completed'))
-
-        # Get completed modules within the date range
-        completed_modules = []
-        for module in Module.query.all():
-            # Check if all content items in the module are completed
-            module_content_ids = [item.id for item in module.content_items]
-            total_content = len(module_content_ids)
-            completed_content = StudentResponse.query.filter(
-                StudentResponse.content_item_id.in_(module_content_ids),
-                StudentResponse.completed == True
-            ).distinct(StudentResponse.content_item_id).count()
-
-            if total_content > 0 and completed_content == total_content:
-                last_completion_date = StudentResponse.query.filter(
-                    StudentResponse.content_item_id.in_(module_content_ids),
-                    StudentResponse.completed == True
-                ).order_by(StudentResponse.completion_date.desc()).first().completion_date
-
-                # Add the module to the list if within the date range
-                if start_date <= last_completion_date <= end_date:
-                    completed_modules.append({
-                        'module': module,
-                        'completion_date': last_completion_date
-                    })
+            return redirect(url_for('main.instructor_modules_completed'))
+
+        # Módulos completados de los cursos del instructor (una sola consulta paginada)
+        page = request.args.get('page', 1, type=int)
+        completed_modules = completed_modules_report(current_user.id, start, end, page=max(page, 1))
 
         return render_template(
             'instructor/modules_completed.html',
@@ -622,14 +755,14 @@ def instructor_modules_completed():
     return render_template('instructor/modules_completed_form.html')
 
 # Añadir contenido a un módulo
-@app.route('/instructor/module/<int:module_id>/content/new', methods=['GET', 'POST'])
+@bp.route('/instructor/module/<int:module_id>/content/new', methods=['GET', 'POST'])
 @login_required
 @role_required('instructor')
 def new_content(module_id):
     module = Module.query.get_or_404(module_id)
     if module.course.instructor_id != current_user.id:
         flash('No tienes permiso para agregar contenido a este módulo.', 'danger')
-        return redirect(url_for('instructor_courses'))
+        return redirect(url_for('main.instructor_courses'))
 
     if request.method == 'POST':
         title = request.form.get('title')
@@ -641,7 +774,7 @@ def new_content(module_id):
         # Validaciones básicas
         if not title or not content_type:
             flash('El título y el tipo de contenido son obligatorios.', 'danger')
-            return redirect(url_for('new_content', module_id=module_id))
+            return redirect(url_for('main.new_content', module_id=module_id))
 
         # Inicializa las variables de contenido
         content = None
@@ -653,9 +786,8 @@ def new_content(module_id):
         elif content_type == 'video':
             content = video_url
         elif content_type == 'file' and file and allowed_file(file.filename):
-            filename = secure_filename(file.filename)
-            file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-            file.save(file_path)
+            # Ruta del blob relativa a UPLOAD_FOLDER, como la usan las plantillas
+            file_path = blob_store.put_stream(file.stream, secure_filename(file.filename))
 
         # Guardar contenido en la base de datos
         last_order = max([c.order for c in module.content_items], default=0)
@@ -671,12 +803,107 @@ def new_content(module_id):
         db.session.commit()
 
         flash('Contenido añadido exitosamente.', 'success')
-        return redirect(url_for('module_details', module_id=module_id))
+        return redirect(url_for('main.module_details', module_id=module_id))
 
     return render_template('instructor/new_content.html', module=module)
 
 
-@app.route('/instructor/content/edit/<int:content_id>', methods=['GET', 'POST'])
+# Subidas por partes (archivos grandes, reanudables)
+@bp.app_errorhandler(UploadError)
+def handle_upload_error(error):
+    return jsonify({'error': str(error)}), error.status
+
+def get_own_upload(upload_id):
+    """Devuelve los metadatos de una subida del instructor actual o lanza 404."""
+    upload = chunked_uploads.get(upload_id)
+    if upload['user_id'] != current_user.id:
+        abort(404)
+    return upload
+
+@bp.route('/instructor/module/<int:module_id>/uploads', methods=['POST'])
+@login_required
+@role_required('instructor')
+def create_upload(module_id):
+    """Inicia una subida por partes: recibe nombre, tamaño y checksum SHA-256 (opcional)."""
+    module = Module.query.get_or_404(module_id)
+    if module.course.instructor_id != current_user.id:
+        abort(403)
+
+    data = request.get_json(silent=True) or {}
+    filename = data.get('filename', '')
+    if not allowed_file(filename):
+        raise UploadError('Tipo de archivo no permitido.')
+    try:
+        size = int(data.get('size'))
+    except (TypeError, ValueError):
+        raise UploadError('Tamaño de archivo inválido.')
+
+    upload = chunked_uploads.create(current_user.id, module_id, filename, size, data.get('sha256'))
+    return jsonify(upload), 201
+
+@bp.route('/instructor/uploads/<upload_id>', methods=['GET'])
+@login_required
+@role_required('instructor')
+def upload_status(upload_id):
+    """Estado de una subida; `offset` indica desde dónde retomarla."""
+    get_own_upload(upload_id)
+    return jsonify(chunked_uploads.status(upload_id))
+
+@bp.route('/instructor/uploads/<upload_id>', methods=['PUT'])
+@login_required
+@role_required('instructor')
+def upload_chunk(upload_id):
+    """Recibe una parte en el cuerpo de la petición y la escribe en disco por bloques."""
+    get_own_upload(upload_id)
+    offset = request.args.get('offset', type=int)
+    if offset is None:
+        raise UploadError('Falta el parámetro offset.')
+    new_offset = chunked_uploads.write_chunk(
+        upload_id, offset, request.stream, request.content_length,
+        chunk_sha256=request.headers.get('X-Chunk-Sha256')
+    )
+    return jsonify({'upload_id': upload_id, 'offset': new_offset})
+
+@bp.route('/instructor/uploads/<upload_id>', methods=['DELETE'])
+@login_required
+@role_required('instructor')
+def cancel_upload(upload_id):
+    get_own_upload(upload_id)
+    chunked_uploads.discard(upload_id)
+    return '', 204
+
+@bp.route('/instructor/uploads/<upload_id>/complete', methods=['POST'])
+@login_required
+@role_required('instructor')
+def complete_upload(upload_id):
+    """Verifica el archivo completo y recién entonces crea el `ContentItem`."""
+    upload = get_own_upload(upload_id)
+    data = request.get_json(silent=True) or {}
+    title = data.get('title')
+    if not title:
+        raise UploadError('El título es obligatorio.')
+
+    module = Module.query.get_or_404(upload['module_id'])
+    file_path = chunked_uploads.complete(upload_id)
+
+    last_order = max([c.order for c in module.content_items], default=0)
+    content_item = ContentItem(
+        title=title,
+        type='file',
+        file_path=file_path,
+        order=last_order + 1,
+        module_id=module.id
+    )
+    db.session.add(content_item)
+    db.session.commit()
+
+    return jsonify({
+        'content_id': content_item.id,
+        'redirect': url_for('main.module_details', module_id=module.id)
+    }), 201
+
+
+@bp.route('/instructor/content/edit/<int:content_id>', methods=['GET', 'POST'])
 @login_required
 @role_required('instructor')
 def edit_content(content_id):
@@ -684,18 +911,19 @@ def edit_content(content_id):
     content_item = ContentItem.query.get_or_404(content_id)
     if content_item.module.course.instructor_id != current_user.id:
         flash('No tienes permiso para editar este contenido.', 'danger')
-        return redirect(url_for('instructor_courses'))
+        return redirect(url_for('main.instructor_courses'))
 
     if request.method == 'POST':
         content_item.title = request.form.get('title')
         content_item.content = request.form.get('content')
         db.session.commit()
+        quiz_cache.invalidate(content_item.id)
         flash('Contenido actualizado exitosamente.', 'success')
-        return redirect(url_for('module_details', module_id=content_item.module.id))
+        return redirect(url_for('main.module_details', module_id=content_item.module.id))
 
     return render_template('instructor/edit_content.html', content_item=content_item)
 
-@app.route('/instructor/content/delete/<int:content_id>', methods=['POST'])
+@bp.route('/instructor/content/delete/<int:content_id>', methods=['POST'])
 @login_required
 @role_required('instructor')
 def delete_content(content_id):
@@ -703,16 +931,18 @@ def delete_content(content_id):
     content_item = ContentItem.query.get_or_404(content_id)
     if content_item.module.course.instructor_id != current_user.id:
         flash('No tienes permiso para eliminar este contenido.', 'danger')
-        return redirect(url_for('instructor_courses'))
+        return redirect(url_for('main.instructor_courses'))
 
     module_id = content_item.module.id
-    db.session.delete(content_item)
+    deleted = delete_content_item(content_item.id)
     db.session.commit()
+    # Borra el archivo si ningún otro contenido lo usa (si es reciente, queda para gc-uploads)
+    cleanup_deleted(deleted)
     flash('Contenido eliminado exitosamente.', 'success')
-    return redirect(url_for('module_details', module_id=module_id))
+    return redirect(url_for('main.module_details', module_id=module_id))
 
 # Rutas relacionadas con quizzes
-@app.route('/instructor/module/<int:module_id>/quiz/new', methods=['GET', 'POST'])
+@bp.route('/instructor/module/<int:module_id>/quiz/new', methods=['GET', 'POST'])
 @login_required
 @role_required('instructor')
 def new_quiz(module_id):
@@ -728,11 +958,11 @@ def new_quiz(module_id):
 
             if not title:
                 flash('El título del quiz es obligatorio.', 'danger')
-                return redirect(url_for('new_quiz', module_id=module_id))
+                return redirect(url_for('main.new_quiz', module_id=module_id))
 
             if not question_texts:
                 flash('Debe incluir al menos una pregunta.', 'danger')
-                return redirect(url_for('new_quiz', module_id=module_id))
+                return redirect(url_for('main.new_quiz', module_id=module_id))
 
             next_order = module.get_next_content_order()
             print(f"El siguiente número de orden es: {next_order}")
@@ -757,7 +987,7 @@ def new_quiz(module_id):
                 if question_type == 'multiple_choice' and not question_options:
                     flash(f'La pregunta {idx + 1} requiere opciones.', 'danger')
                     db.session.rollback()
-                    return redirect(url_for('new_quiz', module_id=module_id))
+                    return redirect(url_for('main.new_quiz', module_id=module_id))
 
                 options_json = json.dumps(question_options) if question_type == 'multiple_choice' else None
 
@@ -775,7 +1005,7 @@ def new_quiz(module_id):
             db.session.commit()
             print("Quiz y preguntas guardados exitosamente.")
             flash('Quiz creado exitosamente.', 'success')
-            return redirect(url_for('list_quizzes', module_id=module.id))
+            return redirect(url_for('main.list_quizzes', module_id=module.id))
 
         except Exception as e:
             db.session.rollback()
@@ -786,16 +1016,16 @@ def new_quiz(module_id):
     return render_template('instructor/create_quiz.html', module=module)
 
 
-@app.route('/instructor/quiz/<int:quiz_id>/edit', methods=['GET', 'POST'])
+@bp.route('/instructor/quiz/<int:quiz_id>/edit', methods=['GET', 'POST'])
 @login_required
 @role_required('instructor')
 def edit_quiz(quiz_id):
     """Editar un quiz existente."""
-    quiz = ContentItem.query.get_or_404(quiz_id)
+    quiz = get_with_profile_or_404('quiz_with_questions', quiz_id)
 
     if quiz.type != 'quiz':
         flash('El contenido seleccionado no es un quiz.', 'danger')
-        return redirect(url_for('instructor_dashboard'))
+        return redirect(url_for('main.instructor_dashboard'))
 
     if request.method == 'POST':
         try:
@@ -853,8 +1083,9 @@ def edit_quiz(quiz_id):
                     db.session.delete(question)
 
             db.session.commit()
+            quiz_cache.invalidate(quiz.id)
             flash('Quiz actualizado exitosamente.', 'success')
-            return redirect(url_for('list_quizzes', module_id=quiz.module_id))
+            return redirect(url_for('main.list_quizzes', module_id=module_id))
 
         except Exception as e:
             db.session.rollback()
@@ -864,7 +1095,7 @@ def edit_quiz(quiz_id):
     return render_template('instructor/edit_quiz.html', quiz=quiz)
 
 
-@app.route('/instructor/module/<int:module_id>/quizzes', methods=['GET'])
+@bp.route('/instructor/module/<int:module_id>/quizzes', methods=['GET'])
 @login_required
 @role_required('instructor')
 def list_quizzes(module_id):
@@ -874,43 +1105,42 @@ def list_quizzes(module_id):
     return render_template('instructor/list_quizzes.html', module=module, quizzes=quizzes)
 
 
-@app.route('/instructor/quiz/<int:quiz_id>/delete', methods=['POST'])
+@bp.route('/instructor/quiz/<int:quiz_id>/delete', methods=['POST'])
 @login_required
 @role_required('instructor')
 def delete_quiz(quiz_id):
     """Eliminar un quiz junto con sus preguntas."""
-    quiz = ContentItem.query.get_or_404(quiz_id)
+    quiz = get_with_profile_or_404('quiz_with_questions', quiz_id)
 
     # Verifica que el instructor tiene permisos para eliminar el quiz
     if quiz.module.course.instructor_id != current_user.id:
         flash('No tienes permiso para eliminar este quiz.', 'danger')
-        return redirect(url_for('instructor_courses'))
+        return redirect(url_for('main.instructor_courses'))
 
+    module_id = quiz.module_id
     try:
-        # Eliminar todas las preguntas asociadas al quiz
-        for question in quiz.questions:
-            db.session.delete(question)
-        
-        # Eliminar el quiz después de borrar las preguntas
-        db.session.delete(quiz)
+        # Preguntas y respuestas de estudiantes se eliminan con el quiz
+        deleted = delete_content_item(quiz.id)
         db.session.commit()
+        cleanup_deleted(deleted)
         flash('Quiz eliminado exitosamente.', 'success')
     except Exception as e:
         db.session.rollback()
         flash(f'Error al eliminar el quiz: {e}', 'danger')
 
-    return redirect(url_for('list_quizzes', module_id=quiz.module_id))
+    return redirect(url_for('main.list_quizzes', module_id=module_id))
 
-@app.route('/instructor/course/<int:course_id>/students', methods=['GET'])
+@bp.route('/instructor/course/<int:course_id>/students', methods=['GET'])
 @login_required
 @role_required('instructor')
+@read_only
 def course_students(course_id):
     """Ver las notas de los estudiantes en un curso específico."""
     # Verificar que el curso pertenece al instructor actual
     course = Course.query.get_or_404(course_id)
     if course.instructor_id != current_user.id:
         flash('No tienes acceso a este curso.', 'danger')
-        return redirect(url_for('instructor_dashboard'))
+        return redirect(url_for('main.instructor_dashboard'))
 
     # Obtener los estudiantes inscritos y sus calificaciones en quizzes
     enrollments = CourseEnrollment.query.filter_by(course_id=course_id).all()
@@ -944,7 +1174,7 @@ def course_students(course_id):
 
 # -------------------- Rutas de Estudiante -------------------- #
 
-@app.route('/student/dashboard')
+@bp.route('/student/dashboard')
 @login_required
 @role_required('student')
 def student_dashboard():
@@ -962,17 +1192,34 @@ def student_dashboard():
     ]
     return render_template('student/student_dashboard.html', courses=courses_with_progress)
 
-@app.route('/student/explore_courses')
+@bp.route('/student/explore_courses')
 @login_required
 @role_required('student')
 def explore_courses():
-    """Ver todos los cursos disponibles para inscripción."""
-    enrolled_courses = [enrollment.course_id for enrollment in current_user.enrollments]
-    available_courses = Course.query.filter(~Course.id.in_(enrolled_courses)).all()  # Cursos no inscritos
-    return render_template('student/explore_courses.html', courses=available_courses)
+    """Ver los cursos disponibles para inscripción, con búsqueda y paginación."""
+    q = request.args.get('q', '').strip()
+    page = max(request.args.get('page', 1, type=int), 1)
+    courses = search_catalog(current_user.id, q, page)
+    return render_template('student/explore_courses.html', courses=courses, q=q)
 
 
-@app.route('/student/my_courses')
+@bp.route('/student/courses/search')
+@login_required
+@role_required('student')
+def search_courses():
+    """Búsqueda en el catálogo (JSON), ordenada por relevancia."""
+    page = max(request.args.get('page', 1, type=int), 1)
+    per_page = min(max(request.args.get('per_page', 12, type=int), 1), 50)
+    courses = search_catalog(current_user.id, request.args.get('q', '').strip(), page, per_page)
+    return jsonify({
+        'items': [{'id': course.id, 'name': course.name, 'description': course.description} for course in courses],
+        'page': courses.page,
+        'pages': courses.pages,
+        'total': courses.total,
+    })
+
+
+@bp.route('/student/my_courses')
 @login_required
 @role_required('student')
 def my_courses():
@@ -981,21 +1228,21 @@ def my_courses():
     return render_template('student/my_courses.html', courses=enrolled_courses)
 
 
-@app.route('/student/courses/<int:course_id>', methods=['GET'])
+@bp.route('/student/courses/<int:course_id>', methods=['GET'])
 @login_required
 @role_required('student')
 def course_content(course_id):
     """Ver contenido de un curso inscrito."""
-    course = Course.query.get_or_404(course_id)
+    course = get_with_profile_or_404('course_outline', course_id)
     enrollment = CourseEnrollment.query.filter_by(student_id=current_user.id, course_id=course_id).first()
     if not enrollment:
         flash('No estás inscrito en este curso.', 'danger')
-        return redirect(url_for('student_dashboard'))
+        return redirect(url_for('main.student_dashboard'))
 
     modules = course.get_modules_sorted()
     return render_template('student/course_content.html', course=course, modules=modules)
 
-@app.route('/student/courses/<int:course_id>/modules/<int:module_id>', methods=['GET'])
+@bp.route('/student/courses/<int:course_id>/modules/<int:module_id>', methods=['GET'])
 @login_required
 @role_required('student')
 def view_module_content(course_id, module_id):
@@ -1003,18 +1250,20 @@ def view_module_content(course_id, module_id):
     module = Module.query.get_or_404(module_id)
     if module.course_id != course_id:
         flash('No tienes permiso para ver este contenido.', 'danger')
-        return redirect(url_for('student_dashboard'))
-
-    content_items = module.get_content_items_sorted()
-
-    # Depuración
-    for content in content_items:
-        print(content.title, content.type, content.content)  # Verifica los valores
-
-    return render_template('student/module_content.html', module=module, content_items=content_items)
+        return redirect(url_for('main.student_dashboard'))
+
+    # La lista de contenidos es igual para todos los estudiantes: se renderiza una vez por versión
+    content_html = fragment_cache.get_or_render(
+        f'module_content:{module.id}',
+        module.content_version,
+        lambda: render_template(
+            'student/module_content_items.html', module=module, content_items=module.get_content_items_sorted()
+        )
+    )
+    return render_template('student/module_content.html', module=module, content_html=content_html)
 
 
-@app.route('/student/courses/<int:course_id>/modules/<int:module_id>/content/<int:content_id>', methods=['GET'])
+@bp.route('/student/courses/<int:course_id>/modules/<int:module_id>/content/<int:content_id>', methods=['GET'])
 @login_required
 @role_required('student')
 def content_view(course_id, module_id, content_id):
@@ -1024,23 +1273,25 @@ def content_view(course_id, module_id, content_id):
     # Verificar que el contenido pertenece al módulo y curso correctos
     if content.module_id != module_id or content.module.course_id != course_id:
         flash('No tienes permiso para ver este contenido.', 'danger')
-        return redirect(url_for('student_dashboard'))
+        return redirect(url_for('main.student_dashboard'))
 
     # Renderizar según el tipo de contenido
     if content.type == 'quiz':
-        return redirect(url_for('take_quiz', course_id=course_id, quiz_id=content.id))
+        return redirect(url_for('main.take_quiz', course_id=course_id, quiz_id=content.id))
 
     return render_template('student/content_view.html', content=content)
 
-@app.route('/student/quiz/<int:quiz_id>/take', methods=['GET', 'POST'])
+@bp.route('/student/quiz/<int:quiz_id>/take', methods=['GET', 'POST'])
 @login_required
 @role_required('student')
 def take_quiz(quiz_id):
     """Permitir que el estudiante realice un quiz y reciba calificación."""
-    quiz = ContentItem.query.get_or_404(quiz_id)
+    quiz = quiz_cache.get(quiz_id)  # Quiz compilado (respuestas normalizadas y opciones ya procesadas)
+    if quiz is None:
+        abort(404)
     if quiz.type != 'quiz':
         flash('El contenido seleccionado no es un quiz.', 'danger')
-        return redirect(url_for('student_dashboard'))
+        return redirect(url_for('main.student_dashboard'))
 
     # Verificar si el estudiante ya obtuvo una nota mayor o igual a 7
     existing_response = StudentResponse.query.filter_by(
@@ -1050,20 +1301,11 @@ def take_quiz(quiz_id):
 
     if existing_response:
         flash('Ya obtuviste una nota mayor o igual a 7 en este quiz. No puedes intentarlo nuevamente.', 'info')
-        return redirect(url_for('student_dashboard'))
+        return redirect(url_for('main.student_dashboard'))
 
     if request.method == 'POST':
-        total_questions = len(quiz.questions)
-        correct_answers = 0
-
-        for question in quiz.questions:
-            student_answer = request.form.get(f'question_{question.id}')
-            print(f"Pregunta {question.id}: Respuesta del estudiante: {student_answer}")  # Depuración
-            if student_answer and question.is_answer_correct(student_answer):
-                correct_answers += 1
-
-        # Calcular el puntaje
-        score = (correct_answers / total_questions) * 10
+        # Calcular el puntaje en una sola pasada sobre el formulario, sin consultas
+        score = quiz.grade(request.form)
         print(f"Puntaje obtenido: {score}")  # Depuración
 
         # Guardar la respuesta del estudiante
@@ -1079,7 +1321,7 @@ def take_quiz(quiz_id):
 
         # Actualizar progreso del curso
         enrollment = CourseEnrollment.query.filter_by(
-            student_id=current_user.id, course_id=quiz.module.course.id
+            student_id=current_user.id, course_id=quiz.course_id
         ).first()
         if enrollment:
             enrollment.update_progress()
@@ -1092,31 +1334,24 @@ def take_quiz(quiz_id):
         else:
             flash('No alcanzaste la nota mínima. Intenta nuevamente.', 'danger')
 
-        return redirect(url_for('student_dashboard'))
+        return redirect(url_for('main.student_dashboard'))
 
     return render_template('student/quiz.html', quiz=quiz)
 
-@app.route('/student/enroll/<int:course_id>', methods=['POST'])
+@bp.route('/student/enroll/<int:course_id>', methods=['POST'])
 @login_required
 @role_required('student')
 def enroll_course(course_id):
     """Permitir que el estudiante se inscriba en un curso."""
     course = Course.query.get_or_404(course_id)
-    enrollment = CourseEnrollment.query.filter_by(student_id=current_user.id, course_id=course_id).first()
 
-    if enrollment:
-        flash('Ya estás inscrito en este curso.', 'warning')
-    else:
-        new_enrollment = CourseEnrollment(
-            student_id=current_user.id,
-            course_id=course_id,
-            enrollment_date=datetime.utcnow()
-        )
-        db.session.add(new_enrollment)
-        db.session.commit()
+    # Upsert sobre el índice único (student_id, course_id)
+    if CourseEnrollment.enroll(current_user.id, course_id):
         flash(f'Te has inscrito exitosamente en el curso: {course.name}', 'success')
+    else:
+        flash('Ya estás inscrito en este curso.', 'warning')
 
-    return redirect(url_for('student_dashboard'))
+    return redirect(url_for('main.student_dashboard'))
 
 def youtube_embed(url):
     """Convierte una URL de YouTube en un embed URL compatible con iframe."""
@@ -1131,9 +1366,9 @@ def youtube_embed(url):
         return f"https://www.youtube.com/embed/{video_id}"
     return url
 
-app.jinja_env.filters['youtube_embed'] = youtube_embed
+bp.add_app_template_filter(youtube_embed, 'youtube_embed')
 
-@app.template_filter('loads')
+@bp.app_template_filter('loads')
 def loads_filter(value):
     """Filtro personalizado para deserializar cadenas JSON."""
     try:
@@ -1141,24 +1376,6 @@ def loads_filter(value):
     except (TypeError, ValueError):
         return {}
 
-with app.app_context():
-    enrollments = CourseEnrollment.query.all()
-    for enrollment in enrollments:
-        # Recalcular progreso y marcar como completado si corresponde
-        total_content = sum(len(module.content_items) for module in enrollment.course.modules)
-        completed_content = StudentResponse.query.filter_by(student_id=enrollment.student_id, completed=True).count()
-        enrollment.progress = (completed_content / total_content) * 100 if total_content > 0 else 0
-
-        if enrollment.progress == 100:
-            enrollment.completed = True
-            enrollment.completion_date = datetime.utcnow()  # Establecer fecha actual como finalización
-        else:
-            enrollment.completed = False
-            enrollment.completion_date = None
-        db.session.commit()
-
-    print("Datos existentes actualizados correctamente.")
-
 def update_completion_dates():
     # Obtener todas las inscripciones con progreso al 100% pero sin fecha de finalización
     enrollments = CourseEnrollment.query.filter_by(completed=True, completion_date=None).all()
@@ -1173,5 +1390,136 @@ def update_completion_dates():
         db.session.commit()
 
 
+# -------------------- Comandos CLI -------------------- #
+
+@bp.cli.command('seed')
+@click.option('--admin-username', default='admin', show_default=True)
+@click.option('--admin-email', default='admin@example.com', show_default=True)
+@click.option('--admin-password', default='admin123', show_default=True)
+def seed_command(admin_username, admin_email, admin_password):
+    """Crea los roles por defecto y el usuario admin (el esquema se crea con `flask db upgrade`)."""
+    for role_name in ('admin', 'instructor', 'student'):
+        UserService.create_role(role_name)
+    if UserService.create_admin(admin_username, admin_email, admin_password):
+        click.echo(f"Usuario admin creado: '{admin_username}'.")
+    else:
+        click.echo(f"El usuario '{admin_username}' ya existe.")
+
+
+@bp.cli.command('generate-data')
+@click.option('--scale', type=click.Choice(list(SCALES)), default='1k', show_default=True,
+              help='Tamaño del conjunto (número aproximado de respuestas de estudiantes).')
+@click.option('--seed', default=42, show_default=True, help='Semilla para reproducir el mismo conjunto.')
+@click.option('--password', default='password', show_default=True, help='Contraseña de los usuarios generados.')
+def generate_data_command(scale, seed, password):
+    """Genera datos sintéticos a escala de producción (se agregan a los existentes)."""
+    def report(responses, target):
+        click.echo(f"Respuestas generadas: {responses}/{target}")
+
+    counts = generate_dataset(scale, seed=seed, password=password, on_progress=report)
+    for table, count in counts.items():
+        click.echo(f"{table}: {count}")
+
+
+@bp.cli.command('replicate-db')
+@click.option('--interval', default=0.0, show_default=True,
+              help='Segundos entre copias; 0 copia una sola vez.')
+def replicate_db_command(interval):
+    """Copia la base primaria sobre la réplica SQLite local (sustituto de la replicación real)."""
+    replica = db.engines.get(REPLICA_BIND)
+    if replica is None:
+        raise click.ClickException(f"No hay un bind '{REPLICA_BIND}' en SQLALCHEMY_BINDS.")
+    while True:
+        replicate(db.engine, replica)
+        click.echo(f"Réplica actualizada: {datetime.now():%H:%M:%S}")
+        if not interval:
+            break
+        time.sleep(interval)
+
+
+@bp.cli.command('reconcile-counters')
+@click.option('--dry-run', is_flag=True, help='Solo reporta las diferencias sin corregirlas.')
+def reconcile_counters_command(dry_run):
+    """Reconstruye los contadores de progreso desde cero y reporta las diferencias."""
+    drift = reconcile_counters(dry_run=dry_run)
+    for course_id, stored, actual in drift['courses']:
+        click.echo(f"Curso {course_id}: total_content {stored} -> {actual}")
+    for enrollment_id, stored, actual in drift['enrollments']:
+        click.echo(f"Inscripción {enrollment_id}: completed_items {stored} -> {actual}")
+    action = 'encontradas' if dry_run else 'corregidas'
+    click.echo(f"Diferencias {action}: {len(drift['courses'])} cursos, {len(drift['enrollments'])} inscripciones.")
+
+
+@bp.cli.command('recompute-progress')
+@click.option('--chunk-size', default=1000, show_default=True, help='Inscripciones por bloque.')
+@click.option('--start-after', default=0, show_default=True, help='Retoma el proceso después de este id de inscripción.')
+def recompute_progress_command(chunk_size, start_after):
+    """Recalcula el progreso de todas las inscripciones por bloques (se puede retomar)."""
+    def report(processed, total, last_id):
+        click.echo(f"Procesadas {processed}/{total} inscripciones (último id: {last_id})")
+
+    processed = recompute_progress(chunk_size=chunk_size, start_after=start_after, on_chunk=report)
+    click.echo(f"Progreso recalculado para {processed} inscripciones.")
+
+
+@bp.cli.command('import-users')
+@click.argument('csv_file', type=click.File('r', encoding='utf-8-sig'))
+@click.option('--dry-run', is_flag=True, help='Solo valida el archivo, sin crear usuarios.')
+@click.option('--batch-size', default=500, show_default=True, help='Filas por lote (una transacción por lote).')
+@click.option('--processes', default=None, type=int, help='Procesos para calcular los hashes (por defecto, uno por CPU).')
+@click.option('--errors', 'errors_file', type=click.File('w'), help='Escribe el reporte de errores en este CSV.')
+def import_users_command(csv_file, dry_run, batch_size, processes, errors_file):
+    """Alta masiva de usuarios desde un CSV (username,email,password[,role])."""
+    report = import_users(
+        csv_file, dry_run=dry_run, batch_size=batch_size, processes=processes,
+        rounds=current_app.config.get('BCRYPT_LOG_ROUNDS', 12)
+    )
+    if errors_file:
+        errors_file.writelines(report.errors_csv())
+    else:
+        for error in report.errors:
+            click.echo(f"Línea {error['line']} ({error['username']}): {error['error']}")
+    action = 'válidos (simulación)' if dry_run else 'creados'
+    click.echo(f"Filas: {report.rows}. Usuarios {action}: {report.valid if dry_run else report.created}. "
+               f"Errores: {len(report.errors)}.")
+
+
+@bp.cli.command('rebuild-search-index')
+def rebuild_search_index_command():
+    """Reconstruye el índice de búsqueda del catálogo de cursos."""
+    with db.engine.begin() as connection:
+        indexed = rebuild_search_index(connection)
+    click.echo(f"Cursos indexados: {indexed}.")
+
+
+@bp.cli.command('build-assets')
+def build_assets_command():
+    """Compila, minifica y publica los CSS con huella de contenido y variantes comprimidas."""
+    try:
+        manifest = build_assets(current_app.static_folder)
+    except RuntimeError as error:
+        raise click.ClickException(str(error))
+    for original, published in sorted(manifest.items()):
+        click.echo(f"{original} -> {published}")
+    assets.reload()
+    click.echo(f"Recursos publicados: {len(manifest)}.")
+
+
+@bp.cli.command('gc-uploads')
+@click.option('--min-age', default=3600, show_default=True, help='Ignora blobs más recientes que estos segundos.')
+@click.option('--partial-max-age', default=24 * 3600, show_default=True,
+              help='Elimina las subidas por partes sin actividad durante estos segundos.')
+def gc_uploads_command(min_age, partial_max_age):
+    """Borra los archivos subidos que ya no referencia ningún contenido y las subidas abandonadas."""
+    removed = blob_store.collect_garbage(min_age=min_age)
+    for path in removed:
+        click.echo(f"Eliminado {path}")
+    click.echo(f"Blobs eliminados: {len(removed)}.")
+    expired = chunked_uploads.expire(partial_max_age)
+    for upload_id in expired:
+        click.echo(f"Subida abandonada eliminada {upload_id}")
+    click.echo(f"Subidas por partes eliminadas: {len(expired)}.")
+
+
 if __name__ == '__main__':
-    app.run(debug=True)
\ No newline at end of file
+    create_app().run(debug=True)
\ No newline at end of file
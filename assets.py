@@ -0,0 +1,155 @@
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+
+from flask import request, send_from_directory
+
+try:
+    import sass
+except ImportError:  # libsass solo hace falta para `flask build-assets`
+    sass = None
+
+try:
+    import brotli
+except ImportError:  # sin brotli solo se generan las variantes gzip
+    brotli = None
+
+DIST_FOLDER = 'dist'
+MANIFEST_NAME = 'manifest.json'
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+
+def minify_css(css):
+    """Minificación conservadora: quita comentarios y espacios sobrantes."""
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+    css = re.sub(r'\s+', ' ', css)
+    css = re.sub(r'\s*([{};,])\s*', r'\1', css)
+    css = re.sub(r':\s+', ':', css)
+    return css.replace(';}', '}').strip()
+
+
+def _css_sources(static_folder):
+    """CSS a publicar: `static/css/*.css`, reemplazados por su SCSS compilado con libsass.
+
+    Sin libsass no se publican los CSS antiguos de static/css en lugar de los SCSS: se falla.
+    """
+    sources = {}
+    css_folder = os.path.join(static_folder, 'css')
+    for name in sorted(os.listdir(css_folder)):
+        if name.endswith('.css'):
+            with open(os.path.join(css_folder, name), encoding='utf-8') as css_file:
+                sources[f'css/{name}'] = css_file.read()
+
+    sass_folder = os.path.join(static_folder, 'sass')
+    if os.path.isdir(sass_folder):
+        for name in sorted(os.listdir(sass_folder)):
+            if name.endswith('.scss') and not name.startswith('_'):
+                if sass is None:
+                    raise RuntimeError('Hay SCSS en static/sass pero libsass no está instalado (pip install libsass).')
+                compiled = sass.compile(filename=os.path.join(sass_folder, name), output_style='expanded')
+                sources[f'css/{name[:-len(".scss")]}.css'] = compiled
+    return sources
+
+
+def build_assets(static_folder):
+    """Compila, minifica y publica los CSS con huella de contenido en `static/dist`.
+
+    Cada archivo se escribe como `dist/css/<nombre>.<hash>.css` junto con sus variantes
+    `.gz` (y `.br` si está instalado brotli). Devuelve el manifiesto `{original: publicado}`,
+    que también se guarda en `dist/manifest.json`; los archivos de `dist` que el manifiesto
+    ya no incluye (huellas anteriores) se eliminan.
+    """
+    manifest = {}
+    for logical_name, css in _css_sources(static_folder).items():
+        data = minify_css(css).encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()[:12]
+        base, ext = os.path.splitext(logical_name)
+        published_name = f'{DIST_FOLDER}/{base}.{digest}{ext}'
+
+        path = os.path.join(static_folder, *published_name.split('/'))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as output:
+            output.write(data)
+        with open(path + '.gz', 'wb') as output:
+            output.write(gzip.compress(data, compresslevel=9, mtime=0))
+        if brotli is not None:
+            with open(path + '.br', 'wb') as output:
+                output.write(brotli.compress(data))
+        manifest[logical_name] = published_name
+
+    with open(os.path.join(static_folder, DIST_FOLDER, MANIFEST_NAME), 'w') as manifest_file:
+        json.dump(manifest, manifest_file, indent=2, sort_keys=True)
+    _prune_dist(static_folder, manifest)
+    return manifest
+
+
+def _prune_dist(static_folder, manifest):
+    """Borra de `dist` lo que no es el manifiesto ni un archivo publicado (o su variante comprimida)."""
+    keep = {f'{DIST_FOLDER}/{MANIFEST_NAME}'}
+    for published in manifest.values():
+        keep.update((published, published + '.gz', published + '.br'))
+    dist_folder = os.path.join(static_folder, DIST_FOLDER)
+    for root, _, files in os.walk(dist_folder):
+        for name in files:
+            path = os.path.join(root, name)
+            if os.path.relpath(path, static_folder).replace(os.sep, '/') not in keep:
+                os.remove(path)
+
+
+class StaticAssets:
+    """Sirve los recursos publicados por `build_assets`.
+
+    `url_for('static', filename='css/x.css')` devuelve la URL con huella si el archivo está en
+    el manifiesto; esas URLs se sirven con caché inmutable de un año y, si el cliente lo
+    acepta, con la variante precomprimida (brotli o gzip). Sin manifiesto no cambia nada.
+    """
+
+    def __init__(self, app=None):
+        self.manifest = {}
+        self.published = set()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.reload()
+        app.url_defaults(self._fingerprint_url)
+        app.view_functions['static'] = self._send_static
+
+    def reload(self):
+        path = os.path.join(self.app.static_folder, DIST_FOLDER, MANIFEST_NAME)
+        try:
+            with open(path) as manifest_file:
+                self.manifest = json.load(manifest_file)
+        except FileNotFoundError:
+            self.manifest = {}
+        self.published = set(self.manifest.values())
+
+    def _fingerprint_url(self, endpoint, values):
+        if endpoint == 'static' and 'filename' in values:
+            values['filename'] = self.manifest.get(values['filename'], values['filename'])
+
+    def _send_static(self, filename):
+        if filename not in self.published:
+            return self.app.send_static_file(filename)
+
+        response = None
+        mimetype = mimetypes.guess_type(filename)[0]
+        for encoding, suffix in (('br', '.br'), ('gzip', '.gz')):
+            if request.accept_encodings[encoding] and \
+                    os.path.exists(os.path.join(self.app.static_folder, filename + suffix)):
+                response = send_from_directory(self.app.static_folder, filename + suffix, mimetype=mimetype)
+                response.content_encoding = encoding
+                break
+        if response is None:
+            response = send_from_directory(self.app.static_folder, filename, mimetype=mimetype)
+
+        response.cache_control.public = True
+        response.cache_control.max_age = IMMUTABLE_MAX_AGE
+        response.cache_control.immutable = True
+        response.cache_control.no_cache = None
+        response.vary.add('Accept-Encoding')
+        return response
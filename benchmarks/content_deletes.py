@@ -0,0 +1,153 @@
+"""Comprueba la eliminación de contenidos y quizzes que ya tienen respuestas de estudiantes.
+
+Crea una base SQLite temporal con un curso (un módulo con un quiz y archivos, todos con
+respuestas) y elimina cada contenido con las rutas reales del instructor. Verifica que la
+ruta no falla, que desaparecen preguntas y respuestas, que los contadores del curso y de la
+inscripción quedan descontados, que el archivo se borra del almacén solo si ningún otro
+contenido lo usa y que la página del módulo (fragmento cacheado) deja de mostrar lo eliminado.
+
+Uso: python benchmarks/content_deletes.py
+"""
+import os
+import shutil
+import sys
+import tempfile
+from datetime import datetime
+from io import BytesIO
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func
+
+from app import create_app, blob_store
+from config import Config
+from models import (
+    db, Role, User, Course, Module, ContentItem, QuizQuestion, CourseEnrollment, StudentResponse
+)
+
+
+def build_app(directory):
+    class CheckConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(directory, 'checks.db')}"
+        UPLOAD_FOLDER = os.path.join(directory, 'uploads')
+        UPLOAD_RELEASE_GRACE_SECONDS = 0
+        PERF_BUDGET_MODE = 'log'
+
+    return create_app(CheckConfig)
+
+
+def create_course():
+    """Instructor, estudiante inscrito y un módulo con un quiz y dos archivos ya respondidos.
+
+    El segundo archivo tiene una copia (mismo blob) en otro contenido del módulo.
+    """
+    roles = {name: Role(name=name) for name in ('instructor', 'student')}
+    instructor = User(username='instructor', email='instructor@example.com', password='x', role=roles['instructor'])
+    student = User(username='estudiante', email='estudiante@example.com', password='x', role=roles['student'])
+    course = Course(name='Curso', description='Curso de prueba', instructor=instructor)
+    module = Module(title='Módulo', description='Módulo de prueba', order=1, course=course)
+    db.session.add_all([instructor, student, course, module])
+    db.session.flush()
+
+    quiz = ContentItem(title='Quiz de repaso', type='quiz', order=1, module=module)
+    document = ContentItem(
+        title='Archivo de lectura', type='file', order=2, module=module,
+        file_path=blob_store.put_stream(BytesIO(b'documento'), 'documento.pdf')
+    )
+    shared_path = blob_store.put_stream(BytesIO(b'compartido'), 'compartido.pdf')
+    shared = ContentItem(title='Compartido', type='file', order=3, module=module, file_path=shared_path)
+    shared_copy = ContentItem(title='Copia', type='file', order=4, module=module, file_path=shared_path)
+    text = ContentItem(title='Texto', type='text', content='Introducción', order=5, module=module)
+    quiz.questions.append(QuizQuestion(question_text='¿2 + 2?', question_type='open', correct_answer='4'))
+    db.session.add_all([quiz, document, shared, shared_copy, text, CourseEnrollment(student=student, course=course)])
+    db.session.flush()
+    for item in (quiz, document, shared):
+        db.session.add(StudentResponse(
+            student_id=student.id, content_item_id=item.id, response='{}', score=10, completed=True,
+            completion_date=datetime.utcnow()
+        ))
+    db.session.commit()
+    return instructor.id, student.id, course.id, module.id, quiz.id, document, shared
+
+
+def main():
+    directory = tempfile.mkdtemp()
+    results = []
+
+    def check(name, ok):
+        results.append((name, ok))
+
+    try:
+        app = build_app(directory)
+        with app.app_context():
+            db.create_all()
+            instructor_id, student_id, course_id, module_id, quiz_id, document, shared = create_course()
+            document_id, document_blob = document.id, blob_store.absolute_path(document.file_path)
+            shared_id, shared_blob = shared.id, blob_store.absolute_path(shared.file_path)
+
+        client = app.test_client()
+
+        def login(user_id):
+            with client.session_transaction() as session:
+                session['_user_id'] = str(user_id)
+                session['_fresh'] = True
+
+        def module_page():
+            login(student_id)
+            page = client.get(f'/student/courses/{course_id}/modules/{module_id}').get_data(as_text=True)
+            login(instructor_id)
+            return page
+
+        with app.app_context():
+            version = db.session.get(Module, module_id).content_version
+        # Deja el fragmento del módulo en la caché antes de eliminar
+        page = module_page()
+        check('fragmento: muestra el quiz y el archivo', 'Quiz de repaso' in page and 'Archivo de lectura' in page)
+
+        response = client.post(f'/instructor/quiz/{quiz_id}/delete')
+        page = module_page()
+        check('fragmento: sin el quiz eliminado', 'Quiz de repaso' not in page and 'Archivo de lectura' in page)
+        with app.app_context():
+            check('fragmento: nueva versión del módulo', db.session.get(Module, module_id).content_version > version)
+            check('quiz con respuestas: la ruta redirige', response.status_code == 302)
+            check('quiz con respuestas: quiz eliminado', db.session.get(ContentItem, quiz_id) is None)
+            check('quiz con respuestas: sin preguntas',
+                  QuizQuestion.query.filter_by(content_item_id=quiz_id).count() == 0)
+            check('quiz con respuestas: sin respuestas',
+                  StudentResponse.query.filter_by(content_item_id=quiz_id).count() == 0)
+
+        response = client.post(f'/instructor/content/delete/{document_id}')
+        check('fragmento: sin el archivo eliminado', 'Archivo de lectura' not in module_page())
+        with app.app_context():
+            check('contenido con respuestas: la ruta redirige', response.status_code == 302)
+            check('contenido con respuestas: contenido eliminado', db.session.get(ContentItem, document_id) is None)
+            check('contenido con respuestas: sin respuestas',
+                  StudentResponse.query.filter_by(content_item_id=document_id).count() == 0)
+            check('contenido con respuestas: archivo borrado del almacén', not os.path.exists(document_blob))
+
+        response = client.post(f'/instructor/content/delete/{shared_id}')
+        with app.app_context():
+            check('archivo compartido: la ruta redirige', response.status_code == 302)
+            check('archivo compartido: el blob se conserva', os.path.exists(shared_blob))
+
+            course = db.session.get(Course, course_id)
+            enrollment = CourseEnrollment.query.filter_by(student_id=student_id, course_id=course_id).one()
+            items = db.session.query(func.count(ContentItem.id)).filter_by(module_id=module_id).scalar()
+            check('contadores: total_content del curso', course.total_content == items == 2)
+            check('contadores: completed_items de la inscripción', enrollment.completed_items == 0)
+    finally:
+        shutil.rmtree(directory)
+
+    failures = 0
+    for name, ok in results:
+        failures += not ok
+        print(f"[{'OK' if ok else 'FALLA'}] {name}")
+    if failures:
+        print(f'{failures} comprobaciones fallaron.')
+        return 1
+    print('Las eliminaciones de contenidos con respuestas funcionan.')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
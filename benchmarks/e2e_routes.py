@@ -0,0 +1,208 @@
+"""Benchmark de extremo a extremo de las rutas principales sobre datos sintéticos.
+
+Genera (o reutiliza) una base SQLite con `synthetic_data.generate_dataset` y recorre las
+rutas reales con el cliente de pruebas de Flask: dashboard del estudiante, contenido del
+curso, envío de un quiz, dashboard del instructor, estudiantes del curso y reportes de
+finalización. Por ruta registra latencia p50/p95, número de consultas SQL y memoria pico
+(medida en una pasada aparte con tracemalloc) y escribe todo en un JSON de referencia.
+Con `--compare` muestra la diferencia contra un JSON anterior.
+
+Uso: python benchmarks/e2e_routes.py [--scale 1k|100k|1m] [--iterations N]
+         [--database ruta.db] [--output baseline.json] [--compare baseline_anterior.json]
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from sqlalchemy import event, func
+
+from app import create_app
+from config import Config
+from models import db, Role, User, Course, Module, ContentItem, CourseEnrollment, StudentResponse
+from synthetic_data import SCALES, generate_dataset
+
+
+def build_app(database):
+    class BenchmarkConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{database}'
+        PERF_BUDGET_MODE = 'log'
+        FRAGMENT_CACHE_BACKEND = 'lru'
+
+    return create_app(BenchmarkConfig)
+
+
+def pick_subjects():
+    """Usuarios y objetos representativos: el estudiante y el instructor con más actividad."""
+    student_id, course_id = (
+        db.session.query(CourseEnrollment.student_id, func.min(CourseEnrollment.course_id))
+        .group_by(CourseEnrollment.student_id)
+        .order_by(func.count().desc())
+        .first()
+    )
+    # Un quiz de sus cursos que aún no aprobó (si no, take_quiz solo redirige)
+    passed = db.session.query(StudentResponse.content_item_id).filter(
+        StudentResponse.student_id == student_id, StudentResponse.score >= 7
+    )
+    quiz_id = (
+        db.session.query(ContentItem.id).join(Module)
+        .join(CourseEnrollment, CourseEnrollment.course_id == Module.course_id)
+        .filter(CourseEnrollment.student_id == student_id, ContentItem.type == 'quiz', ContentItem.id.notin_(passed))
+        .order_by(ContentItem.id).limit(1).scalar()
+    )
+    instructor_id, instructor_course_id = (
+        db.session.query(Course.instructor_id, func.min(Course.id))
+        .group_by(Course.instructor_id)
+        .order_by(func.count().desc())
+        .first()
+    )
+    return {
+        'student_id': student_id, 'course_id': course_id, 'quiz_id': quiz_id,
+        'instructor_id': instructor_id, 'instructor_course_id': instructor_course_id,
+    }
+
+
+def scenarios(subjects):
+    end = datetime.utcnow().date()
+    start = end - timedelta(days=365)
+    dates = f'start_date={start:%Y-%m-%d}&end_date={end:%Y-%m-%d}'
+    student, instructor = subjects['student_id'], subjects['instructor_id']
+    items = [
+        ('student_dashboard', student, 'get', '/student/dashboard', None),
+        ('course_content', student, 'get', f"/student/courses/{subjects['course_id']}", None),
+        ('instructor_dashboard', instructor, 'get', '/instructor/dashboard', None),
+        ('course_students', instructor, 'get', f"/instructor/course/{subjects['instructor_course_id']}/students", None),
+        ('instructor_courses_completed', instructor, 'get', f'/instructor/courses/completed?{dates}', None),
+        ('instructor_courses_completed_csv', instructor, 'get', f'/instructor/courses/completed.csv?{dates}', None),
+        ('instructor_modules_completed', instructor, 'get', f'/instructor/modules/completed?{dates}', None),
+    ]
+    if subjects['quiz_id']:
+        # Respuestas incorrectas: cada envío se guarda y el estudiante puede volver a intentarlo
+        items.append(('take_quiz', student, 'post', f"/student/quiz/{subjects['quiz_id']}/take", {}))
+    return items
+
+
+def run(app, subjects, iterations):
+    statements = []
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+    client = app.test_client()
+
+    def request(user_id, method, url, data):
+        with client.session_transaction() as session:
+            session['_user_id'] = str(user_id)
+            session['_fresh'] = True
+        statements.clear()
+        response = getattr(client, method)(url, data=data)
+        response.get_data()  # consume las respuestas en streaming
+        return response
+
+    results = {}
+    for name, user_id, method, url, data in scenarios(subjects):
+        request(user_id, method, url, data)  # calentamiento (cachés y compilación de plantillas)
+        latencies = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            response = request(user_id, method, url, data)
+            latencies.append((time.perf_counter() - start) * 1000)
+        queries = len(statements)
+
+        tracemalloc.start()
+        request(user_id, method, url, data)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        latencies.sort()
+        results[name] = {
+            'url': url,
+            'status': response.status_code,
+            'p50_ms': round(statistics.median(latencies), 2),
+            'p95_ms': round(latencies[max(0, int(len(latencies) * 0.95) - 1)], 2),
+            'queries': queries,
+            'peak_memory_kb': round(peak / 1024, 1),
+        }
+    return results
+
+
+def dataset_counts():
+    models = (Role, User, Course, Module, ContentItem, CourseEnrollment, StudentResponse)
+    return {model.__tablename__: db.session.query(func.count(model.id)).scalar() for model in models}
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, previous_path):
+    with open(previous_path) as previous_file:
+        previous = json.load(previous_file)['routes']
+    print(f"\nComparación con {previous_path}:")
+    for name, current in results.items():
+        before = previous.get(name)
+        if not before:
+            continue
+        change = (current['p95_ms'] - before['p95_ms']) / before['p95_ms'] * 100 if before['p95_ms'] else 0
+        print(f"  {name:<34} p95 {before['p95_ms']:>8.2f} -> {current['p95_ms']:>8.2f} ms ({change:+.0f}%)"
+              f"  consultas {before['queries']} -> {current['queries']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', choices=list(SCALES), default='1k')
+    parser.add_argument('--iterations', type=int, default=30)
+    parser.add_argument('--database', help='Base SQLite a usar; si no existe se genera (por defecto, temporal).')
+    parser.add_argument('--output', default=os.path.join(ROOT, 'benchmarks', 'baseline.json'))
+    parser.add_argument('--compare', help='JSON de una ejecución anterior.')
+    args = parser.parse_args()
+
+    database = args.database or os.path.join(tempfile.mkdtemp(), 'benchmark.db')
+    generate = not os.path.exists(database)
+    app = build_app(os.path.abspath(database))
+    with app.app_context():
+        if generate:
+            start = time.perf_counter()
+            db.create_all()
+            generate_dataset(args.scale)
+            print(f"Datos '{args.scale}' generados en {time.perf_counter() - start:.1f} s ({database})")
+        counts = dataset_counts()
+        subjects = pick_subjects()
+
+    results = run(app, subjects, args.iterations)
+    for name, result in results.items():
+        print(f"  {name:<34} {result['status']}  p50 {result['p50_ms']:>8.2f} ms  p95 {result['p95_ms']:>8.2f} ms"
+              f"  consultas {result['queries']:>3}  memoria {result['peak_memory_kb']:>9.1f} KB")
+
+    baseline = {
+        'commit': git_commit(),
+        'date': datetime.utcnow().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'scale': args.scale,
+        'iterations': args.iterations,
+        'dataset': counts,
+        'subjects': subjects,
+        'routes': results,
+    }
+    if args.compare:
+        compare(results, args.compare)
+    with open(args.output, 'w') as output_file:
+        json.dump(baseline, output_file, indent=2)
+    print(f"Resultados guardados en {args.output}")
+
+
+if __name__ == '__main__':
+    main()
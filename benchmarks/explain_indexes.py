@@ -0,0 +1,120 @@
+"""Comprueba con EXPLAIN QUERY PLAN que las consultas frecuentes usan un índice.
+
+Crea el esquema de models.py en una base SQLite en memoria, ejecuta EXPLAIN QUERY PLAN
+sobre cada consulta y falla si alguna no usa el índice esperado o necesita ordenar las filas
+en un B-tree temporal (ORDER BY que el índice no resuelve).
+
+Uso: python benchmarks/explain_indexes.py
+"""
+import os
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from sqlalchemy import text
+
+from models import db
+
+# (nombre, consulta, índice esperado)
+HOT_QUERIES = [
+    (
+        'respuestas de un estudiante por contenido',
+        "SELECT id FROM student_responses WHERE student_id = :id AND content_item_id = :id AND completed = 1",
+        'ix_student_responses_student_item_completed_score',
+    ),
+    (
+        'intento aprobado de un quiz (take_quiz)',
+        "SELECT id FROM student_responses WHERE student_id = :id AND content_item_id = :id AND score >= 7",
+        'ix_student_responses_student_item_completed_score',
+    ),
+    (
+        'inscripción de un estudiante en un curso',
+        "SELECT id FROM course_enrollments WHERE student_id = :id AND course_id = :id",
+        'uq_course_enrollments_student_id_course_id',
+    ),
+    (
+        'inscripciones completadas en un rango de fechas',
+        "SELECT id FROM course_enrollments WHERE completed = 1 AND completion_date >= :d AND completion_date < :d",
+        'ix_course_enrollments_completed_completion_date',
+    ),
+    (
+        'quizzes de un módulo ordenados',
+        'SELECT id FROM content_items WHERE module_id = :id AND type = \'quiz\' ORDER BY "order"',
+        'ix_content_items_module_id_type_order',
+    ),
+    (
+        'módulos de un curso ordenados',
+        'SELECT id FROM modules WHERE course_id = :id ORDER BY "order"',
+        'ix_modules_course_id_order',
+    ),
+    (
+        'cursos de un instructor',
+        "SELECT id FROM courses WHERE instructor_id = :id",
+        'ix_courses_instructor_id',
+    ),
+    (
+        'página de usuarios de un rol (view_users)',
+        "SELECT id FROM users WHERE role_id = :id AND id > :id ORDER BY id LIMIT 51",
+        'ix_users_role_id_id',
+    ),
+    (
+        'cursos por prefijo del nombre (manage_courses)',
+        "SELECT id FROM courses WHERE name >= 'Py' AND name < 'Py\uffff' AND (name > 'Py' OR (name = 'Py' AND id > :id)) "
+        "ORDER BY name, id LIMIT 51",
+        'ix_courses_name_id',
+    ),
+    (
+        'usuarios de un rol por prefijo (view_users)',
+        "SELECT id FROM users WHERE role_id = :id AND username >= 'an' AND username < 'an\uffff' "
+        "AND (username > 'an' OR (username = 'an' AND id > :id)) ORDER BY username, id LIMIT 51",
+        'ix_users_role_id_username',
+    ),
+    (
+        'usuarios de un rol por prefijo del correo (view_users)',
+        "SELECT id FROM users WHERE role_id = :id AND email >= 'an@' AND email < 'an@\uffff' "
+        "ORDER BY email DESC, id DESC LIMIT 51",
+        'ix_users_role_id_email',
+    ),
+    (
+        'respuestas de los contenidos eliminados (cascade_deletes)',
+        "DELETE FROM student_responses WHERE content_item_id IN (SELECT id FROM content_items WHERE module_id = :id)",
+        'ix_student_responses_content_item_id',
+    ),
+    (
+        'inscripciones de un curso eliminado (cascade_deletes)',
+        "DELETE FROM course_enrollments WHERE course_id IN (SELECT id FROM courses WHERE instructor_id = :id)",
+        'ix_course_enrollments_course_id',
+    ),
+]
+
+
+def main():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+
+    failures = 0
+    with app.app_context():
+        db.create_all()
+        db.session.execute(text('ANALYZE'))
+        for name, sql, index in HOT_QUERIES:
+            plan = db.session.execute(
+                text(f'EXPLAIN QUERY PLAN {sql}'), {'id': 1, 'd': datetime.utcnow()}
+            ).all()
+            details = ' | '.join(row[-1] for row in plan)
+            ok = index in details and 'TEMP B-TREE' not in details
+            failures += not ok
+            print(f"[{'OK' if ok else 'FALLA'}] {name}: {details}")
+
+    if failures:
+        print(f'{failures} consultas no usan el índice esperado.')
+        return 1
+    print('Todas las consultas frecuentes usan un índice.')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
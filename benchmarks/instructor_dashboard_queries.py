@@ -0,0 +1,113 @@
+"""Benchmark: número de consultas SQL de las métricas del dashboard del instructor.
+
+Genera datos sintéticos en una base SQLite en memoria con un número creciente de
+inscripciones y comprueba que `get_course_metrics` emite siempre las mismas consultas.
+
+Uso: python benchmarks/instructor_dashboard_queries.py
+"""
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from sqlalchemy import event
+
+from models import db, Role, User, Course, Module, ContentItem, CourseEnrollment, StudentResponse
+from metrics import get_course_metrics
+
+SCALES = [10, 100, 1000]
+COURSES = 40
+MODULES_PER_COURSE = 3
+ITEMS_PER_MODULE = 3
+
+
+def create_app():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    return app
+
+
+def seed(students_per_course):
+    db.session.remove()
+    db.drop_all()
+    db.create_all()
+    instructor_role = Role(name='instructor')
+    student_role = Role(name='student')
+    db.session.add_all([instructor_role, student_role])
+    instructor = User(username='instructor', email='instructor@example.com', password='x', role=instructor_role)
+    db.session.add(instructor)
+    students = [
+        User(username=f'student{i}', email=f'student{i}@example.com', password='x', role=student_role)
+        for i in range(students_per_course)
+    ]
+    db.session.add_all(students)
+    db.session.flush()
+
+    for c in range(COURSES):
+        course = Course(name=f'Curso {c}', description='Curso sintético', instructor_id=instructor.id)
+        db.session.add(course)
+        db.session.flush()
+        items = []
+        for m in range(MODULES_PER_COURSE):
+            module = Module(title=f'Módulo {m}', description='Módulo sintético', order=m + 1, course_id=course.id)
+            db.session.add(module)
+            db.session.flush()
+            for i in range(ITEMS_PER_MODULE):
+                item = ContentItem(title=f'Quiz {i}', type='quiz', order=i + 1, module_id=module.id)
+                db.session.add(item)
+                items.append(item)
+        db.session.flush()
+        db.session.bulk_insert_mappings(CourseEnrollment, [
+            {'student_id': s.id, 'course_id': course.id, 'enrollment_date': datetime.utcnow()}
+            for s in students
+        ])
+        db.session.bulk_insert_mappings(StudentResponse, [
+            {'student_id': s.id, 'content_item_id': item.id, 'score': (s.id + item.id) % 11,
+             'completed': True, 'completion_date': datetime.utcnow()}
+            for idx, s in enumerate(students) for item in items[:len(items) - idx % 2]
+        ])
+    db.session.commit()
+    return instructor
+
+
+def count_queries(func, *args):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        start = time.perf_counter()
+        func(*args)
+        elapsed = time.perf_counter() - start
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+    return len(statements), elapsed
+
+
+def main():
+    app = create_app()
+    results = []
+    with app.app_context():
+        for students_per_course in SCALES:
+            instructor = seed(students_per_course)
+            courses = Course.query.filter_by(instructor_id=instructor.id).all()
+            queries, elapsed = count_queries(get_course_metrics, courses)
+            results.append(queries)
+            print(f'inscripciones={students_per_course * COURSES:>6}  consultas={queries}  tiempo={elapsed * 1000:.1f} ms')
+
+    if len(set(results)) != 1:
+        print('ERROR: el número de consultas crece con el número de inscripciones.')
+        return 1
+    print('OK: el número de consultas es constante.')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,142 @@
+"""Comprueba las respuestas por rangos y condicionales de `send_media`.
+
+Sirve cada archivo de `app/static/uploads` con una aplicación mínima y verifica que las
+respuestas completas, parciales (206), multi-rango (multipart/byteranges), condicionales
+(304) y fuera de rango (416) coinciden con el contenido real del archivo.
+
+Uso: python benchmarks/media_ranges.py
+"""
+import os
+import sys
+from datetime import timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from flask import Flask
+from werkzeug.http import parse_options_header, parse_date, http_date
+
+from media import send_media
+
+UPLOAD_FOLDER = os.path.join(ROOT, 'app', 'static', 'uploads')
+
+
+def create_app():
+    app = Flask(__name__)
+
+    @app.route('/media/<path:filename>')
+    def media(filename):
+        return send_media(os.path.join(UPLOAD_FOLDER, filename))
+
+    return app
+
+
+def parse_multipart(body, boundary):
+    """Devuelve una lista de `(content_range, datos)` de un cuerpo multipart/byteranges."""
+    parts = []
+    for chunk in body.split(b'\r\n--' + boundary.encode())[1:]:
+        if chunk.startswith(b'--'):
+            break
+        headers, data = chunk[2:].split(b'\r\n\r\n', 1)
+        content_range = next(
+            line.split(b':', 1)[1].strip().decode()
+            for line in headers.split(b'\r\n') if line.lower().startswith(b'content-range')
+        )
+        parts.append((content_range, data))
+    return parts
+
+
+def check_file(client, filename, data):
+    url = f'/media/{filename}'
+    size = len(data)
+    results = []
+
+    def check(name, ok):
+        results.append((name, ok))
+
+    full = client.get(url)
+    etag = full.headers['ETag']
+    check('completo', full.status_code == 200 and full.data == data)
+
+    partial = client.get(url, headers={'Range': 'bytes=0-99'})
+    check('rango inicial', partial.status_code == 206 and partial.data == data[:100]
+          and partial.headers['Content-Range'] == f'bytes 0-99/{size}')
+
+    suffix = client.get(url, headers={'Range': 'bytes=-100'})
+    check('rango final', suffix.status_code == 206 and suffix.data == data[-100:])
+
+    open_ended = client.get(url, headers={'Range': f'bytes={size // 2}-'})
+    check('rango abierto', open_ended.status_code == 206 and open_ended.data == data[size // 2:])
+
+    multi = client.get(url, headers={'Range': 'bytes=0-9,200-299,-50'})
+    mimetype, options = parse_options_header(multi.headers['Content-Type'])
+    parts = parse_multipart(multi.data, options.get('boundary', '')) if mimetype == 'multipart/byteranges' else []
+    expected = [
+        (f'bytes 0-9/{size}', data[:10]),
+        (f'bytes 200-299/{size}', data[200:300]),
+        (f'bytes {size - 50}-{size - 1}/{size}', data[-50:]),
+    ]
+    check('multi-rango', multi.status_code == 206 and parts == expected
+          and int(multi.headers['Content-Length']) == len(multi.data))
+
+    # Werkzeug descarta los rangos solapados o desordenados: se responde el archivo completo
+    overlapping = client.get(url, headers={'Range': 'bytes=50-149,0-99'})
+    check('rangos solapados', overlapping.status_code == 200 and overlapping.data == data)
+
+    adjacent = client.get(url, headers={'Range': 'bytes=0-99,100-149'})
+    check('rangos contiguos', adjacent.status_code == 206 and adjacent.data == data[:150])
+
+    unsatisfiable = client.get(url, headers={'Range': f'bytes={size}-'})
+    check('fuera de rango', unsatisfiable.status_code == 416
+          and unsatisfiable.headers['Content-Range'] == f'bytes */{size}')
+
+    not_modified = client.get(url, headers={'If-None-Match': etag})
+    check('If-None-Match', not_modified.status_code == 304 and not not_modified.data)
+
+    since = client.get(url, headers={'If-Modified-Since': full.headers['Last-Modified']})
+    check('If-Modified-Since', since.status_code == 304)
+
+    stale_range = client.get(url, headers={'Range': 'bytes=0-99', 'If-Range': '"otro"'})
+    check('If-Range obsoleto', stale_range.status_code == 200 and stale_range.data == data)
+
+    fresh_range = client.get(url, headers={'Range': 'bytes=0-99', 'If-Range': etag})
+    check('If-Range vigente', fresh_range.status_code == 206 and fresh_range.data == data[:100])
+
+    # Con fecha, If-Range solo coincide con la fecha exacta de Last-Modified
+    last_modified = full.headers['Last-Modified']
+    dated_range = client.get(url, headers={'Range': 'bytes=0-99', 'If-Range': last_modified})
+    check('If-Range con Last-Modified', dated_range.status_code == 206 and dated_range.data == data[:100])
+
+    later = http_date(parse_date(last_modified) + timedelta(days=1))
+    later_range = client.get(url, headers={'Range': 'bytes=0-99', 'If-Range': later})
+    check('If-Range con otra fecha', later_range.status_code == 200 and later_range.data == data)
+
+    return results
+
+
+def main():
+    client = create_app().test_client()
+    failures = 0
+    filenames = sorted(
+        name for name in os.listdir(UPLOAD_FOLDER)
+        if os.path.isfile(os.path.join(UPLOAD_FOLDER, name)) and os.path.getsize(os.path.join(UPLOAD_FOLDER, name)) > 300
+    )
+    for filename in filenames:
+        with open(os.path.join(UPLOAD_FOLDER, filename), 'rb') as media_file:
+            data = media_file.read()
+        for name, ok in check_file(client, filename, data):
+            failures += not ok
+            print(f"[{'OK' if ok else 'FALLA'}] {filename}: {name}")
+
+    if not filenames:
+        print('No hay archivos en app/static/uploads para comprobar.')
+        return 1
+    if failures:
+        print(f'{failures} comprobaciones fallaron.')
+        return 1
+    print('Todas las respuestas coinciden con los archivos.')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""Comprueba que `gc-uploads` elimina las subidas por partes abandonadas.
+
+Crea en una carpeta temporal una subida reciente, una abandonada (con una parte ya escrita)
+y un `.part` sin metadatos, envejece las dos últimas y ejecuta `flask gc-uploads`. Solo la
+subida reciente debe seguir existiendo y poder completarse.
+
+Uso: python benchmarks/partial_uploads.py
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+from io import BytesIO
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, chunked_uploads
+from config import Config
+
+MAX_AGE = 3600
+
+
+def build_app(directory):
+    class CheckConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(directory, 'checks.db')}"
+        UPLOAD_FOLDER = os.path.join(directory, 'uploads')
+        PERF_BUDGET_MODE = 'log'
+
+    app = create_app(CheckConfig)
+    # Las subidas de la comprobación no se mezclan con las de instance/
+    chunked_uploads.partial_folder = os.path.join(directory, 'partial_uploads')
+    os.makedirs(chunked_uploads.partial_folder)
+    return app
+
+
+def age(path, seconds):
+    past = time.time() - seconds
+    os.utime(path, (past, past))
+
+
+def main():
+    directory = tempfile.mkdtemp()
+    results = []
+
+    def check(name, ok):
+        results.append((name, ok))
+
+    try:
+        app = build_app(directory)
+        folder = chunked_uploads.partial_folder
+
+        recent = chunked_uploads.create(1, 1, 'reciente.txt', 4)['upload_id']
+        abandoned = chunked_uploads.create(1, 1, 'abandonada.txt', 8)['upload_id']
+        chunked_uploads.write_chunk(abandoned, 0, BytesIO(b'1234'), 4)
+        orphan = os.path.join(folder, 'a' * 32 + '.part')
+        open(orphan, 'wb').close()
+        for name in os.listdir(folder):
+            if not name.startswith(recent):
+                age(os.path.join(folder, name), MAX_AGE + 60)
+        # Metadatos antiguos pero una parte recibida hace poco: la subida sigue activa
+        age(os.path.join(folder, recent + '.json'), MAX_AGE + 60)
+
+        result = app.test_cli_runner().invoke(args=['gc-uploads', '--partial-max-age', str(MAX_AGE)])
+        check('el comando termina sin error', result.exit_code == 0)
+        check('informa las subidas eliminadas', 'Subidas por partes eliminadas: 2.' in result.output)
+        remaining = sorted(os.listdir(folder))
+        check('la subida abandonada se elimina', not any(name.startswith(abandoned) for name in remaining))
+        check('el .part sin metadatos se elimina', not os.path.exists(orphan))
+        check('la subida activa se conserva', remaining == [recent + '.json', recent + '.part'])
+
+        chunked_uploads.write_chunk(recent, 0, BytesIO(b'hola'), 4)
+        with app.app_context():
+            check('la subida activa se completa', chunked_uploads.complete(recent).endswith('.txt'))
+    finally:
+        shutil.rmtree(directory)
+
+    failures = 0
+    for name, ok in results:
+        failures += not ok
+        print(f"[{'OK' if ok else 'FALLA'}] {name}")
+    if failures:
+        print(f'{failures} comprobaciones fallaron.')
+        return 1
+    print('Las subidas por partes abandonadas se eliminan.')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,155 @@
+"""Benchmark: lecturas durante una ráfaga de escrituras en SQLite, con y sin el perfil.
+
+Genera una base en archivo con `synthetic_data` y, durante unos segundos, varios hilos
+escriben respuestas de quiz (lectura + INSERT + UPDATE de la inscripción + COMMIT, como
+`take_quiz`) mientras otros leen el progreso de los estudiantes. Se ejecuta dos veces:
+con los PRAGMAs y el pool por defecto de SQLite y con el perfil de sqlite_profile.py.
+Reporta operaciones por segundo, latencia p95 de las lecturas, errores "database is locked"
+y la mejora de lecturas y escrituras por segundo del perfil.
+
+Uso: python benchmarks/sqlite_concurrency.py [segundos] [lectores] [escritores]
+"""
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func
+from sqlalchemy.exc import OperationalError
+
+from app import create_app
+from config import Config
+from models import db, Course, CourseEnrollment, ContentItem, Module, StudentResponse
+from synthetic_data import generate_dataset
+
+DURATION = 5
+READERS = 8
+WRITERS = 4
+
+
+def build_app(database, profile):
+    class BenchmarkConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{database}'
+        PERF_INSTRUMENTATION = False
+        # Sin perfil: PRAGMAs de fábrica (journal DELETE), pool por defecto y sin espera ante un
+        # bloqueo (el módulo sqlite3 espera 5 s por defecto, lo que ocultaría los errores)
+        SQLITE_PRAGMAS = None if profile else {'journal_mode': 'DELETE'}
+        SQLITE_POOL_OPTIONS = None if profile else {}
+        SQLALCHEMY_ENGINE_OPTIONS = {} if profile else {'connect_args': {'timeout': 0}}
+
+    return create_app(BenchmarkConfig)
+
+
+def prepare(database):
+    app = build_app(database, profile=False)
+    with app.app_context():
+        db.create_all()
+        generate_dataset('1k')
+        enrollments = db.session.query(CourseEnrollment.student_id, CourseEnrollment.course_id).all()
+        items = dict(
+            db.session.query(Module.course_id, func.min(ContentItem.id)).join(ContentItem).group_by(Module.course_id)
+        )
+        db.engine.dispose()
+    return [(student_id, items[course_id], course_id) for student_id, course_id in enrollments if course_id in items]
+
+
+def run(database, profile, targets, duration, readers, writers):
+    app = build_app(database, profile)
+    stop = threading.Event()
+    counts = {'reads': 0, 'writes': 0, 'read_errors': 0, 'write_errors': 0}
+    read_latencies = []
+    lock = threading.Lock()
+
+    def count(key):
+        with lock:
+            counts[key] += 1
+
+    def reader(seed):
+        rng = random.Random(seed)
+        with app.app_context():
+            while not stop.is_set():
+                student_id, _, course_id = rng.choice(targets)
+                start = time.perf_counter()
+                try:
+                    db.session.query(CourseEnrollment.progress, Course.total_content).join(Course).filter(
+                        CourseEnrollment.student_id == student_id
+                    ).all()
+                    db.session.query(func.count(StudentResponse.id)).filter(
+                        StudentResponse.student_id == student_id
+                    ).scalar()
+                    db.session.commit()
+                    count('reads')
+                    read_latencies.append((time.perf_counter() - start) * 1000)
+                except OperationalError:
+                    db.session.rollback()
+                    count('read_errors')
+
+    def writer(seed):
+        rng = random.Random(seed)
+        with app.app_context():
+            while not stop.is_set():
+                student_id, item_id, course_id = rng.choice(targets)
+                try:
+                    enrollment = CourseEnrollment.query.filter_by(student_id=student_id, course_id=course_id).first()
+                    db.session.add(StudentResponse(
+                        student_id=student_id, content_item_id=item_id, response='{}', score=3.0,
+                        completed=False, completion_date=datetime.utcnow()
+                    ))
+                    CourseEnrollment.query.filter_by(id=enrollment.id).update({'progress': CourseEnrollment.progress})
+                    db.session.commit()
+                    count('writes')
+                except OperationalError:
+                    db.session.rollback()
+                    count('write_errors')
+
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+    threads += [threading.Thread(target=writer, args=(1000 + i,)) for i in range(writers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    with app.app_context():
+        db.engine.dispose()
+    read_latencies.sort()
+    counts['read_p95_ms'] = read_latencies[int(len(read_latencies) * 0.95) - 1] if read_latencies else 0
+    counts['read_max_ms'] = read_latencies[-1] if read_latencies else 0
+    return counts
+
+
+def main():
+    duration = float(sys.argv[1]) if len(sys.argv) > 1 else DURATION
+    readers = int(sys.argv[2]) if len(sys.argv) > 2 else READERS
+    writers = int(sys.argv[3]) if len(sys.argv) > 3 else WRITERS
+    directory = tempfile.mkdtemp()
+    try:
+        source = os.path.join(directory, 'source.db')
+        targets = prepare(source)
+        print(f"{readers} lectores, {writers} escritores, {duration:g} s por ejecución")
+        results = {}
+        for profile in (False, True):
+            database = os.path.join(directory, f'profile_{profile}.db')
+            shutil.copy(source, database)
+            counts = results[profile] = run(database, profile, targets, duration, readers, writers)
+            label = 'perfil sqlite_profile' if profile else 'SQLite por defecto'
+            print(f"  {label:<22} lecturas/s {counts['reads'] / duration:>8.0f}"
+                  f"  p95 lectura {counts['read_p95_ms']:>6.1f} ms (máx {counts['read_max_ms']:.0f})"
+                  f"  escrituras/s {counts['writes'] / duration:>7.0f}"
+                  f"  errores de bloqueo: {counts['read_errors']} lectura, {counts['write_errors']} escritura")
+        for key, label in (('writes', 'escrituras/s'), ('reads', 'lecturas/s')):
+            before, after = results[False][key] / duration, results[True][key] / duration
+            gain = f"x{after / before:.1f}" if before else 'sin operaciones sin perfil'
+            print(f"  {label} con el perfil: {before:.0f} -> {after:.0f} ({gain})")
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
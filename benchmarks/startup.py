@@ -0,0 +1,60 @@
+"""Benchmark: tiempo de arranque de la aplicación.
+
+Cada ejecución corre en un proceso nuevo (intérprete limpio) y mide por separado el
+tiempo de `import app`, el de `create_app()` y la latencia de la primera petición a `/`
+con una base SQLite en memoria. Se reporta la mediana de varias ejecuciones.
+
+Uso: python benchmarks/startup.py [ejecuciones]
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUNS = 5
+
+CHILD = """
+import json, time
+start = time.perf_counter()
+import app as application
+imported = time.perf_counter()
+
+from config import Config
+
+class StartupConfig(Config):
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    FRAGMENT_CACHE_BACKEND = 'lru'
+
+flask_app = application.create_app(StartupConfig)
+created = time.perf_counter()
+response = flask_app.test_client().get('/')
+served = time.perf_counter()
+assert response.status_code == 200, response.status_code
+print(json.dumps({
+    'import_ms': (imported - start) * 1000,
+    'create_app_ms': (created - imported) * 1000,
+    'first_request_ms': (served - created) * 1000,
+}))
+"""
+
+
+def run_once():
+    output = subprocess.run(
+        [sys.executable, '-c', CHILD], cwd=ROOT, check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else RUNS
+    results = [run_once() for _ in range(runs)]
+    print(f"Arranque ({runs} ejecuciones, mediana):")
+    for key in ('import_ms', 'create_app_ms', 'first_request_ms'):
+        values = [result[key] for result in results]
+        print(f"  {key:<18} {statistics.median(values):8.1f} ms  (mín {min(values):.1f}, máx {max(values):.1f})")
+
+
+if __name__ == '__main__':
+    main()
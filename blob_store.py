@@ -0,0 +1,162 @@
+import hashlib
+import os
+import secrets
+import shutil
+import time
+
+from models import db, ContentItem
+
+COPY_BUFFER_SIZE = 64 * 1024
+
+
+class BlobStore:
+    """Almacén de archivos direccionado por contenido (SHA-256).
+
+    Cada archivo se guarda una sola vez en `root/ab/cd/<sha256><ext>`; `ContentItem.file_path`
+    guarda esa ruta relativa. Las referencias se cuentan a partir de `ContentItem.file_path`,
+    así que un blob se puede borrar cuando ningún contenido lo usa.
+
+    Una subida que reutiliza un blob existente actualiza su fecha de modificación, y
+    `release` no borra blobs modificados hace menos de `release_grace` segundos: el
+    `ContentItem` que lo va a referenciar puede no estar confirmado todavía. Esos blobs
+    los borra después `gc-uploads`.
+    """
+
+    def __init__(self, root=None, release_grace=600):
+        self.root = root
+        self.release_grace = release_grace
+        self.tmp_folder = None
+        if root is not None:
+            self._create_folders()
+
+    def init_app(self, app):
+        """Usa `UPLOAD_FOLDER` de la aplicación como raíz del almacén."""
+        app.config.setdefault('UPLOAD_RELEASE_GRACE_SECONDS', self.release_grace)
+        self.root = app.config['UPLOAD_FOLDER']
+        self.release_grace = app.config['UPLOAD_RELEASE_GRACE_SECONDS']
+        self._create_folders()
+
+    def _create_folders(self):
+        self.tmp_folder = os.path.join(self.root, '.tmp')
+        os.makedirs(self.tmp_folder, exist_ok=True)
+
+    @staticmethod
+    def relative_path(digest, ext=''):
+        return f'{digest[:2]}/{digest[2:4]}/{digest}{ext.lower()}'
+
+    def absolute_path(self, relative_path):
+        return os.path.join(self.root, *relative_path.split('/'))
+
+    def put_stream(self, stream, filename):
+        """Guarda el contenido de un stream calculando su hash mientras se escribe.
+
+        Devuelve la ruta relativa del blob; si ya existía, no se vuelve a escribir.
+        """
+        tmp_path = os.path.join(self.tmp_folder, secrets.token_hex(16))
+        digest = hashlib.sha256()
+        with open(tmp_path, 'wb') as tmp_file:
+            for block in iter(lambda: stream.read(COPY_BUFFER_SIZE), b''):
+                digest.update(block)
+                tmp_file.write(block)
+        return self._commit(tmp_path, digest.hexdigest(), filename)
+
+    def put_file(self, path, filename, digest=None):
+        """Mueve un archivo ya escrito en disco al almacén (calcula el hash si no se indica)."""
+        if digest is None:
+            hasher = hashlib.sha256()
+            with open(path, 'rb') as source:
+                for block in iter(lambda: source.read(COPY_BUFFER_SIZE), b''):
+                    hasher.update(block)
+            digest = hasher.hexdigest()
+        return self._commit(path, digest, filename)
+
+    def _commit(self, source_path, digest, filename):
+        relative_path = self.relative_path(digest, os.path.splitext(filename)[1])
+        target_path = self.absolute_path(relative_path)
+        try:
+            # El blob ya existe: no se escribe de nuevo, pero se marca como reciente para
+            # que `release` no lo borre antes de que se guarde la nueva referencia
+            os.utime(target_path)
+        except FileNotFoundError:
+            os.makedirs(os.path.dirname(target_path), exist_ok=True)
+            shutil.move(source_path, target_path)
+        else:
+            os.remove(source_path)
+        return relative_path
+
+    def is_blob(self, relative_path):
+        parts = (relative_path or '').split('/')
+        return len(parts) == 3 and len(parts[0]) == 2 and len(parts[1]) == 2 and parts[2].startswith(parts[0] + parts[1])
+
+    def digest(self, relative_path):
+        """SHA-256 de un blob a partir de su ruta, o None si no es una ruta del almacén."""
+        if not self.is_blob(relative_path):
+            return None
+        return os.path.splitext(relative_path.rsplit('/', 1)[1])[0]
+
+    def references(self, relative_paths):
+        """Número de contenidos que referencian cada ruta."""
+        counts = dict(
+            db.session.query(ContentItem.file_path, db.func.count(ContentItem.id))
+            .filter(ContentItem.file_path.in_(relative_paths))
+            .group_by(ContentItem.file_path)
+            .all()
+        )
+        return {path: counts.get(path, 0) for path in relative_paths}
+
+    def release(self, relative_paths, min_age=None):
+        """Borra los blobs indicados que ya no tengan referencias. Devuelve los borrados.
+
+        Se conservan los modificados hace menos de `min_age` segundos (por defecto
+        `release_grace`).
+        """
+        relative_paths = {path for path in relative_paths if self.is_blob(path)}
+        if not relative_paths:
+            return []
+        # La fecha se lee después de contar referencias: una reutilización anterior a ese
+        # instante ya se ve aquí aunque su contenido no esté confirmado
+        cutoff = time.time() - (self.release_grace if min_age is None else min_age)
+        removed = []
+        for path, count in self.references(relative_paths).items():
+            if count == 0 and self._modified_before(path, cutoff) and self._remove(path):
+                removed.append(path)
+        return removed
+
+    def collect_garbage(self, min_age=3600):
+        """Recorre el almacén y borra los blobs sin referencias.
+
+        Se ignoran los blobs más recientes que `min_age` segundos, que pueden pertenecer a una
+        subida cuyo `ContentItem` aún no se ha guardado.
+        """
+        candidates = []
+        cutoff = time.time() - min_age
+        # Temporales de escrituras interrumpidas
+        for name in os.listdir(self.tmp_folder):
+            tmp_path = os.path.join(self.tmp_folder, name)
+            if os.path.getmtime(tmp_path) < cutoff:
+                os.remove(tmp_path)
+        for shard in os.listdir(self.root):
+            shard_path = os.path.join(self.root, shard)
+            if len(shard) != 2 or not os.path.isdir(shard_path):
+                continue
+            for sub_shard in os.listdir(shard_path):
+                sub_shard_path = os.path.join(shard_path, sub_shard)
+                if not os.path.isdir(sub_shard_path):
+                    continue
+                for name in os.listdir(sub_shard_path):
+                    if os.path.getmtime(os.path.join(sub_shard_path, name)) < cutoff:
+                        candidates.append(f'{shard}/{sub_shard}/{name}')
+        return self.release(candidates, min_age=min_age)
+
+    def _modified_before(self, relative_path, cutoff):
+        try:
+            return os.path.getmtime(self.absolute_path(relative_path)) < cutoff
+        except FileNotFoundError:
+            return False
+
+    def _remove(self, relative_path):
+        try:
+            os.remove(self.absolute_path(relative_path))
+        except FileNotFoundError:
+            return False
+        return True
@@ -0,0 +1,187 @@
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import select, delete, update, func, case, or_
+
+from models import db, User, Course, Module, ContentItem, QuizQuestion, CourseEnrollment, StudentResponse
+from catalog_search import reindex_course, deindex_courses
+
+# Lo que hay que limpiar fuera de la base después del commit
+DeletedContent = namedtuple('DeletedContent', ['file_paths', 'quiz_ids'])
+
+
+def _execute(statement):
+    # Sentencias por conjuntos: sin sincronizar la sesión (evita cargar o devolver las filas borradas)
+    return db.session.execute(statement.execution_options(synchronize_session=False))
+
+
+def _collect(items):
+    """Archivos y quizzes de los contenidos que se van a eliminar (una consulta)."""
+    rows = db.session.execute(
+        select(ContentItem.id, ContentItem.type, ContentItem.file_path)
+        .where(ContentItem.id.in_(items), or_(ContentItem.type == 'quiz', ContentItem.file_path.isnot(None)))
+    ).all()
+    return DeletedContent(
+        file_paths=[file_path for _, _, file_path in rows if file_path],
+        quiz_ids=[item_id for item_id, item_type, _ in rows if item_type == 'quiz'],
+    )
+
+
+def _delete_items(items):
+    """Respuestas, preguntas y contenidos de `items` (subconsulta de ids), en orden de dependencia."""
+    _execute(delete(StudentResponse).where(StudentResponse.content_item_id.in_(items)))
+    _execute(delete(QuizQuestion).where(QuizQuestion.content_item_id.in_(items)))
+    _execute(delete(ContentItem).where(ContentItem.id.in_(items)))
+
+
+def _delete_courses(courses):
+    """Elimina los cursos de la subconsulta `courses` con todo su contenido."""
+    modules = select(Module.id).where(Module.course_id.in_(courses))
+    items = select(ContentItem.id).where(ContentItem.module_id.in_(modules))
+    deleted = _collect(items)
+    deindex_courses(db.session.connection(), courses)
+    _delete_items(items)
+    _execute(delete(Module).where(Module.course_id.in_(courses)))
+    _execute(delete(CourseEnrollment).where(CourseEnrollment.course_id.in_(courses)))
+    _execute(delete(Course).where(Course.id.in_(courses)))
+    return deleted
+
+
+# Las funciones siguientes eliminan con sentencias DELETE por conjuntos, en orden de dependencia
+# y sin cargar objetos: el número de sentencias no depende del tamaño del árbol. Los eventos
+# del ORM no se disparan, así que aquí se mantienen los contadores y el índice de búsqueda.
+# No hacen commit: quien llama confirma la transacción y después limpia lo devuelto.
+
+def delete_courses(course_ids):
+    """Elimina los cursos con sus módulos, contenidos, preguntas, respuestas e inscripciones."""
+    return _delete_courses(select(Course.id).where(Course.id.in_(course_ids)))
+
+
+def _discount_items(course_id, items):
+    """Descuenta `items` de los contadores del curso: mismos ajustes que los eventos de ContentItem."""
+    item_count = db.session.execute(select(func.count()).select_from(items.subquery())).scalar()
+    _execute(
+        update(Course).where(Course.id == course_id)
+        .values(total_content=Course.total_content - item_count)
+    )
+    completed_in_items = (
+        select(func.count(func.distinct(StudentResponse.content_item_id)))
+        .where(
+            StudentResponse.student_id == CourseEnrollment.student_id,
+            StudentResponse.completed == True,
+            StudentResponse.content_item_id.in_(items)
+        )
+        .scalar_subquery()
+    )
+    _execute(
+        update(CourseEnrollment)
+        .where(CourseEnrollment.course_id == course_id)
+        .values(completed_items=case(
+            (completed_in_items > CourseEnrollment.completed_items, 0),
+            else_=CourseEnrollment.completed_items - completed_in_items
+        ))
+    )
+
+
+def delete_content_item(item_id):
+    """Elimina el contenido (o quiz) con sus preguntas y respuestas y lo descuenta del curso."""
+    item = db.session.execute(
+        select(ContentItem.id, ContentItem.module_id, Module.course_id)
+        .join(Module, Module.id == ContentItem.module_id)
+        .where(ContentItem.id == item_id)
+    ).one()
+    items = select(ContentItem.id).where(ContentItem.id == item.id)
+    deleted = _collect(items)
+    _discount_items(item.course_id, items)
+    _delete_items(items)
+    # Nueva versión del módulo: su fragmento cacheado deja de usarse
+    _execute(
+        update(Module).where(Module.id == item.module_id)
+        .values(content_version=Module.content_version + 1)
+    )
+    reindex_course(db.session.connection(), item.course_id)
+    return deleted
+
+
+def delete_module_tree(module_id):
+    """Elimina el módulo y sus contenidos, y descuenta esos contenidos de los contadores del curso."""
+    module = db.session.execute(select(Module.id, Module.course_id).where(Module.id == module_id)).one()
+    items = select(ContentItem.id).where(ContentItem.module_id == module.id)
+    deleted = _collect(items)
+    _discount_items(module.course_id, items)
+    _delete_items(items)
+    _execute(delete(Module).where(Module.id == module.id))
+    reindex_course(db.session.connection(), module.course_id)
+    return deleted
+
+
+def delete_user_tree(user_id):
+    """Elimina al usuario, los cursos que enseña y sus inscripciones y respuestas como estudiante."""
+    deleted = _delete_courses(select(Course.id).where(Course.instructor_id == user_id))
+    _execute(delete(StudentResponse).where(StudentResponse.student_id == user_id))
+    _execute(delete(CourseEnrollment).where(CourseEnrollment.student_id == user_id))
+    _execute(delete(User).where(User.id == user_id))
+    return deleted
+
+
+def course_responses(course_ids=None, instructor_id=None, module_id=None):
+    """Número de respuestas de estudiantes bajo cursos, los cursos de un instructor o un módulo."""
+    query = select(func.count(StudentResponse.id)).join(ContentItem).join(Module)
+    if module_id is not None:
+        query = query.where(Module.id == module_id)
+    elif instructor_id is not None:
+        query = query.join(Course).where(Course.instructor_id == instructor_id)
+    else:
+        query = query.where(Module.course_id.in_(course_ids))
+    return db.session.execute(query).scalar()
+
+
+def user_tree_rows(user_id):
+    """Filas de respuestas e inscripciones que elimina `delete_user_tree`: las de los cursos que
+    enseña y las propias como estudiante."""
+    own_rows = db.session.execute(
+        select(
+            select(func.count(StudentResponse.id)).where(StudentResponse.student_id == user_id).scalar_subquery()
+            + select(func.count(CourseEnrollment.id)).where(CourseEnrollment.student_id == user_id).scalar_subquery()
+        )
+    ).scalar()
+    return course_responses(instructor_id=user_id) + own_rows
+
+
+class BackgroundDeletes:
+    """Ejecuta las eliminaciones grandes en un hilo aparte, una a la vez.
+
+    Una eliminación se envía al hilo cuando el árbol tiene más respuestas de estudiantes (para
+    un usuario, también sus inscripciones) que CASCADE_DELETE_BACKGROUND_THRESHOLD (None: siempre en la petición). Los trabajos viven en
+    la memoria del proceso: si el proceso termina antes, la eliminación no se hace.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self._executor = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('CASCADE_DELETE_BACKGROUND_THRESHOLD', None)
+        self.app = app
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='cascade-delete')
+
+    def should_defer(self, responses):
+        threshold = self.app.config['CASCADE_DELETE_BACKGROUND_THRESHOLD']
+        return threshold is not None and responses > threshold
+
+    def submit(self, job, args, on_deleted):
+        """Ejecuta `job(*args)` y el commit en el hilo; luego `on_deleted(resultado)`."""
+        def run():
+            with self.app.app_context():
+                try:
+                    deleted = job(*args)
+                    db.session.commit()
+                    on_deleted(deleted)
+                except Exception:
+                    db.session.rollback()
+                    self.app.logger.exception('Error en la eliminación en segundo plano %s%r', job.__name__, args)
+                finally:
+                    db.session.remove()
+        return self._executor.submit(run)
@@ -0,0 +1,172 @@
+import re
+
+from sqlalchemy import event, inspect, select, delete, func, and_, text, table, column, literal_column
+
+from models import db, Course, Module, ContentItem, CourseEnrollment
+from reports import ReportPage
+
+# Una fila por curso (rowid = id del curso). Solo existe en SQLite; en otros motores la
+# búsqueda usa LIKE sobre el nombre y la descripción.
+CREATE_INDEX_SQL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS course_search USING fts5("
+    "name, description, modules, content, tokenize = 'unicode61 remove_diacritics 2')"
+)
+
+# Pesos de bm25 por columna: nombre, descripción, títulos de módulos, contenidos de texto
+RANK_WEIGHTS = (10.0, 5.0, 2.0, 1.0)
+
+_DELETE_SQL = text("DELETE FROM course_search WHERE rowid = :course_id")
+_INSERT_SQL = text("""
+    INSERT INTO course_search (rowid, name, description, modules, content)
+    SELECT courses.id, courses.name, courses.description,
+        (SELECT group_concat(modules.title, ' ') FROM modules WHERE modules.course_id = courses.id),
+        (SELECT group_concat(content_items.title || ' ' || coalesce(content_items.content, ''), ' ')
+         FROM content_items JOIN modules ON content_items.module_id = modules.id
+         WHERE modules.course_id = courses.id AND content_items.type = 'text')
+    FROM courses
+    WHERE courses.id = :course_id OR :course_id IS NULL
+""")
+
+course_search = table('course_search', column('rowid'))
+
+
+def _uses_fts(connection):
+    return connection.dialect.name == 'sqlite'
+
+
+def create_search_index(connection):
+    if _uses_fts(connection):
+        connection.execute(text(CREATE_INDEX_SQL))
+
+
+def rebuild_search_index(connection):
+    """Reconstruye el índice completo. Devuelve el número de cursos indexados."""
+    if not _uses_fts(connection):
+        return 0
+    create_search_index(connection)
+    connection.execute(text("DELETE FROM course_search"))
+    connection.execute(_INSERT_SQL, {'course_id': None})
+    return connection.execute(text("SELECT count(*) FROM course_search")).scalar()
+
+
+def reindex_course(connection, course_id):
+    """Vuelve a generar la fila del curso (o la elimina si el curso ya no existe)."""
+    if course_id is None or not _uses_fts(connection):
+        return
+    connection.execute(_DELETE_SQL, {'course_id': course_id})
+    connection.execute(_INSERT_SQL, {'course_id': course_id})
+
+
+def deindex_courses(connection, course_ids):
+    """Elimina del índice los cursos indicados (lista o subconsulta de ids) en una sentencia."""
+    if _uses_fts(connection):
+        connection.execute(delete(course_search).where(course_search.c.rowid.in_(course_ids)))
+
+
+def _match_expression(query):
+    """Convierte el texto del usuario en una consulta FTS5: todas las palabras, como prefijo."""
+    words = re.findall(r'\w+', query)
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def search_catalog(student_id, query=None, page=1, per_page=12):
+    """Cursos en los que el estudiante no está inscrito, ordenados por relevancia si hay búsqueda.
+
+    Las inscripciones se excluyen con un anti-join (LEFT JOIN ... IS NULL) y el total para la
+    paginación sale de una función de ventana, así que cada página es una sola consulta.
+    """
+    statement = (
+        select(Course, func.count().over().label('total_rows'))
+        .outerjoin(CourseEnrollment, and_(
+            CourseEnrollment.course_id == Course.id,
+            CourseEnrollment.student_id == student_id
+        ))
+        .where(CourseEnrollment.id.is_(None))
+    )
+
+    match = _match_expression(query or '')
+    if match and _uses_fts(db.session.connection()):
+        # bm25() solo puede evaluarse en la consulta que hace el MATCH: se calcula en una subconsulta
+        matches = (
+            select(
+                course_search.c.rowid.label('course_id'),
+                func.bm25(literal_column('course_search'), *RANK_WEIGHTS).label('rank')
+            )
+            .where(literal_column('course_search').op('MATCH')(match))
+            .subquery()
+        )
+        statement = (
+            statement
+            .join(matches, matches.c.course_id == Course.id)
+            .order_by(matches.c.rank, Course.id)
+        )
+    elif match:
+        pattern = f'%{query.strip()}%'
+        statement = statement.where(Course.name.ilike(pattern) | Course.description.ilike(pattern)).order_by(Course.id)
+    else:
+        statement = statement.order_by(Course.id)
+
+    rows = db.session.execute(statement.limit(per_page).offset((page - 1) * per_page)).all()
+    total = rows[0].total_rows if rows else 0
+    return ReportPage([course for course, _ in rows], total, page, per_page)
+
+
+# -------------------- Sincronización del índice -------------------- #
+
+@event.listens_for(db.metadata, 'after_create')
+def _create_index_with_schema(target, connection, **kw):
+    create_search_index(connection)
+
+
+@event.listens_for(db.metadata, 'before_drop')
+def _drop_index_with_schema(target, connection, **kw):
+    if _uses_fts(connection):
+        connection.execute(text("DROP TABLE IF EXISTS course_search"))
+
+
+@event.listens_for(Course, 'after_insert')
+@event.listens_for(Course, 'after_update')
+@event.listens_for(Course, 'after_delete')
+@event.listens_for(Module, 'after_insert')
+@event.listens_for(Module, 'after_update')
+@event.listens_for(Module, 'after_delete')
+def _reindex_course_of(mapper, connection, target):
+    if isinstance(target, Course):
+        reindex_course(connection, target.id)
+        return
+    # Un módulo movido a otro curso también sale del índice del curso anterior
+    for course_id in _current_and_previous(target, 'course_id'):
+        reindex_course(connection, course_id)
+
+
+@event.listens_for(ContentItem, 'after_insert')
+@event.listens_for(ContentItem, 'after_update')
+@event.listens_for(ContentItem, 'after_delete')
+def _reindex_course_of_content(mapper, connection, target):
+    # Solo los contenidos de texto forman parte del índice: antes o después del cambio
+    if 'text' not in _current_and_previous(target, 'type'):
+        return
+    module_ids = _current_and_previous(target, 'module_id')
+    course_ids = connection.execute(
+        select(Module.course_id).where(Module.id.in_(module_ids)).distinct()
+    ).scalars().all()
+    for course_id in course_ids:
+        reindex_course(connection, course_id)
+
+
+def _current_and_previous(target, attribute):
+    """Valor actual del atributo y el que tenía antes de este flush (si cambió)."""
+    history = inspect(target).attrs[attribute].history
+    values = {getattr(target, attribute), *history.deleted}
+    values.discard(None)
+    return values
+
+
+def _load_previous_value(target, value, oldvalue, initiator):
+    pass
+
+
+# active_history: al asignar estos atributos se carga antes el valor anterior (aunque el objeto
+# esté expirado tras un commit), para que `_current_and_previous` lo encuentre en el historial
+for _attribute in (ContentItem.type, ContentItem.module_id, Module.course_id):
+    event.listen(_attribute, 'set', _load_previous_value, active_history=True)
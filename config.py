@@ -1,11 +1,86 @@
-# config.py
 import os
 
 class Config:
     SECRET_KEY = 'supersecretkey'
     SQLALCHEMY_DATABASE_URI = 'sqlite:///cursos.db'  # Asegúrate de que el URI esté correcto
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Perfil SQLite (sqlite_profile.py): PRAGMAs por conexión y opciones del pool para bases en archivo.
+    # None usa los valores por defecto; {} los desactiva.
+    SQLITE_PRAGMAS = None
+    SQLITE_POOL_OPTIONS = None
+    # Réplica de solo lectura para las vistas `read_only` (db_routing.py), por ejemplo
+    # {'replica': 'sqlite:///cursos_replica.db'} sincronizada con `flask replicate-db --interval 2`.
+    SQLALCHEMY_BINDS = {}
+    # Segundos que un cliente sigue leyendo del primario después de escribir
+    DB_REPLICA_STICKY_SECONDS = 5
+    # Respuestas de estudiantes a partir de las cuales un curso, módulo o usuario se elimina en
+    # segundo plano (cascade_deletes.BackgroundDeletes); None elimina siempre en la petición
+    CASCADE_DELETE_BACKGROUND_THRESHOLD = 200000
     WTF_CSRF_ENABLED = False  
 
+    MAX_CONTENT_LENGTH = 16 * 1024 * 1024
+
+    # Tamaño máximo de cada parte en las subidas por partes (menor que MAX_CONTENT_LENGTH)
+    UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+
+    # Segundos durante los que un blob recién escrito o reutilizado no se borra al quedar sin
+    # referencias (puede haber una subida sin confirmar); después lo borra `flask gc-uploads`
+    UPLOAD_RELEASE_GRACE_SECONDS = 600
+
+    # Segundos de caché en el navegador para los archivos subidos (su contenido no cambia)
+    MEDIA_MAX_AGE = 365 * 24 * 3600
+
+    # Entrega de archivos: 'stream' (el proceso lee en bloques de MEDIA_STREAM_CHUNK_SIZE),
+    # 'x-accel-redirect' (nginx, location interna MEDIA_ACCEL_PREFIX) o 'x-sendfile'.
+    # Ejemplo nginx: location /_protected_uploads/ { internal; alias <raíz>/app/static/uploads/; }
+    MEDIA_DELIVERY = 'stream'
+    MEDIA_ACCEL_PREFIX = '/_protected_uploads/'
+    MEDIA_STREAM_CHUNK_SIZE = 64 * 1024
+
+    # Segundos que se guarda en caché el usuario de la sesión (0 = desactivado)
+    USER_CACHE_TTL = 0
+
+    # Segundos que otros procesos pueden servir un quiz compilado antes de recargarlo
+    QUIZ_CACHE_TTL = 300
+
+    # Hash de contraseñas: hilos de bcrypt, trabajos en espera y segundos máximos por trabajo
+    PASSWORD_HASH_WORKERS = 4
+    PASSWORD_HASH_QUEUE = 16
+    PASSWORD_HASH_TIMEOUT = 10
+
+    # Importación masiva de usuarios: filas por transacción y procesos para los hashes (None = CPUs)
+    USER_IMPORT_BATCH_SIZE = 500
+    USER_IMPORT_PROCESSES = None
+
+    # Intentos de inicio de sesión: capacidad de la cubeta y fichas recuperadas por segundo
+    LOGIN_USER_CAPACITY = 5
+    LOGIN_USER_REFILL = 5 / 60
+    LOGIN_IP_CAPACITY = 30
+    LOGIN_IP_REFILL = 30 / 60
+
+    # Caché del contenido renderizado de los módulos: 'lru' (por proceso), 'filesystem' o
+    # 'sqlite' (compartidas entre procesos, en FRAGMENT_CACHE_PATH o en instance/); None la desactiva
+    FRAGMENT_CACHE_BACKEND = 'lru'
+    FRAGMENT_CACHE_PATH = None
+    FRAGMENT_CACHE_MAX_ENTRIES = 1000
+
+    # Instrumentación de rendimiento (consultas SQL y tiempos por endpoint)
+    PERF_INSTRUMENTATION = True
+    PERF_SLOW_QUERY_MS = 100
+    PERF_BUDGET_MODE = None  # 'log' o 'raise'; por defecto 'raise' solo en TESTING
+    PERF_QUERY_BUDGETS = {
+        'main.instructor_dashboard': 10,
+        'main.view_course': 8,
+        'main.course_details': 8,
+        'main.module_details': 8,
+        'main.course_content': 8,
+        'main.view_module_content': 8,
+        'main.edit_quiz': 10,
+        'main.take_quiz': 12,
+        'main.instructor_modules_completed': 6,
+        'main.view_users': 3,
+        'main.manage_courses': 3,
+    }
+
 
 
@@ -0,0 +1,91 @@
+import sqlite3
+import time
+from functools import wraps
+
+import sqlalchemy as sa
+from flask import current_app, g, request, session, has_request_context
+from flask_sqlalchemy.session import Session
+
+# Clave de SQLALCHEMY_BINDS de la réplica de solo lectura
+REPLICA_BIND = 'replica'
+# Clave de la sesión de Flask con el instante hasta el que el cliente lee del primario
+STICKY_SESSION_KEY = '_db_primary_until'
+READ_METHODS = ('GET', 'HEAD')
+
+
+class RoutingSession(Session):
+    """Sesión que envía a la réplica las lecturas de las vistas marcadas con `read_only`.
+
+    Las escrituras (flush y sentencias INSERT/UPDATE/DELETE) y todas las consultas fuera de
+    esas vistas van al primario. Sin bind 'replica' configurado se comporta como la sesión
+    de Flask-SQLAlchemy.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and has_request_context():
+            if self._flushing or isinstance(clause, sa.UpdateBase):
+                g.db_wrote = True
+            elif g.get('db_read_only') and REPLICA_BIND in self._db.engines:
+                return self._db.engines[REPLICA_BIND]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def read_only(view):
+    """Marca una vista cuyas consultas GET pueden leerse de la réplica.
+
+    Durante DB_REPLICA_STICKY_SECONDS después de una escritura del propio cliente, sus
+    lecturas siguen en el primario para que vea sus cambios aunque la réplica vaya atrasada.
+    """
+    @wraps(view)
+    def decorated_view(*args, **kwargs):
+        if request.method in READ_METHODS and session.get(STICKY_SESSION_KEY, 0) <= time.time():
+            g.db_read_only = True
+        return view(*args, **kwargs)
+    return decorated_view
+
+
+class ReplicaRouting:
+    """Configura la réplica: sin escrituras posibles en ella y la ventana de lectura propia."""
+
+    def __init__(self, app=None, db=None):
+        if app is not None:
+            self.init_app(app, db)
+
+    def init_app(self, app, db):
+        app.config.setdefault('DB_REPLICA_STICKY_SECONDS', 5)
+        app.after_request(self._remember_write)
+        with app.app_context():
+            replica = db.engines.get(REPLICA_BIND)
+        if replica is not None and replica.dialect.name == 'sqlite':
+            sa.event.listen(replica, 'connect', _set_query_only)
+
+    @staticmethod
+    def _remember_write(response):
+        if g.get('db_wrote'):
+            session[STICKY_SESSION_KEY] = time.time() + current_app.config['DB_REPLICA_STICKY_SECONDS']
+        return response
+
+
+def _set_query_only(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute('PRAGMA query_only=ON')
+    finally:
+        cursor.close()
+
+
+def replicate(source, target):
+    """Copia la base primaria sobre la réplica con la API de backup de SQLite.
+
+    Es un sustituto local de la replicación real, para probar el enrutamiento con dos
+    archivos; cada llamada deja la réplica igual al primario en ese instante.
+    """
+    if source.dialect.name != 'sqlite' or target.dialect.name != 'sqlite':
+        raise ValueError('La replicación local solo admite bases SQLite.')
+    source_connection = source.raw_connection()
+    target_connection = sqlite3.connect(target.url.database)
+    try:
+        source_connection.driver_connection.backup(target_connection)
+    finally:
+        target_connection.close()
+        source_connection.close()
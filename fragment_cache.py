@@ -0,0 +1,140 @@
+import hashlib
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+
+from markupsafe import Markup
+
+
+class LRUBackend:
+    """Fragmentos en memoria del proceso, con un máximo de entradas (LRU)."""
+
+    def __init__(self, max_entries=1000):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class FileSystemBackend:
+    """Fragmentos en un directorio compartido entre procesos (un archivo por clave)."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha1(key.encode()).hexdigest())
+
+    def get(self, key):
+        try:
+            with open(self._path(key), encoding='utf-8') as fragment_file:
+                return fragment_file.read()
+        except FileNotFoundError:
+            return None
+
+    def set(self, key, value):
+        path = self._path(key)
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as fragment_file:
+            fragment_file.write(value)
+        os.replace(tmp_path, path)
+
+    def clear(self):
+        for name in os.listdir(self.directory):
+            os.remove(os.path.join(self.directory, name))
+
+
+class SQLiteBackend:
+    """Fragmentos en una base SQLite compartida entre procesos."""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        with self._connection() as connection:
+            connection.execute('CREATE TABLE IF NOT EXISTS fragments (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5)
+            connection.execute('PRAGMA journal_mode=WAL')
+            self._local.connection = connection
+        return connection
+
+    def get(self, key):
+        row = self._connection().execute('SELECT value FROM fragments WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    def set(self, key, value):
+        with self._connection() as connection:
+            connection.execute('INSERT OR REPLACE INTO fragments (key, value) VALUES (?, ?)', (key, value))
+
+    def clear(self):
+        with self._connection() as connection:
+            connection.execute('DELETE FROM fragments')
+
+
+def create_backend(name, path=None, max_entries=1000):
+    """Crea el backend configurado en `FRAGMENT_CACHE_BACKEND` (None desactiva la caché)."""
+    if not name:
+        return None
+    if name == 'lru':
+        return LRUBackend(max_entries)
+    if name == 'filesystem':
+        return FileSystemBackend(path)
+    if name == 'sqlite':
+        return SQLiteBackend(path)
+    raise ValueError(f'Backend de caché de fragmentos desconocido: {name}')
+
+
+class FragmentCache:
+    """Caché de HTML renderizado, validado por una versión.
+
+    Cada clave guarda un único fragmento junto con la versión con la que se renderizó; si la
+    versión actual es otra, se vuelve a renderizar y se reemplaza. La versión se lee antes de
+    renderizar, así que un fragmento nunca queda guardado con una versión más nueva que su
+    contenido.
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend
+
+    def get_or_render(self, key, version, render):
+        if self.backend is None:
+            return Markup(render())
+
+        cached = self.backend.get(key)
+        if cached is not None:
+            cached_version, _, html = cached.partition('\n')
+            if cached_version == str(version):
+                return Markup(html)
+
+        html = render()
+        self.backend.set(key, f'{version}\n{html}')
+        return Markup(html)
+
+    def clear(self):
+        if self.backend is not None:
+            self.backend.clear()
+
+
+fragment_cache = FragmentCache()
@@ -0,0 +1,177 @@
+import threading
+import time
+from collections import deque
+from functools import partial
+
+from flask import g, request, has_request_context, before_render_template, template_rendered
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class QueryBudgetExceeded(Exception):
+    """Se lanza en modo prueba cuando una ruta supera su presupuesto de consultas."""
+
+
+class EndpointStats:
+    """Métricas acumuladas de un endpoint."""
+
+    def __init__(self, max_samples):
+        self.requests = 0
+        self.statements = 0
+        self.max_statements = 0
+        self.db_time = 0.0
+        self.render_time = 0.0
+        self.total_time = 0.0
+        self.budget_exceeded = 0
+        self.slow_queries = deque(maxlen=max_samples)
+
+    def to_dict(self):
+        requests = self.requests or 1
+        return {
+            'requests': self.requests,
+            'avg_statements': round(self.statements / requests, 2),
+            'max_statements': self.max_statements,
+            'avg_db_ms': round(self.db_time * 1000 / requests, 2),
+            'avg_render_ms': round(self.render_time * 1000 / requests, 2),
+            'avg_total_ms': round(self.total_time * 1000 / requests, 2),
+            'budget_exceeded': self.budget_exceeded,
+            'slow_queries': list(self.slow_queries),
+        }
+
+
+class PerfInstrumentation:
+    """Registra por endpoint el número de consultas SQL, el tiempo de base de datos y de render.
+
+    Configuración:
+        PERF_INSTRUMENTATION: activa o desactiva la instrumentación.
+        PERF_SLOW_QUERY_MS: umbral para guardar muestras de consultas lentas.
+        PERF_SLOW_QUERY_SAMPLES: número de muestras guardadas por endpoint.
+        PERF_QUERY_BUDGETS: diccionario {endpoint: máximo de consultas}.
+        PERF_BUDGET_MODE: 'log' o 'raise'; por defecto 'raise' cuando la app está en TESTING.
+    """
+
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self._stats = {}
+        self.app = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('PERF_INSTRUMENTATION', True)
+        app.config.setdefault('PERF_SLOW_QUERY_MS', 100)
+        app.config.setdefault('PERF_SLOW_QUERY_SAMPLES', 10)
+        app.config.setdefault('PERF_QUERY_BUDGETS', {})
+        app.config.setdefault('PERF_BUDGET_MODE', None)
+        app.extensions['perf_instrumentation'] = self
+        self.app = app
+
+        if not app.config['PERF_INSTRUMENTATION']:
+            return
+
+        event.listen(Engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', self._after_cursor_execute)
+        before_render_template.connect(self._before_render, app)
+        template_rendered.connect(self._after_render, app)
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+
+    # -------------------- Eventos de SQLAlchemy -------------------- #
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if has_request_context() and 'perf' in g:
+            conn.info.setdefault('perf_query_start', []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if not (has_request_context() and 'perf' in g):
+            return
+        starts = conn.info.get('perf_query_start')
+        if not starts:
+            return
+        elapsed = time.perf_counter() - starts.pop()
+        g.perf['statements'] += 1
+        g.perf['db_time'] += elapsed
+        if elapsed * 1000 >= self.app.config['PERF_SLOW_QUERY_MS']:
+            g.perf['slow_queries'].append({'statement': statement, 'ms': round(elapsed * 1000, 2)})
+
+    # -------------------- Eventos de Flask -------------------- #
+
+    def _before_render(self, sender, template, context, **extra):
+        if 'perf' in g:
+            g.perf['render_start'].append(time.perf_counter())
+
+    def _after_render(self, sender, template, context, **extra):
+        if 'perf' in g and g.perf['render_start']:
+            g.perf['render_time'] += time.perf_counter() - g.perf['render_start'].pop()
+
+    def _start_request(self):
+        g.perf = {
+            'start': time.perf_counter(),
+            'statements': 0,
+            'db_time': 0.0,
+            'render_time': 0.0,
+            'render_start': [],
+            'slow_queries': [],
+        }
+
+    def _finish_request(self, response):
+        endpoint = request.endpoint
+        if 'perf' not in g or endpoint is None:
+            return response
+        if response.is_streamed:
+            # Las consultas de una respuesta en streaming se ejecutan mientras se envía el cuerpo
+            # (con stream_with_context, `g.perf` sigue activo): se registran al cerrarla
+            response.call_on_close(partial(self._record, g.perf, endpoint))
+            return response
+        self._record(g.pop('perf'), endpoint, response)
+        return response
+
+    def _record(self, perf, endpoint, response=None):
+        """Acumula las métricas de la petición y comprueba su presupuesto de consultas.
+
+        Sin `response` (streaming) no se agregan las cabeceras X-Query-Count y X-DB-Time-Ms,
+        porque ya se enviaron.
+        """
+        total_time = time.perf_counter() - perf['start']
+        budget = self.app.config['PERF_QUERY_BUDGETS'].get(endpoint)
+        exceeded = budget is not None and perf['statements'] > budget
+
+        with self._lock:
+            stats = self._stats.get(endpoint)
+            if stats is None:
+                stats = self._stats[endpoint] = EndpointStats(self.app.config['PERF_SLOW_QUERY_SAMPLES'])
+            stats.requests += 1
+            stats.statements += perf['statements']
+            stats.max_statements = max(stats.max_statements, perf['statements'])
+            stats.db_time += perf['db_time']
+            stats.render_time += perf['render_time']
+            stats.total_time += total_time
+            stats.slow_queries.extend(perf['slow_queries'])
+            if exceeded:
+                stats.budget_exceeded += 1
+
+        if response is not None:
+            response.headers['X-Query-Count'] = str(perf['statements'])
+            response.headers['X-DB-Time-Ms'] = f"{perf['db_time'] * 1000:.2f}"
+
+        if exceeded:
+            message = f"El endpoint '{endpoint}' ejecutó {perf['statements']} consultas (presupuesto: {budget})."
+            mode = self.app.config['PERF_BUDGET_MODE'] or ('raise' if self.app.testing else 'log')
+            if mode == 'raise':
+                raise QueryBudgetExceeded(message)
+            self.app.logger.warning(message)
+
+    # -------------------- Consulta de métricas -------------------- #
+
+    def snapshot(self):
+        """Devuelve las métricas acumuladas por endpoint, con su presupuesto configurado."""
+        budgets = self.app.config['PERF_QUERY_BUDGETS']
+        with self._lock:
+            return {
+                endpoint: dict(stats.to_dict(), budget=budgets.get(endpoint))
+                for endpoint, stats in sorted(self._stats.items())
+            }
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
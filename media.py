@@ -0,0 +1,162 @@
+import mimetypes
+import os
+import secrets
+from datetime import datetime, timezone
+
+from flask import Response, request
+from werkzeug.exceptions import NotFound
+from werkzeug.http import http_date
+
+# Tamaño de cada lectura al enviar un archivo desde el proceso
+READ_CHUNK_SIZE = 64 * 1024
+# Modos de entrega: el propio proceso o el proxy frontal mediante una cabecera interna
+DELIVERY_MODES = ('stream', 'x-accel-redirect', 'x-sendfile')
+# Más rangos que estos en una petición se responden con el archivo completo
+MAX_RANGES = 16
+
+
+def _file_etag(stat, blob_digest=None):
+    """ETag fuerte: el SHA-256 para los blobs, la identidad del archivo para el resto."""
+    if blob_digest:
+        return blob_digest
+    return f'{stat.st_ino:x}-{stat.st_size:x}-{stat.st_mtime_ns:x}'
+
+
+def _resolve_ranges(byte_range, length):
+    """Convierte los rangos pedidos en pares `(inicio, fin)` absolutos, ordenados y fusionados."""
+    resolved = []
+    for start, stop in byte_range.ranges:
+        if start < 0:
+            start, stop = max(length + start, 0), length
+        elif stop is None or stop > length:
+            stop = length
+        if start < stop:
+            resolved.append((start, stop))
+
+    merged = []
+    for start, stop in sorted(resolved):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], stop))
+        else:
+            merged.append((start, stop))
+    return merged
+
+
+def _range_applies(etag, last_modified):
+    """Evalúa If-Range: el rango solo se respeta si la representación no cambió.
+
+    Una fecha solo coincide si es exactamente Last-Modified (RFC 9110, 13.1.5).
+    """
+    if_range = request.if_range
+    if if_range.etag:
+        return if_range.etag == etag
+    if if_range.date:
+        return last_modified == if_range.date
+    return True
+
+
+def _not_modified(etag, last_modified):
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if request.if_modified_since:
+        return last_modified <= request.if_modified_since
+    return False
+
+
+def _read_range(path, start, stop, chunk_size=READ_CHUNK_SIZE):
+    with open(path, 'rb') as media_file:
+        media_file.seek(start)
+        remaining = stop - start
+        while remaining > 0:
+            data = media_file.read(min(chunk_size, remaining))
+            if not data:
+                break
+            remaining -= len(data)
+            yield data
+
+
+def _read_multipart(path, ranges, length, mimetype, boundary, chunk_size):
+    for start, stop in ranges:
+        yield _part_header(boundary, mimetype, start, stop, length)
+        yield from _read_range(path, start, stop, chunk_size)
+    yield f'\r\n--{boundary}--\r\n'.encode()
+
+
+def _part_header(boundary, mimetype, start, stop, length):
+    return (
+        f'\r\n--{boundary}\r\n'
+        f'Content-Type: {mimetype}\r\n'
+        f'Content-Range: bytes {start}-{stop - 1}/{length}\r\n\r\n'
+    ).encode()
+
+
+def send_media(path, blob_digest=None, max_age=0, delivery='stream', internal_uri=None,
+               chunk_size=READ_CHUNK_SIZE):
+    """Envía un archivo con soporte de rangos (206/416), ETag y peticiones condicionales (304).
+
+    `blob_digest` es el SHA-256 de los blobs del almacén; como su contenido no cambia nunca,
+    se usa como ETag y se pueden guardar en caché `max_age` segundos sin revalidar. El resto
+    de archivos se revalidan en cada uso (`no-cache`) con su ETag.
+
+    Con `delivery='x-accel-redirect'` (nginx, hacia `internal_uri`) o `'x-sendfile'` (Apache,
+    lighttpd) la respuesta solo lleva la cabecera interna y el proxy envía el archivo y
+    resuelve los rangos; con `'stream'` el proceso lo lee en bloques de `chunk_size` bytes.
+    """
+    if delivery not in DELIVERY_MODES:
+        raise ValueError(f'Modo de entrega desconocido: {delivery}')
+
+    try:
+        stat = os.stat(path)
+    except (FileNotFoundError, NotADirectoryError):
+        raise NotFound()
+
+    length = stat.st_size
+    mimetype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    etag = _file_etag(stat, blob_digest)
+    last_modified = datetime.fromtimestamp(int(stat.st_mtime), timezone.utc)
+
+    headers = {
+        'Accept-Ranges': 'bytes',
+        'ETag': f'"{etag}"',
+        'Last-Modified': http_date(last_modified),
+        'Cache-Control': f'private, max-age={max_age}, immutable' if blob_digest else 'private, no-cache',
+    }
+
+    if _not_modified(etag, last_modified):
+        return Response(status=304, headers=headers)
+
+    if delivery == 'x-accel-redirect':
+        headers['X-Accel-Redirect'] = internal_uri
+        return Response(headers=headers, mimetype=mimetype)
+    if delivery == 'x-sendfile':
+        headers['X-Sendfile'] = os.path.abspath(path)
+        return Response(headers=headers, mimetype=mimetype)
+
+    byte_range = request.range
+    if byte_range is not None and byte_range.units == 'bytes' and _range_applies(etag, last_modified):
+        ranges = _resolve_ranges(byte_range, length)
+        if not ranges:
+            headers['Content-Range'] = f'bytes */{length}'
+            return Response(status=416, headers=headers)
+
+        if len(ranges) == 1:
+            start, stop = ranges[0]
+            headers['Content-Range'] = f'bytes {start}-{stop - 1}/{length}'
+            headers['Content-Length'] = str(stop - start)
+            return Response(_read_range(path, start, stop, chunk_size), status=206, headers=headers,
+                            mimetype=mimetype, direct_passthrough=True)
+
+        if len(ranges) <= MAX_RANGES:
+            boundary = secrets.token_hex(16)
+            headers['Content-Length'] = str(
+                sum(len(_part_header(boundary, mimetype, start, stop, length)) + stop - start
+                    for start, stop in ranges)
+                + len(f'\r\n--{boundary}--\r\n')
+            )
+            return Response(_read_multipart(path, ranges, length, mimetype, boundary, chunk_size), status=206,
+                            headers=headers, content_type=f'multipart/byteranges; boundary={boundary}',
+                            direct_passthrough=True)
+
+    headers['Content-Length'] = str(length)
+    return Response(_read_range(path, 0, length, chunk_size), headers=headers, mimetype=mimetype,
+                    direct_passthrough=True)
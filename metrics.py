@@ -0,0 +1,110 @@
+from sqlalchemy import func, and_
+from models import db, Module, ContentItem, CourseEnrollment, StudentResponse
+
+
+def get_course_metrics(courses):
+    """Calcula las métricas del dashboard del instructor con un número fijo de consultas agrupadas.
+
+    Devuelve una lista de diccionarios con las claves `course`, `total_students`,
+    `average_score` y `completion_rate`, en el mismo orden que `courses`.
+    """
+    course_ids = [course.id for course in courses]
+    if not course_ids:
+        return []
+
+    # Total de estudiantes inscritos por curso
+    students_by_course = dict(
+        db.session.query(CourseEnrollment.course_id, func.count(CourseEnrollment.id))
+        .filter(CourseEnrollment.course_id.in_(course_ids))
+        .group_by(CourseEnrollment.course_id)
+        .all()
+    )
+
+    # Total de quizzes por curso
+    quizzes_by_course = (
+        db.session.query(
+            Module.course_id.label('course_id'),
+            func.count(ContentItem.id).label('total_quizzes')
+        )
+        .join(ContentItem, ContentItem.module_id == Module.id)
+        .filter(Module.course_id.in_(course_ids), ContentItem.type == 'quiz')
+        .group_by(Module.course_id)
+        .subquery()
+    )
+
+    # Contenidos completados (sin duplicados) por estudiante inscrito en cada curso
+    completed_by_student = (
+        db.session.query(
+            Module.course_id.label('course_id'),
+            StudentResponse.student_id.label('student_id'),
+            func.count(func.distinct(ContentItem.id)).label('completed_items')
+        )
+        .join(ContentItem, ContentItem.module_id == Module.id)
+        .join(StudentResponse, StudentResponse.content_item_id == ContentItem.id)
+        .join(CourseEnrollment, and_(
+            CourseEnrollment.course_id == Module.course_id,
+            CourseEnrollment.student_id == StudentResponse.student_id
+        ))
+        .filter(Module.course_id.in_(course_ids), StudentResponse.completed == True)
+        .group_by(Module.course_id, StudentResponse.student_id)
+        .subquery()
+    )
+
+    # Estudiantes que completaron todos los quizzes del curso
+    completed_by_course = dict(
+        db.session.query(completed_by_student.c.course_id, func.count(completed_by_student.c.student_id))
+        .join(quizzes_by_course, quizzes_by_course.c.course_id == completed_by_student.c.course_id)
+        .filter(
+            quizzes_by_course.c.total_quizzes > 0,
+            completed_by_student.c.completed_items == quizzes_by_course.c.total_quizzes
+        )
+        .group_by(completed_by_student.c.course_id)
+        .all()
+    )
+
+    # Suma y número de calificaciones de los estudiantes inscritos por curso
+    scores_by_course = {
+        course_id: (total_scores, total_responses)
+        for course_id, total_scores, total_responses in (
+            db.session.query(
+                Module.course_id,
+                func.sum(StudentResponse.score),
+                func.count(StudentResponse.score)
+            )
+            .join(ContentItem, ContentItem.module_id == Module.id)
+            .join(StudentResponse, StudentResponse.content_item_id == ContentItem.id)
+            .join(CourseEnrollment, and_(
+                CourseEnrollment.course_id == Module.course_id,
+                CourseEnrollment.student_id == StudentResponse.student_id
+            ))
+            .filter(Module.course_id.in_(course_ids), StudentResponse.score.isnot(None))
+            .group_by(Module.course_id)
+            .all()
+        )
+    }
+
+    course_metrics = []
+    for course in courses:
+        total_students = students_by_course.get(course.id, 0)
+        students_completed_course = completed_by_course.get(course.id, 0)
+        total_scores, total_responses = scores_by_course.get(course.id, (0, 0))
+
+        # Cálculo del promedio de calificaciones
+        average_score = (
+            round(total_scores / total_responses, 2) if total_responses > 0 else 0
+        )
+
+        # Cálculo del porcentaje de finalización
+        completion_rate = (
+            round((students_completed_course / total_students) * 100, 2)
+            if total_students > 0 else 0
+        )
+
+        course_metrics.append({
+            'course': course,
+            'total_students': total_students,
+            'average_score': average_score,
+            'completion_rate': completion_rate
+        })
+
+    return course_metrics
@@ -0,0 +1,40 @@
+"""Índice FTS5 del catálogo de cursos
+
+Revision ID: 5b9e2c4d1f83
+Revises: d83b5f0e6a17
+Create Date: 2026-10-15 15:00:00
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '5b9e2c4d1f83'
+down_revision = 'd83b5f0e6a17'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # FTS5 solo existe en SQLite; en otros motores la búsqueda no usa índice
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    op.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS course_search USING fts5("
+        "name, description, modules, content, tokenize = 'unicode61 remove_diacritics 2')"
+    )
+    op.execute("""
+        INSERT INTO course_search (rowid, name, description, modules, content)
+        SELECT courses.id, courses.name, courses.description,
+            (SELECT group_concat(modules.title, ' ') FROM modules WHERE modules.course_id = courses.id),
+            (SELECT group_concat(content_items.title || ' ' || coalesce(content_items.content, ''), ' ')
+             FROM content_items JOIN modules ON content_items.module_id = modules.id
+             WHERE modules.course_id = courses.id AND content_items.type = 'text')
+        FROM courses
+    """)
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    op.execute("DROP TABLE IF EXISTS course_search")
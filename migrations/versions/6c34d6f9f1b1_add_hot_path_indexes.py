@@ -0,0 +1,45 @@
+"""Índices compuestos para las consultas frecuentes
+
+Revision ID: 6c34d6f9f1b1
+Revises: ff51dacd5b70
+Create Date: 2026-10-15 10:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6c34d6f9f1b1'
+down_revision = 'ff51dacd5b70'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Eliminar inscripciones duplicadas antes de crear el índice único (se conserva la más antigua)
+    op.execute("""
+        DELETE FROM course_enrollments
+        WHERE id NOT IN (
+            SELECT MIN(id) FROM course_enrollments GROUP BY student_id, course_id
+        )
+    """)
+
+    op.create_index('ix_courses_instructor_id', 'courses', ['instructor_id'], unique=False)
+    op.create_index('ix_modules_course_id_order', 'modules', ['course_id', 'order'], unique=False)
+    op.create_index('ix_content_items_module_id_type_order', 'content_items', ['module_id', 'type', 'order'], unique=False)
+    op.create_index('uq_course_enrollments_student_id_course_id', 'course_enrollments', ['student_id', 'course_id'], unique=True)
+    op.create_index('ix_course_enrollments_completed_completion_date', 'course_enrollments', ['completed', 'completion_date'], unique=False)
+    op.create_index(
+        'ix_student_responses_student_item_completed_score', 'student_responses',
+        ['student_id', 'content_item_id', 'completed', 'score'], unique=False
+    )
+
+
+def downgrade():
+    op.drop_index('ix_student_responses_student_item_completed_score', table_name='student_responses')
+    op.drop_index('ix_course_enrollments_completed_completion_date', table_name='course_enrollments')
+    op.drop_index('uq_course_enrollments_student_id_course_id', table_name='course_enrollments')
+    op.drop_index('ix_content_items_module_id_type_order', table_name='content_items')
+    op.drop_index('ix_modules_course_id_order', table_name='modules')
+    op.drop_index('ix_courses_instructor_id', table_name='courses')
@@ -0,0 +1,37 @@
+"""Índices en las claves foráneas usadas por las eliminaciones en cascada
+
+Revision ID: 9c2f5e8a7b14
+Revises: 5b9e2c4d1f83
+Create Date: 2026-10-15 18:00:00
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '9c2f5e8a7b14'
+down_revision = '5b9e2c4d1f83'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('student_responses', schema=None) as batch_op:
+        batch_op.create_index('ix_student_responses_content_item_id', ['content_item_id'], unique=False)
+
+    with op.batch_alter_table('quiz_questions', schema=None) as batch_op:
+        batch_op.create_index('ix_quiz_questions_content_item_id', ['content_item_id'], unique=False)
+
+    with op.batch_alter_table('course_enrollments', schema=None) as batch_op:
+        batch_op.create_index('ix_course_enrollments_course_id', ['course_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('course_enrollments', schema=None) as batch_op:
+        batch_op.drop_index('ix_course_enrollments_course_id')
+
+    with op.batch_alter_table('quiz_questions', schema=None) as batch_op:
+        batch_op.drop_index('ix_quiz_questions_content_item_id')
+
+    with op.batch_alter_table('student_responses', schema=None) as batch_op:
+        batch_op.drop_index('ix_student_responses_content_item_id')
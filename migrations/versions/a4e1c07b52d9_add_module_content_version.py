@@ -0,0 +1,26 @@
+"""Versión de contenido de los módulos para la caché de fragmentos
+
+Revision ID: a4e1c07b52d9
+Revises: 6c34d6f9f1b1
+Create Date: 2026-10-15 13:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4e1c07b52d9'
+down_revision = '6c34d6f9f1b1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('modules', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('content_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('modules', schema=None) as batch_op:
+        batch_op.drop_column('content_version')
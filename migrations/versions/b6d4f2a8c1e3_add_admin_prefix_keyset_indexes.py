@@ -0,0 +1,35 @@
+"""Índices (columna, id) para paginar las listas del administrador filtradas por prefijo
+
+Revision ID: b6d4f2a8c1e3
+Revises: e7a3d1c9b2f6
+Create Date: 2026-10-15 21:00:00
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'b6d4f2a8c1e3'
+down_revision = 'e7a3d1c9b2f6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.create_index('ix_users_role_id_username', ['role_id', 'username'], unique=False)
+        batch_op.create_index('ix_users_role_id_email', ['role_id', 'email'], unique=False)
+
+    with op.batch_alter_table('courses', schema=None) as batch_op:
+        batch_op.drop_index('ix_courses_name')
+        batch_op.create_index('ix_courses_name_id', ['name', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('courses', schema=None) as batch_op:
+        batch_op.drop_index('ix_courses_name_id')
+        batch_op.create_index('ix_courses_name', ['name'], unique=False)
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index('ix_users_role_id_email')
+        batch_op.drop_index('ix_users_role_id_username')
@@ -0,0 +1,31 @@
+"""Índices para la paginación de las listas del administrador
+
+Revision ID: d83b5f0e6a17
+Revises: a4e1c07b52d9
+Create Date: 2026-10-15 14:00:00
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'd83b5f0e6a17'
+down_revision = 'a4e1c07b52d9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.create_index('ix_users_role_id_id', ['role_id', 'id'], unique=False)
+
+    with op.batch_alter_table('courses', schema=None) as batch_op:
+        batch_op.create_index('ix_courses_name', ['name'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('courses', schema=None) as batch_op:
+        batch_op.drop_index('ix_courses_name')
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index('ix_users_role_id_id')
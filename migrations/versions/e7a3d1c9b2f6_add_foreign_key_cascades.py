@@ -0,0 +1,50 @@
+"""ON DELETE CASCADE en las claves foráneas declaradas así en models.py
+
+La base original solo tenía la cascada de student_responses.content_item_id. SQLite no
+permite modificar una clave foránea: cada tabla se reconstruye (modo batch) y las claves
+sin nombre se identifican con la convención de nombres.
+
+Revision ID: e7a3d1c9b2f6
+Revises: 9c2f5e8a7b14
+Create Date: 2026-10-15 20:00:00
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7a3d1c9b2f6'
+down_revision = '9c2f5e8a7b14'
+branch_labels = None
+depends_on = None
+
+NAMING_CONVENTION = {'fk': 'fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s'}
+
+# (tabla, columna, tabla referenciada)
+CASCADES = [
+    ('modules', 'course_id', 'courses'),
+    ('course_enrollments', 'student_id', 'users'),
+    ('course_enrollments', 'course_id', 'courses'),
+    ('content_items', 'module_id', 'modules'),
+    ('quiz_questions', 'content_item_id', 'content_items'),
+    ('student_responses', 'student_id', 'users'),
+]
+
+
+def _set_ondelete(ondelete):
+    for table in dict.fromkeys(table for table, _, _ in CASCADES):
+        with op.batch_alter_table(table, schema=None, naming_convention=NAMING_CONVENTION) as batch_op:
+            for fk_table, column, referred in CASCADES:
+                if fk_table != table:
+                    continue
+                name = f'fk_{table}_{column}_{referred}'
+                batch_op.drop_constraint(name, type_='foreignkey')
+                batch_op.create_foreign_key(name, referred, [column], ['id'], ondelete=ondelete)
+
+
+def upgrade():
+    _set_ondelete('CASCADE')
+
+
+def downgrade():
+    _set_ondelete(None)
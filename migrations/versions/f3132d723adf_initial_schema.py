@@ -0,0 +1,108 @@
+"""Esquema inicial
+
+Revision ID: f3132d723adf
+Revises: 
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3132d723adf'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('roles',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('name')
+    )
+    op.create_table('users',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('username', sa.String(length=150), nullable=False),
+        sa.Column('email', sa.String(length=150), nullable=False),
+        sa.Column('password', sa.String(length=150), nullable=False),
+        sa.Column('role_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['role_id'], ['roles.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('email'),
+        sa.UniqueConstraint('username')
+    )
+    op.create_table('courses',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=200), nullable=False),
+        sa.Column('description', sa.String(length=500), nullable=False),
+        sa.Column('instructor_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['instructor_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('modules',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('title', sa.String(length=200), nullable=False),
+        sa.Column('description', sa.String(length=500), nullable=False),
+        sa.Column('order', sa.Integer(), nullable=False),
+        sa.Column('course_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['course_id'], ['courses.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('course_enrollments',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('student_id', sa.Integer(), nullable=False),
+        sa.Column('course_id', sa.Integer(), nullable=False),
+        sa.Column('enrollment_date', sa.DateTime(), nullable=False),
+        sa.Column('completed', sa.Boolean(), nullable=True),
+        sa.Column('progress', sa.Float(), nullable=True),
+        sa.Column('completion_date', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['course_id'], ['courses.id'], ),
+        sa.ForeignKeyConstraint(['student_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('content_items',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('title', sa.String(length=100), nullable=False),
+        sa.Column('type', sa.String(length=50), nullable=False),
+        sa.Column('content', sa.Text(), nullable=True),
+        sa.Column('file_path', sa.String(length=255), nullable=True),
+        sa.Column('order', sa.Integer(), nullable=False),
+        sa.Column('module_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['module_id'], ['modules.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('quiz_questions',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('question_text', sa.Text(), nullable=False),
+        sa.Column('content_item_id', sa.Integer(), nullable=False),
+        sa.Column('question_type', sa.String(length=50), nullable=True),
+        sa.Column('correct_answer', sa.Text(), nullable=True),
+        sa.Column('options', sa.Text(), nullable=True),
+        sa.ForeignKeyConstraint(['content_item_id'], ['content_items.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('student_responses',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('student_id', sa.Integer(), nullable=False),
+        sa.Column('content_item_id', sa.Integer(), nullable=False),
+        sa.Column('response', sa.Text(), nullable=True),
+        sa.Column('score', sa.Float(), nullable=True),
+        sa.Column('completed', sa.Boolean(), nullable=True),
+        sa.Column('completion_date', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['content_item_id'], ['content_items.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['student_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    op.drop_table('student_responses')
+    op.drop_table('quiz_questions')
+    op.drop_table('content_items')
+    op.drop_table('course_enrollments')
+    op.drop_table('modules')
+    op.drop_table('courses')
+    op.drop_table('users')
+    op.drop_table('roles')
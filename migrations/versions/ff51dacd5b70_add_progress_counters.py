@@ -0,0 +1,52 @@
+"""Contadores incrementales de progreso
+
+Revision ID: ff51dacd5b70
+Revises: f3132d723adf
+Create Date: 2026-10-15 09:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'ff51dacd5b70'
+down_revision = 'f3132d723adf'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('courses', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('total_content', sa.Integer(), server_default='0', nullable=False))
+
+    with op.batch_alter_table('course_enrollments', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('completed_items', sa.Integer(), server_default='0', nullable=False))
+
+    # Inicializar los contadores con los datos existentes
+    op.execute("""
+        UPDATE courses SET total_content = (
+            SELECT COUNT(content_items.id)
+            FROM content_items JOIN modules ON content_items.module_id = modules.id
+            WHERE modules.course_id = courses.id
+        )
+    """)
+    op.execute("""
+        UPDATE course_enrollments SET completed_items = (
+            SELECT COUNT(DISTINCT student_responses.content_item_id)
+            FROM student_responses
+            JOIN content_items ON student_responses.content_item_id = content_items.id
+            JOIN modules ON content_items.module_id = modules.id
+            WHERE modules.course_id = course_enrollments.course_id
+              AND student_responses.student_id = course_enrollments.student_id
+              AND student_responses.completed
+        )
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('course_enrollments', schema=None) as batch_op:
+        batch_op.drop_column('completed_items')
+
+    with op.batch_alter_table('courses', schema=None) as batch_op:
+        batch_op.drop_column('total_content')
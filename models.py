@@ -1,9 +1,12 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
+from sqlalchemy import event, inspect, select, and_
 from datetime import datetime
 import json
+from db_routing import RoutingSession
 
-db = SQLAlchemy()
+# Las lecturas de las vistas `read_only` pueden ir a la réplica (db_routing.py)
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 # Modelo de Roles (Admin, Instructor, Estudiante)
 class Role(db.Model):
@@ -17,6 +20,11 @@ class Role(db.Model):
 # Modelo de Usuario
 class User(UserMixin, db.Model):
     __tablename__ = 'users'
+    __table_args__ = (
+        db.Index('ix_users_role_id_id', 'role_id', 'id'),
+        db.Index('ix_users_role_id_username', 'role_id', 'username'),
+        db.Index('ix_users_role_id_email', 'role_id', 'email'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(150), unique=True, nullable=False)
     email = db.Column(db.String(150), unique=True, nullable=False)
@@ -33,11 +41,18 @@ class User(UserMixin, db.Model):
 # Modelo de Curso
 class Course(db.Model):
     __tablename__ = 'courses'
+    __table_args__ = (
+        db.Index('ix_courses_instructor_id', 'instructor_id'),
+        db.Index('ix_courses_name_id', 'name', 'id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(200), nullable=False)
     description = db.Column(db.String(500), nullable=False)
     instructor_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
-    modules = db.relationship('Module', back_populates='course', lazy=True, cascade='all, delete-orphan')
+    total_content = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # Contador de ítems de contenido
+    modules = db.relationship(
+        'Module', back_populates='course', lazy=True, cascade='all, delete-orphan', order_by='Module.order'
+    )
     enrollments = db.relationship(
         'CourseEnrollment', back_populates='course', lazy=True, cascade='all, delete-orphan'
     )
@@ -46,32 +61,37 @@ class Course(db.Model):
         return f'<Course {self.name}>'
 
     def get_modules_sorted(self):
-        return sorted(self.modules, key=lambda x: x.order)
+        """Devuelve los módulos ya ordenados por SQL (`order_by` de la relación)."""
+        return self.modules
 
     def get_total_content(self):
         """Retorna el número total de ítems de contenido en el curso."""
-        total_content = 0
-        for module in self.modules:
-            total_content += len(module.content_items)
-        return total_content
+        return self.total_content
 
 # Modelo de Módulo
 class Module(db.Model):
     __tablename__ = 'modules'
+    __table_args__ = (
+        db.Index('ix_modules_course_id_order', 'course_id', 'order'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
     description = db.Column(db.String(500), nullable=False)
     order = db.Column(db.Integer, nullable=False)
     course_id = db.Column(db.Integer, db.ForeignKey('courses.id', ondelete="CASCADE"), nullable=False)
-    content_items = db.relationship('ContentItem', back_populates='module', lazy=True, cascade='all, delete-orphan')
+    # Se incrementa con cada cambio en sus contenidos; forma parte de la clave de la caché de fragmentos
+    content_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    content_items = db.relationship(
+        'ContentItem', back_populates='module', lazy=True, cascade='all, delete-orphan', order_by='ContentItem.order'
+    )
     course = db.relationship('Course', back_populates='modules')
 
     def __repr__(self):
         return f'<Module {self.title}>'
 
     def get_content_items_sorted(self):
-        """Devuelve los contenidos ordenados por el campo `order`."""
-        return sorted(self.content_items, key=lambda x: x.order)
+        """Devuelve los contenidos ya ordenados por SQL según el campo `order`."""
+        return self.content_items
 
     def get_next_content_order(self):
         """Calcula el próximo número de orden para un nuevo contenido."""
@@ -80,6 +100,9 @@ class Module(db.Model):
 # Modelo de Contenido
 class ContentItem(db.Model):
     __tablename__ = 'content_items'
+    __table_args__ = (
+        db.Index('ix_content_items_module_id_type_order', 'module_id', 'type', 'order'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(100), nullable=False)
     type = db.Column(db.String(50), nullable=False)  # "text", "video", "file", "quiz"
@@ -87,7 +110,10 @@ class ContentItem(db.Model):
     file_path = db.Column(db.String(255), nullable=True)
     order = db.Column(db.Integer, nullable=False)
     module_id = db.Column(db.Integer, db.ForeignKey('modules.id', ondelete="CASCADE"), nullable=False)
-    questions = db.relationship('QuizQuestion', backref='content_item', cascade='all, delete-orphan', lazy=True)
+    questions = db.relationship(
+        'QuizQuestion', backref='content_item', cascade='all, delete-orphan', passive_deletes=True, lazy=True,
+        order_by='QuizQuestion.id'
+    )
     module = db.relationship('Module', back_populates='content_items')
 
     def __repr__(self):
@@ -96,6 +122,9 @@ class ContentItem(db.Model):
 # Modelo de Preguntas del Quiz
 class QuizQuestion(db.Model):
     __tablename__ = 'quiz_questions'
+    __table_args__ = (
+        db.Index('ix_quiz_questions_content_item_id', 'content_item_id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     question_text = db.Column(db.Text, nullable=False)
     content_item_id = db.Column(db.Integer, db.ForeignKey('content_items.id', ondelete="CASCADE"), nullable=False)
@@ -127,6 +156,11 @@ class QuizQuestion(db.Model):
 # Modelo de Inscripción a Cursos
 class CourseEnrollment(db.Model):
     __tablename__ = 'course_enrollments'
+    __table_args__ = (
+        db.Index('uq_course_enrollments_student_id_course_id', 'student_id', 'course_id', unique=True),
+        db.Index('ix_course_enrollments_completed_completion_date', 'completed', 'completion_date'),
+        db.Index('ix_course_enrollments_course_id', 'course_id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     student_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete="CASCADE"), nullable=False)
     course_id = db.Column(db.Integer, db.ForeignKey('courses.id', ondelete="CASCADE"), nullable=False)
@@ -134,14 +168,38 @@ class CourseEnrollment(db.Model):
     completed = db.Column(db.Boolean, default=False)
     progress = db.Column(db.Float, default=0.0)
     completion_date = db.Column(db.DateTime, nullable=True)  # Nueva columna
+    completed_items = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # Contador de ítems completados
     course = db.relationship('Course', back_populates='enrollments')
 
+    @staticmethod
+    def enroll(student_id, course_id):
+        """Inscribe al estudiante con un upsert; retorna False si ya estaba inscrito."""
+        dialect = db.session.get_bind().dialect.name
+        if dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        elif dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            if CourseEnrollment.query.filter_by(student_id=student_id, course_id=course_id).first():
+                return False
+            db.session.add(CourseEnrollment(student_id=student_id, course_id=course_id))
+            db.session.commit()
+            return True
+
+        result = db.session.execute(
+            insert(CourseEnrollment.__table__)
+            .values(student_id=student_id, course_id=course_id, enrollment_date=datetime.utcnow())
+            .on_conflict_do_nothing(index_elements=['student_id', 'course_id'])
+        )
+        db.session.commit()
+        return result.rowcount == 1
+
     def update_progress(self):
-        total_content = sum(len(module.content_items) for module in self.course.modules)
-        completed_content = StudentResponse.query.filter_by(student_id=self.student_id, completed=True).filter(
-            StudentResponse.content_item_id.in_([content.id for module in self.course.modules for content in module.content_items])
-        ).count()
-        self.progress = (completed_content / total_content) * 100 if total_content > 0 else 0
+        """Actualiza el progreso a partir de los contadores incrementales (una sola consulta)."""
+        completed_items, total_content = db.session.query(
+            CourseEnrollment.completed_items, Course.total_content
+        ).join(Course, Course.id == CourseEnrollment.course_id).filter(CourseEnrollment.id == self.id).one()
+        self.progress = (completed_items / total_content) * 100 if total_content > 0 else 0
         if self.progress == 100:
             self.completed = True
             self.completion_date = datetime.utcnow()  # Actualizar la fecha de finalización
@@ -150,6 +208,13 @@ class CourseEnrollment(db.Model):
 # Modelo de Respuestas de Estudiantes
 class StudentResponse(db.Model):
     __tablename__ = 'student_responses'
+    __table_args__ = (
+        db.Index(
+            'ix_student_responses_student_item_completed_score',
+            'student_id', 'content_item_id', 'completed', 'score'
+        ),
+        db.Index('ix_student_responses_content_item_id', 'content_item_id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     student_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete="CASCADE"), nullable=False)
     content_item_id = db.Column(db.Integer, db.ForeignKey('content_items.id', ondelete="CASCADE"), nullable=False)
@@ -157,26 +222,110 @@ class StudentResponse(db.Model):
     score = db.Column(db.Float, nullable=True)
     completed = db.Column(db.Boolean, default=False)
     completion_date = db.Column(db.DateTime, nullable=True)
-    content_item = db.relationship('ContentItem', backref='responses')
+    # Al eliminar un contenido por el ORM sus respuestas se eliminan (nunca se deja content_item_id en NULL)
+    content_item = db.relationship(
+        'ContentItem', backref=db.backref('responses', cascade='all, delete-orphan', passive_deletes=True)
+    )
 
     def mark_as_completed(self):
-        """Marca el contenido como completado y actualiza el progreso del módulo y curso."""
+        """Marca el contenido como completado y actualiza el progreso del curso."""
         self.completed = True
         self.completion_date = datetime.utcnow()
         db.session.commit()
 
-        # Verificar si todos los contenidos del módulo están completados por el estudiante
-        module_contents = self.content_item.module.content_items
-        completed_contents = StudentResponse.query.filter_by(
-            student_id=self.student_id, completed=True
-        ).filter(
-            StudentResponse.content_item_id.in_([item.id for item in module_contents])
-        ).count()
-
-        if completed_contents == len(module_contents):  # Todos los contenidos están completados
-            enrollment = CourseEnrollment.query.filter_by(
-                student_id=self.student_id,
-                course_id=self.content_item.module.course.id
-            ).first()
-            if enrollment:
-                enrollment.update_progress()
+        # El contador de la inscripción ya fue actualizado al guardar la respuesta
+        course_id = select(Module.course_id).join(ContentItem, ContentItem.module_id == Module.id).where(
+            ContentItem.id == self.content_item_id
+        ).scalar_subquery()
+        enrollment = CourseEnrollment.query.filter_by(student_id=self.student_id).filter(
+            CourseEnrollment.course_id == course_id
+        ).first()
+        if enrollment:
+            enrollment.update_progress()
+
+
+# -------------------- Contadores incrementales de progreso -------------------- #
+
+def _course_id_of_module(module_id):
+    return select(Module.course_id).where(Module.id == module_id).scalar_subquery()
+
+
+@event.listens_for(ContentItem, 'after_insert')
+def _increment_course_total_content(mapper, connection, target):
+    """Suma el nuevo contenido al contador del curso."""
+    connection.execute(
+        Course.__table__.update()
+        .where(Course.id == _course_id_of_module(target.module_id))
+        .values(total_content=Course.total_content + 1)
+    )
+
+
+@event.listens_for(ContentItem, 'before_delete')
+def _decrement_course_counters(mapper, connection, target):
+    """Resta el contenido eliminado del curso y de las inscripciones que lo habían completado."""
+    course_id = _course_id_of_module(target.module_id)
+    connection.execute(
+        Course.__table__.update()
+        .where(Course.id == course_id)
+        .values(total_content=Course.total_content - 1)
+    )
+    students_completed = select(StudentResponse.student_id).where(
+        StudentResponse.content_item_id == target.id,
+        StudentResponse.completed == True
+    ).distinct()
+    connection.execute(
+        CourseEnrollment.__table__.update()
+        .where(
+            CourseEnrollment.course_id == course_id,
+            CourseEnrollment.student_id.in_(students_completed),
+            CourseEnrollment.completed_items > 0
+        )
+        .values(completed_items=CourseEnrollment.completed_items - 1)
+    )
+
+
+def _increment_completed_items(connection, response):
+    """Suma 1 a la inscripción solo la primera vez que el estudiante completa el contenido."""
+    already_completed = connection.execute(
+        select(StudentResponse.id).where(
+            StudentResponse.student_id == response.student_id,
+            StudentResponse.content_item_id == response.content_item_id,
+            StudentResponse.completed == True,
+            StudentResponse.id != response.id
+        ).limit(1)
+    ).first()
+    if already_completed:
+        return
+    course_id = select(Module.course_id).join(ContentItem, ContentItem.module_id == Module.id).where(
+        ContentItem.id == response.content_item_id
+    ).scalar_subquery()
+    connection.execute(
+        CourseEnrollment.__table__.update()
+        .where(and_(CourseEnrollment.student_id == response.student_id, CourseEnrollment.course_id == course_id))
+        .values(completed_items=CourseEnrollment.completed_items + 1)
+    )
+
+
+@event.listens_for(ContentItem, 'after_insert')
+@event.listens_for(ContentItem, 'after_update')
+@event.listens_for(ContentItem, 'after_delete')
+def _bump_module_content_version(mapper, connection, target):
+    """Cambia la versión del módulo para que su fragmento cacheado se vuelva a renderizar."""
+    connection.execute(
+        Module.__table__.update()
+        .where(Module.id == target.module_id)
+        .values(content_version=Module.content_version + 1)
+    )
+
+
+@event.listens_for(StudentResponse, 'after_insert')
+def _response_inserted(mapper, connection, target):
+    if target.completed:
+        _increment_completed_items(connection, target)
+
+
+@event.listens_for(StudentResponse, 'after_update')
+def _response_updated(mapper, connection, target):
+    history = inspect(target).attrs.completed.history
+    if target.completed and history.added and not any(history.deleted):
+        _increment_completed_items(connection, target)
@@ -0,0 +1,198 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from functools import partial
+
+# Muestras de latencia que se guardan para calcular el percentil 95
+LATENCY_SAMPLES = 500
+
+
+class HasherBusy(Exception):
+    """El servicio de contraseñas alcanzó su límite de trabajos en curso."""
+
+
+class _LatencyStats:
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.samples = deque(maxlen=LATENCY_SAMPLES)
+
+    def add(self, ms):
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        self.samples.append(ms)
+
+    def to_dict(self):
+        samples = sorted(self.samples)
+        return {
+            'count': self.count,
+            'avg_ms': round(self.total_ms / self.count, 2) if self.count else 0,
+            'p95_ms': round(samples[int(len(samples) * 0.95) - 1], 2) if samples else 0,
+            'max_ms': round(self.max_ms, 2),
+        }
+
+
+class PasswordHasher:
+    """Hash y verificación de contraseñas bcrypt en un pool de hilos acotado.
+
+    Como máximo `max_workers` hashes se calculan a la vez y `max_queue` esperan turno; con el
+    pool lleno se lanza `HasherBusy` de inmediato, de modo que una avalancha de inicios de
+    sesión no deja a todos los workers esperando a bcrypt. bcrypt libera el GIL, así que el
+    resto de peticiones se siguen atendiendo mientras tanto. El pool se crea en `init_app`.
+    """
+
+    def __init__(self, bcrypt, app=None):
+        self.bcrypt = bcrypt
+        self.timeout = None
+        self._executor = None
+        self._slots = None
+        self._lock = threading.Lock()
+        self._dummy_hash = None  # Future del hash ficticio, calculado en el pool
+        self._hash_stats = _LatencyStats()
+        self._verify_stats = _LatencyStats()
+        self.rejected = 0
+        self.dummy_verifications = 0
+        self.in_flight = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self._configure(
+            app.config['PASSWORD_HASH_WORKERS'], app.config['PASSWORD_HASH_QUEUE'], app.config['PASSWORD_HASH_TIMEOUT']
+        )
+        # Se calcula ya (con las rondas de la aplicación), sin bloquear el arranque
+        self._dummy_hash = self._executor.submit(self._make_dummy_hash)
+
+    def _configure(self, max_workers, max_queue, timeout):
+        # Al reconfigurar (otra llamada a init_app) el pool anterior termina sus trabajos y se cierra
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='password-hasher')
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+
+    def _run(self, stats, fn, *args):
+        # El lugar se devuelve al mismo semáforo aunque init_app lo reemplace mientras tanto
+        slots, executor = self._slots, self._executor
+        if not slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise HasherBusy()
+        with self._lock:
+            self.in_flight += 1
+        start = time.perf_counter()
+        release = partial(self._release_slot, slots)
+        try:
+            future = executor.submit(fn, *args)
+        except BaseException:
+            release()
+            raise
+        # El lugar se libera cuando el trabajo termina, no cuando se deja de esperarlo: un
+        # trabajo abandonado por timeout sigue ocupando un hilo o la cola
+        future.add_done_callback(release)
+        try:
+            result = future.result(timeout=self.timeout)
+        except TimeoutError:
+            with self._lock:
+                self.rejected += 1
+            raise HasherBusy()
+        with self._lock:
+            stats.add((time.perf_counter() - start) * 1000)
+        return result
+
+    def _release_slot(self, slots, future=None):
+        with self._lock:
+            self.in_flight -= 1
+        slots.release()
+
+    def hash(self, password):
+        return self._run(self._hash_stats, self.bcrypt.generate_password_hash, password).decode('utf-8')
+
+    def verify(self, password_hash, password):
+        """Verifica la contraseña; sin hash (usuario inexistente) compara contra un hash ficticio.
+
+        Así una respuesta tarda lo mismo exista o no el usuario y no revela qué nombres son válidos.
+        """
+        if password_hash is None:
+            with self._lock:
+                self.dummy_verifications += 1
+            self._run(self._verify_stats, self.bcrypt.check_password_hash, self._get_dummy_hash(), password)
+            return False
+        return self._run(self._verify_stats, self.bcrypt.check_password_hash, password_hash, password)
+
+    def _make_dummy_hash(self):
+        return self.bcrypt.generate_password_hash('dummy-password').decode('utf-8')
+
+    def _get_dummy_hash(self):
+        return self._dummy_hash.result()
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'hash': self._hash_stats.to_dict(),
+                'verify': self._verify_stats.to_dict(),
+                'dummy_verifications': self.dummy_verifications,
+                'rejected_busy': self.rejected,
+                'in_flight': self.in_flight,
+            }
+
+
+class TokenBucketLimiter:
+    """Limitador por clave con cubetas de fichas (`capacity` intentos, `refill_rate` por segundo)."""
+
+    def __init__(self, capacity, refill_rate, max_keys=100000):
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._buckets = {}
+
+    def allow(self, key):
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - updated) * self.refill_rate)
+            allowed = tokens >= 1
+            self._buckets[key] = (tokens - 1 if allowed else tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._prune(now)
+            return allowed
+
+    def _prune(self, now):
+        # Las cubetas que ya se llenaron de nuevo equivalen a no tener registro
+        full_after = self.capacity / self.refill_rate
+        self._buckets = {
+            key: (tokens, updated) for key, (tokens, updated) in self._buckets.items()
+            if now - updated < full_after
+        }
+
+
+class LoginThrottle:
+    """Limita los intentos de inicio de sesión por nombre de usuario y por IP."""
+
+    def __init__(self, user_capacity=5, user_refill=5 / 60, ip_capacity=30, ip_refill=30 / 60):
+        self.by_user = TokenBucketLimiter(user_capacity, user_refill)
+        self.by_ip = TokenBucketLimiter(ip_capacity, ip_refill)
+        self._lock = threading.Lock()
+        self.throttled = 0
+
+    def init_app(self, app):
+        self.by_user = TokenBucketLimiter(app.config['LOGIN_USER_CAPACITY'], app.config['LOGIN_USER_REFILL'])
+        self.by_ip = TokenBucketLimiter(app.config['LOGIN_IP_CAPACITY'], app.config['LOGIN_IP_REFILL'])
+
+    def allow(self, username, ip):
+        # Se consumen ambas cubetas para que un atacante no pueda alternar entre usuario e IP
+        user_allowed = self.by_user.allow((username or '').strip().lower())
+        ip_allowed = self.by_ip.allow(ip or '')
+        if user_allowed and ip_allowed:
+            return True
+        with self._lock:
+            self.throttled += 1
+        return False
+
+    def snapshot(self):
+        with self._lock:
+            return {'throttled': self.throttled}
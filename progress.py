@@ -0,0 +1,120 @@
+from datetime import datetime
+from sqlalchemy import func, and_, case, update
+from models import db, Course, Module, ContentItem, CourseEnrollment, StudentResponse
+
+
+def expected_course_totals():
+    """Número real de ítems de contenido por curso, calculado desde cero."""
+    return dict(
+        db.session.query(Module.course_id, func.count(ContentItem.id))
+        .join(ContentItem, ContentItem.module_id == Module.id)
+        .group_by(Module.course_id)
+        .all()
+    )
+
+
+def expected_completed_items():
+    """Número real de ítems completados (sin duplicados) por inscripción, calculado desde cero."""
+    return dict(
+        db.session.query(CourseEnrollment.id, func.count(func.distinct(StudentResponse.content_item_id)))
+        .join(Module, Module.course_id == CourseEnrollment.course_id)
+        .join(ContentItem, ContentItem.module_id == Module.id)
+        .join(StudentResponse, and_(
+            StudentResponse.content_item_id == ContentItem.id,
+            StudentResponse.student_id == CourseEnrollment.student_id
+        ))
+        .filter(StudentResponse.completed == True)
+        .group_by(CourseEnrollment.id)
+        .all()
+    )
+
+
+def reconcile_counters(dry_run=False):
+    """Reconstruye los contadores de progreso y devuelve las diferencias encontradas.
+
+    Retorna un diccionario con las listas `courses` y `enrollments`; cada elemento es una
+    tupla `(id, valor_guardado, valor_real)`. Con `dry_run=True` solo se reportan.
+    """
+    course_totals = expected_course_totals()
+    course_drift = [
+        (course_id, stored, course_totals.get(course_id, 0))
+        for course_id, stored in db.session.query(Course.id, Course.total_content)
+        if stored != course_totals.get(course_id, 0)
+    ]
+
+    completed_items = expected_completed_items()
+    enrollment_drift = [
+        (enrollment_id, stored, completed_items.get(enrollment_id, 0))
+        for enrollment_id, stored in db.session.query(CourseEnrollment.id, CourseEnrollment.completed_items)
+        if stored != completed_items.get(enrollment_id, 0)
+    ]
+
+    if not dry_run:
+        if course_drift:
+            db.session.execute(
+                update(Course),
+                [{'id': course_id, 'total_content': actual} for course_id, _, actual in course_drift]
+            )
+        if enrollment_drift:
+            db.session.execute(
+                update(CourseEnrollment),
+                [{'id': enrollment_id, 'completed_items': actual} for enrollment_id, _, actual in enrollment_drift]
+            )
+        db.session.commit()
+
+    return {'courses': course_drift, 'enrollments': enrollment_drift}
+
+
+def recompute_progress(chunk_size=1000, start_after=0, on_chunk=None):
+    """Recalcula `progress`, `completed` y `completion_date` de todas las inscripciones.
+
+    Procesa las inscripciones por rangos de id con un UPDATE masivo por bloque y confirma
+    cada bloque, de modo que un proceso interrumpido puede retomarse con `start_after`.
+    `on_chunk(procesadas, total, ultimo_id)` se llama después de cada bloque.
+    """
+    total = db.session.query(func.count(CourseEnrollment.id)).filter(CourseEnrollment.id > start_after).scalar()
+    total_content = (
+        db.session.query(Course.total_content)
+        .filter(Course.id == CourseEnrollment.course_id)
+        .scalar_subquery()
+    )
+    new_progress = case(
+        (total_content > 0, CourseEnrollment.completed_items * 100.0 / total_content),
+        else_=0.0
+    )
+
+    processed = 0
+    last_id = start_after
+    while True:
+        chunk_ids = (
+            db.session.query(CourseEnrollment.id)
+            .filter(CourseEnrollment.id > last_id)
+            .order_by(CourseEnrollment.id)
+            .limit(chunk_size)
+            .subquery()
+        )
+        upper_id, count = db.session.query(func.max(chunk_ids.c.id), func.count(chunk_ids.c.id)).one()
+        if not count:
+            break
+
+        db.session.execute(
+            update(CourseEnrollment)
+            .where(CourseEnrollment.id > last_id, CourseEnrollment.id <= upper_id)
+            .values(
+                progress=new_progress,
+                completed=new_progress >= 100,
+                completion_date=case(
+                    (new_progress >= 100, func.coalesce(CourseEnrollment.completion_date, datetime.utcnow())),
+                    else_=None
+                )
+            )
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+
+        processed += count
+        last_id = upper_id
+        if on_chunk:
+            on_chunk(processed, total, last_id)
+
+    return processed
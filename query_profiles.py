@@ -0,0 +1,34 @@
+from sqlalchemy.orm import joinedload, selectinload
+from models import Course, Module, ContentItem
+
+# Perfiles de carga: cada uno indica el modelo raíz y las opciones que cargan
+# el subárbol completo en 2-3 consultas (selectin) en lugar de una por módulo o ítem.
+LOADER_PROFILES = {
+    # Curso con su instructor, módulos y contenidos (3 consultas)
+    'course_outline': (Course, lambda: (
+        joinedload(Course.instructor),
+        selectinload(Course.modules).selectinload(Module.content_items),
+    )),
+    # Módulo con su curso y sus contenidos (2 consultas)
+    'module_with_content': (Module, lambda: (
+        joinedload(Module.course),
+        selectinload(Module.content_items),
+    )),
+    # Quiz con su módulo, curso y preguntas (2 consultas)
+    'quiz_with_questions': (ContentItem, lambda: (
+        joinedload(ContentItem.module).joinedload(Module.course),
+        selectinload(ContentItem.questions),
+    )),
+}
+
+
+def profile_query(name):
+    """Devuelve una consulta del modelo raíz del perfil con sus opciones de carga."""
+    model, options = LOADER_PROFILES[name]
+    return model.query.options(*options())
+
+
+def get_with_profile_or_404(name, ident):
+    """Obtiene un objeto por id usando el perfil de carga indicado o lanza un 404."""
+    model, _ = LOADER_PROFILES[name]
+    return profile_query(name).filter(model.id == ident).first_or_404()
@@ -0,0 +1,130 @@
+import json
+import threading
+import time
+from collections import namedtuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import object_session
+
+from query_profiles import profile_query
+from models import db, ContentItem, QuizQuestion
+
+CompiledQuestion = namedtuple(
+    'CompiledQuestion', ['id', 'question_text', 'question_type', 'options', 'answer']
+)
+
+
+def normalize_answer(value):
+    """Misma normalización que `QuizQuestion.is_answer_correct`."""
+    return str(value).strip().lower()
+
+
+class CompiledQuiz:
+    """Representación de un quiz lista para mostrar y calificar sin acceder al ORM."""
+
+    def __init__(self, item):
+        self.id = item.id
+        self.title = item.title
+        self.type = item.type
+        self.module_id = item.module_id
+        self.course_id = item.module.course_id
+        self.questions = tuple(
+            CompiledQuestion(
+                id=question.id,
+                question_text=question.question_text,
+                question_type=question.question_type,
+                options=self._parse_options(question.options),
+                answer=normalize_answer(question.correct_answer)
+            )
+            for question in item.questions
+        )
+        self.index = {question.id: question for question in self.questions}
+
+    @staticmethod
+    def _parse_options(options):
+        try:
+            return json.loads(options) if options else []
+        except json.JSONDecodeError:
+            return []
+
+    def grade(self, form):
+        """Califica un envío (0-10) recorriendo una sola vez los campos del formulario."""
+        if not self.questions:
+            return 0
+        correct_answers = 0
+        for field, value in form.items():
+            if not field.startswith('question_') or not value:
+                continue
+            try:
+                question = self.index.get(int(field[len('question_'):]))
+            except ValueError:
+                continue
+            if question is not None and normalize_answer(value) == question.answer:
+                correct_answers += 1
+        return (correct_answers / len(self.questions)) * 10
+
+
+class QuizCache:
+    """Caché por proceso de quizzes compilados.
+
+    Cualquier cambio del ORM en un contenido o en sus preguntas invalida la entrada del quiz
+    (eventos al final del módulo); el TTL limita el tiempo que otros procesos pueden servir
+    una versión anterior.
+    """
+
+    def __init__(self, ttl=300):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._quizzes = {}
+
+    def get(self, quiz_id):
+        """Devuelve el quiz compilado o None si el contenido no existe."""
+        with self._lock:
+            cached = self._quizzes.get(quiz_id)
+        if cached and cached[1] > time.monotonic():
+            return cached[0]
+
+        item = profile_query('quiz_with_questions').filter(ContentItem.id == quiz_id).first()
+        if item is None:
+            return None
+        compiled = CompiledQuiz(item)
+        with self._lock:
+            self._quizzes[quiz_id] = (compiled, time.monotonic() + self.ttl)
+        return compiled
+
+    def invalidate(self, quiz_id):
+        with self._lock:
+            self._quizzes.pop(quiz_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._quizzes.clear()
+
+
+quiz_cache = QuizCache()
+
+
+# Se invalida al escribir y otra vez tras el commit: entre ambos momentos otra petición puede
+# haber vuelto a cachear la versión anterior, todavía confirmada en la base.
+@event.listens_for(ContentItem, 'after_update')
+@event.listens_for(ContentItem, 'after_delete')
+@event.listens_for(QuizQuestion, 'after_insert')
+@event.listens_for(QuizQuestion, 'after_update')
+@event.listens_for(QuizQuestion, 'after_delete')
+def _invalidate_cached_quiz(mapper, connection, target):
+    quiz_id = target.id if isinstance(target, ContentItem) else target.content_item_id
+    quiz_cache.invalidate(quiz_id)
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault('changed_quizzes', set()).add(quiz_id)
+
+
+@event.listens_for(db.session, 'after_commit')
+def _invalidate_committed_quizzes(session):
+    for quiz_id in session.info.pop('changed_quizzes', ()):
+        quiz_cache.invalidate(quiz_id)
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _forget_rolled_back_quizzes(session):
+    session.info.pop('changed_quizzes', None)
@@ -0,0 +1,189 @@
+import csv
+import io
+from itertools import groupby
+from math import ceil
+from sqlalchemy import func, select, and_
+from sqlalchemy.orm import contains_eager
+from models import db, Course, Module, ContentItem, CourseEnrollment, StudentResponse
+
+
+class ReportPage:
+    """Página de resultados de un reporte."""
+
+    def __init__(self, items, total, page, per_page):
+        self.items = items
+        self.total = total
+        self.page = page
+        self.per_page = per_page
+
+    @property
+    def pages(self):
+        return ceil(self.total / self.per_page) if self.total else 0
+
+    @property
+    def has_prev(self):
+        return self.page > 1
+
+    @property
+    def has_next(self):
+        return self.page < self.pages
+
+    def __iter__(self):
+        return iter(self.items)
+
+
+def completed_modules_report(instructor_id, start_date, end_date, page=1, per_page=20):
+    """Módulos de los cursos del instructor completados por sus estudiantes entre dos fechas.
+
+    Un estudiante completa un módulo cuando tiene una respuesta completada para cada uno de
+    sus contenidos; su fecha de finalización es la de la última respuesta. El reporte agrupa
+    por módulo (estudiantes que lo completaron y última fecha) y se resuelve en una sola
+    consulta: el total de filas para la paginación se obtiene con una función de ventana.
+    """
+    # Contenidos por módulo, solo de los cursos del instructor
+    module_totals = (
+        select(ContentItem.module_id, func.count(ContentItem.id).label('total_items'))
+        .join(Module, Module.id == ContentItem.module_id)
+        .join(Course, Course.id == Module.course_id)
+        .where(Course.instructor_id == instructor_id)
+        .group_by(ContentItem.module_id)
+        .subquery()
+    )
+
+    # Módulos completados por cada estudiante
+    student_modules = (
+        select(
+            Module.id.label('module_id'),
+            StudentResponse.student_id,
+            func.max(StudentResponse.completion_date).label('completion_date')
+        )
+        .join(Course, Course.id == Module.course_id)
+        .join(ContentItem, ContentItem.module_id == Module.id)
+        .join(StudentResponse, StudentResponse.content_item_id == ContentItem.id)
+        .join(module_totals, module_totals.c.module_id == Module.id)
+        .where(Course.instructor_id == instructor_id, StudentResponse.completed == True)
+        .group_by(Module.id, StudentResponse.student_id, module_totals.c.total_items)
+        .having(func.count(func.distinct(StudentResponse.content_item_id)) == module_totals.c.total_items)
+        .subquery()
+    )
+
+    # Un registro por módulo con la última fecha dentro del rango
+    completed_modules = (
+        select(
+            student_modules.c.module_id,
+            func.count(student_modules.c.student_id).label('students'),
+            func.max(student_modules.c.completion_date).label('completion_date')
+        )
+        .where(
+            student_modules.c.completion_date >= start_date,
+            student_modules.c.completion_date < end_date
+        )
+        .group_by(student_modules.c.module_id)
+        .subquery()
+    )
+
+    rows = db.session.execute(
+        select(
+            Module,
+            completed_modules.c.students,
+            completed_modules.c.completion_date,
+            func.count().over().label('total_rows')
+        )
+        .join(completed_modules, completed_modules.c.module_id == Module.id)
+        .join(Course, Course.id == Module.course_id)
+        .options(contains_eager(Module.course))
+        .order_by(completed_modules.c.completion_date.desc(), Module.id)
+        .limit(per_page)
+        .offset((page - 1) * per_page)
+    ).all()
+
+    items = [
+        {'module': module, 'students': students, 'completion_date': completion_date}
+        for module, students, completion_date, _ in rows
+    ]
+    total = rows[0].total_rows if rows else 0
+    return ReportPage(items, total, page, per_page)
+
+
+def completed_courses_report(instructor_id, start_date, end_date, batch_size=500):
+    """Cursos del instructor con inscripciones completadas entre dos fechas y sus filas por módulo.
+
+    Usa dos consultas: una para los cursos (sin duplicados) y otra para las respuestas
+    completadas de los estudiantes que terminaron cada curso en el rango. Las filas se leen
+    por lotes (`yield_per`) y se devuelven con un generador de tuplas `(curso, filas)`, de modo
+    que ni la plantilla ni la exportación CSV cargan todas las respuestas en memoria.
+    """
+    enrollment_in_range = (
+        CourseEnrollment.completed == True,
+        CourseEnrollment.completion_date >= start_date,
+        CourseEnrollment.completion_date < end_date
+    )
+
+    courses = db.session.execute(
+        select(Course)
+        .where(
+            Course.instructor_id == instructor_id,
+            select(CourseEnrollment.id)
+            .where(CourseEnrollment.course_id == Course.id, *enrollment_in_range)
+            .exists()
+        )
+        .order_by(Course.id)
+    ).scalars().all()
+    if not courses:
+        return
+
+    rows = db.session.execute(
+        select(
+            Module.course_id,
+            Module.title.label('module_title'),
+            StudentResponse.student_id,
+            StudentResponse.completion_date
+        )
+        .join(ContentItem, ContentItem.module_id == Module.id)
+        .join(StudentResponse, StudentResponse.content_item_id == ContentItem.id)
+        .join(CourseEnrollment, and_(
+            CourseEnrollment.course_id == Module.course_id,
+            CourseEnrollment.student_id == StudentResponse.student_id
+        ))
+        .where(
+            Module.course_id.in_([course.id for course in courses]),
+            StudentResponse.completed == True,
+            *enrollment_in_range
+        )
+        .order_by(Module.course_id, Module.order, StudentResponse.student_id, StudentResponse.completion_date)
+        .execution_options(yield_per=batch_size)
+    )
+
+    rows_by_course = groupby(rows, key=lambda row: row.course_id)
+    current_id, current_rows = next(rows_by_course, (None, iter(())))
+    for course in courses:
+        if course.id == current_id:
+            yield course, (row._asdict() for row in current_rows)
+            current_id, current_rows = next(rows_by_course, (None, iter(())))
+        else:
+            yield course, iter(())
+
+
+def completed_courses_csv(report):
+    """Convierte el reporte de cursos completados en líneas CSV (generador)."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush():
+        line = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+        return line
+
+    writer.writerow(['curso_id', 'curso', 'modulo', 'estudiante_id', 'fecha_finalizacion'])
+    yield flush()
+    for course, modules_data in report:
+        for row in modules_data:
+            writer.writerow([
+                course.id,
+                course.name,
+                row['module_title'],
+                row['student_id'],
+                row['completion_date'].isoformat() if row['completion_date'] else ''
+            ])
+            yield flush()
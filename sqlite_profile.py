@@ -0,0 +1,56 @@
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+# PRAGMAs que se aplican a cada conexión nueva (SQLITE_PRAGMAS los reemplaza)
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'WAL',       # los lectores no se bloquean mientras otro proceso escribe
+    'synchronous': 'NORMAL',     # seguro con WAL; solo se sincroniza en los checkpoints
+    'busy_timeout': 5000,        # ms que espera una escritura a que se libere el bloqueo
+    'foreign_keys': 'ON',        # aplica los ondelete="CASCADE" de models.py
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -16000,        # KiB por conexión (negativo = tamaño, no páginas)
+    'temp_store': 'MEMORY',
+}
+
+# Pool para servidores con varios hilos; solo se usa con bases en archivo
+DEFAULT_POOL_OPTIONS = {
+    'pool_size': 10,
+    'max_overflow': 10,
+    'pool_timeout': 10,
+}
+
+
+def is_file_database(uri):
+    url = make_url(uri)
+    return url.get_backend_name() == 'sqlite' and url.database not in (None, '', ':memory:')
+
+
+def configure_engine_options(app):
+    """Agrega las opciones del pool a SQLALCHEMY_ENGINE_OPTIONS. Se llama antes de `db.init_app`.
+
+    Las bases en memoria usan StaticPool (una sola conexión), que no admite estas opciones.
+    """
+    if app.config.get('SQLITE_PRAGMAS') is None:
+        app.config['SQLITE_PRAGMAS'] = DEFAULT_PRAGMAS
+    if app.config.get('SQLITE_POOL_OPTIONS') is None:
+        app.config['SQLITE_POOL_OPTIONS'] = DEFAULT_POOL_OPTIONS
+    if is_file_database(app.config['SQLALCHEMY_DATABASE_URI']):
+        # Copia: el diccionario puede ser un atributo compartido de la clase de configuración
+        options = dict(app.config['SQLITE_POOL_OPTIONS'])
+        options.update(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+
+
+def install_pragmas(engine, pragmas):
+    """Aplica `pragmas` a cada conexión que abra `engine` (si es SQLite)."""
+    if engine.dialect.name != 'sqlite' or not pragmas:
+        return
+
+    @event.listens_for(engine, 'connect')
+    def _apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f'PRAGMA {name}={value}')
+        finally:
+            cursor.close()
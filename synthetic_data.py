@@ -0,0 +1,215 @@
+import json
+import random
+from bisect import bisect
+from datetime import datetime, timedelta
+from itertools import accumulate
+
+import bcrypt
+from sqlalchemy import func
+
+from models import db, Role, User, Course, Module, ContentItem, QuizQuestion, CourseEnrollment, StudentResponse
+from catalog_search import rebuild_search_index
+
+# Tamaños predefinidos; `responses` es el objetivo aproximado de respuestas de estudiantes
+SCALES = {
+    '1k': {'responses': 1_000, 'students': 200, 'instructors': 5, 'courses': 20},
+    '100k': {'responses': 100_000, 'students': 10_000, 'instructors': 100, 'courses': 400},
+    '1m': {'responses': 1_000_000, 'students': 50_000, 'instructors': 400, 'courses': 2_000},
+}
+
+CONTENT_TYPES = ('text', 'video', 'file', 'quiz')
+CONTENT_TYPE_WEIGHTS = (40, 25, 10, 25)
+QUESTIONS_PER_QUIZ = 5
+FULL_COMPLETION_RATE = 0.15
+HISTORY_DAYS = 365
+WORDS = (
+    'python datos redes diseño gestión cálculo álgebra historia química física marketing '
+    'finanzas estadística programación seguridad nube análisis introducción avanzado práctico'
+).split()
+
+
+class _BulkWriter:
+    """Acumula filas por tabla y las inserta con `executemany` cada `batch_size` filas."""
+
+    def __init__(self, batch_size):
+        self.batch_size = batch_size
+        self.rows = {}
+        self.counts = {}
+
+    def add(self, table, row):
+        rows = self.rows.setdefault(table, [])
+        rows.append(row)
+        if len(rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        # Las tablas se registran en orden de dependencia: los padres se insertan antes
+        for table, rows in self.rows.items():
+            if rows:
+                db.session.execute(table.insert(), rows)
+                self.counts[table.name] = self.counts.get(table.name, 0) + len(rows)
+                rows.clear()
+
+
+def _zipf_weights(n, exponent):
+    """Pesos acumulados de una distribución de Zipf sobre `n` elementos (el primero es el más popular)."""
+    return list(accumulate(1 / (rank ** exponent) for rank in range(1, n + 1)))
+
+
+def _pick(rng, items, cum_weights):
+    return items[bisect(cum_weights, rng.random() * cum_weights[-1])]
+
+
+def _next_id(model):
+    return (db.session.query(func.max(model.id)).scalar() or 0) + 1
+
+
+def _sentence(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def generate_dataset(scale='1k', seed=42, password='password', batch_size=5000, on_progress=None):
+    """Genera un conjunto de datos sintético a escala de producción y devuelve las filas por tabla.
+
+    La popularidad de los cursos, la actividad de los estudiantes y los cursos por instructor
+    siguen distribuciones de Zipf; cada inscripción completa los contenidos en orden hasta una
+    fracción aleatoria (algunas el curso entero). Las filas se insertan con `executemany` sin
+    pasar por los eventos del ORM, así que los contadores (`total_content`, `completed_items`,
+    `progress`) se calculan aquí y el índice de búsqueda se reconstruye al final. Los datos se
+    agregan a los existentes.
+    """
+    params = SCALES[scale]
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    writer = _BulkWriter(batch_size)
+    tables = [model.__table__ for model in (
+        User, Course, Module, ContentItem, QuizQuestion, CourseEnrollment, StudentResponse
+    )]
+    for table in tables:
+        writer.rows[table] = []
+
+    for name in ('admin', 'instructor', 'student'):
+        if not Role.query.filter_by(name=name).first():
+            db.session.add(Role(name=name))
+    db.session.flush()
+    roles = dict(db.session.query(Role.name, Role.id))
+    # Todos los usuarios comparten el hash: calcularlo por usuario dominaría el tiempo de generación
+    password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+
+    ids = {model: _next_id(model) for model in (User, Course, Module, ContentItem, QuizQuestion, CourseEnrollment,
+                                                StudentResponse)}
+
+    def new_id(model):
+        ids[model] += 1
+        return ids[model] - 1
+
+    def add_user(role):
+        user_id = new_id(User)
+        writer.add(User.__table__, {
+            'id': user_id, 'username': f'{role}{user_id}', 'email': f'{role}{user_id}@example.com',
+            'password': password_hash, 'role_id': roles[role],
+        })
+        return user_id
+
+    instructors = [add_user('instructor') for _ in range(params['instructors'])]
+    students = [add_user('student') for _ in range(params['students'])]
+
+    # Cursos, módulos y contenidos; se guardan los ids de contenido (en orden) y sus quizzes
+    instructor_weights = _zipf_weights(len(instructors), 0.8)
+    course_items = {}
+    quiz_items = set()
+    for _ in range(params['courses']):
+        course_id = new_id(Course)
+        items_per_module = [rng.randint(2, 6) for _ in range(rng.randint(3, 8))]
+        writer.add(Course.__table__, {
+            'id': course_id, 'name': _sentence(rng, 3), 'description': _sentence(rng, 25),
+            'instructor_id': _pick(rng, instructors, instructor_weights), 'total_content': sum(items_per_module),
+        })
+        items = []
+        for module_order, item_count in enumerate(items_per_module, start=1):
+            module_id = new_id(Module)
+            writer.add(Module.__table__, {
+                'id': module_id, 'title': _sentence(rng, 3), 'description': _sentence(rng, 12),
+                'order': module_order, 'course_id': course_id, 'content_version': 0,
+            })
+            for item_order in range(1, item_count + 1):
+                item_id = new_id(ContentItem)
+                item_type = rng.choices(CONTENT_TYPES, CONTENT_TYPE_WEIGHTS)[0]
+                writer.add(ContentItem.__table__, {
+                    'id': item_id, 'title': _sentence(rng, 4), 'type': item_type, 'order': item_order,
+                    'module_id': module_id,
+                    'content': {
+                        'text': _sentence(rng, 80),
+                        'video': f'https://www.youtube.com/watch?v=synthetic{item_id}',
+                    }.get(item_type),
+                    'file_path': f'synthetic/{item_id}.pdf' if item_type == 'file' else None,
+                })
+                if item_type == 'quiz':
+                    quiz_items.add(item_id)
+                    for _ in range(QUESTIONS_PER_QUIZ):
+                        options = [rng.choice(WORDS) for _ in range(4)]
+                        writer.add(QuizQuestion.__table__, {
+                            'id': new_id(QuizQuestion), 'question_text': _sentence(rng, 10) + '?',
+                            'content_item_id': item_id, 'question_type': 'multiple_choice',
+                            'correct_answer': options[0], 'options': json.dumps(options),
+                        })
+                items.append(item_id)
+        course_items[course_id] = items
+    writer.flush()
+
+    # Inscripciones y respuestas hasta alcanzar el objetivo de respuestas
+    courses = list(course_items)
+    rng.shuffle(courses)
+    course_weights = _zipf_weights(len(courses), 1.1)
+    student_weights = _zipf_weights(len(students), 0.8)
+    enrolled = set()
+    responses = 0
+    attempts = 0
+    max_attempts = params['responses'] * 10
+    while responses < params['responses'] and attempts < max_attempts:
+        attempts += 1
+        student_id = _pick(rng, students, student_weights)
+        course_id = _pick(rng, courses, course_weights)
+        if (student_id, course_id) in enrolled:
+            continue
+        enrolled.add((student_id, course_id))
+
+        items = course_items[course_id]
+        if rng.random() < FULL_COMPLETION_RATE:
+            completed = len(items)
+        else:
+            completed = int(len(items) * rng.betavariate(0.8, 1.5))
+        enrolled_at = now - timedelta(days=rng.uniform(0, HISTORY_DAYS))
+        completed_at = enrolled_at
+        for item_id in items[:completed]:
+            completed_at = min(completed_at + timedelta(hours=rng.expovariate(1 / 24)), now)
+            if item_id in quiz_items and rng.random() < 0.3:
+                # Intento reprobado antes del aprobado
+                writer.add(StudentResponse.__table__, {
+                    'id': new_id(StudentResponse), 'student_id': student_id, 'content_item_id': item_id,
+                    'response': '{}', 'score': rng.choice((2.0, 4.0, 6.0)), 'completed': True,
+                    'completion_date': completed_at,
+                })
+                responses += 1
+            writer.add(StudentResponse.__table__, {
+                'id': new_id(StudentResponse), 'student_id': student_id, 'content_item_id': item_id,
+                'response': '{}' if item_id in quiz_items else None,
+                'score': rng.choice((8.0, 10.0)) if item_id in quiz_items else None,
+                'completed': True, 'completion_date': completed_at,
+            })
+            responses += 1
+
+        finished = completed == len(items) and len(items) > 0
+        writer.add(CourseEnrollment.__table__, {
+            'id': new_id(CourseEnrollment), 'student_id': student_id, 'course_id': course_id,
+            'enrollment_date': enrolled_at, 'completed': finished,
+            'progress': completed / len(items) * 100 if items else 0,
+            'completion_date': completed_at if finished else None, 'completed_items': completed,
+        })
+        if on_progress and len(enrolled) % 10000 == 0:
+            on_progress(responses, params['responses'])
+    writer.flush()
+
+    rebuild_search_index(db.session.connection())
+    db.session.commit()
+    return writer.counts
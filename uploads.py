@@ -0,0 +1,176 @@
+import hashlib
+import json
+import os
+import secrets
+import time
+
+from werkzeug.utils import secure_filename
+
+# Tamaño de lectura al copiar el cuerpo de la petición al disco
+COPY_BUFFER_SIZE = 64 * 1024
+
+
+class UploadError(Exception):
+    """Error de validación de una subida por partes."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+class ChunkedUploadStore:
+    """Subidas por partes que al completarse se guardan en el almacén de blobs.
+
+    Cada subida tiene un archivo `.part` con los bytes recibidos y un `.json` con sus
+    metadatos en `partial_folder` (fuera de la carpeta pública). El desplazamiento actual es
+    el tamaño del `.part`, por lo que una transferencia interrumpida se retoma desde ahí.
+    Las subidas abandonadas se eliminan con `expire` (comando `gc-uploads`).
+    """
+
+    def __init__(self, blob_store, partial_folder=None, chunk_size=None):
+        self.blob_store = blob_store
+        self.partial_folder = partial_folder
+        self.chunk_size = chunk_size
+        if partial_folder is not None:
+            os.makedirs(self.partial_folder, exist_ok=True)
+
+    def init_app(self, app):
+        """Guarda las subidas en curso en `instance/partial_uploads` con `UPLOAD_CHUNK_SIZE`."""
+        self.partial_folder = os.path.join(app.instance_path, 'partial_uploads')
+        self.chunk_size = app.config['UPLOAD_CHUNK_SIZE']
+        os.makedirs(self.partial_folder, exist_ok=True)
+
+    def _paths(self, upload_id):
+        if not upload_id.isalnum():
+            raise UploadError('Identificador de subida inválido.', 404)
+        base = os.path.join(self.partial_folder, upload_id)
+        return base + '.json', base + '.part'
+
+    def create(self, user_id, module_id, filename, size, sha256=None):
+        """Registra una nueva subida y devuelve sus metadatos.
+
+        `sha256` (opcional) es el checksum del archivo completo que se verifica al finalizar.
+        """
+        filename = secure_filename(filename or '')
+        if not filename:
+            raise UploadError('Nombre de archivo inválido.')
+        if size < 0:
+            raise UploadError('Tamaño de archivo inválido.')
+        if sha256 is not None and (len(sha256) != 64 or any(c not in '0123456789abcdefABCDEF' for c in sha256)):
+            raise UploadError('El checksum debe ser un SHA-256 en hexadecimal.')
+
+        upload_id = secrets.token_hex(16)
+        meta = {
+            'upload_id': upload_id,
+            'user_id': user_id,
+            'module_id': module_id,
+            'filename': filename,
+            'size': size,
+            'sha256': sha256.lower() if sha256 else None,
+        }
+        meta_path, part_path = self._paths(upload_id)
+        open(part_path, 'wb').close()
+        with open(meta_path, 'w') as meta_file:
+            json.dump(meta, meta_file)
+        return self.status(upload_id)
+
+    def get(self, upload_id):
+        meta_path, _ = self._paths(upload_id)
+        try:
+            with open(meta_path) as meta_file:
+                return json.load(meta_file)
+        except FileNotFoundError:
+            raise UploadError('La subida no existe.', 404)
+
+    def offset(self, upload_id):
+        _, part_path = self._paths(upload_id)
+        return os.path.getsize(part_path)
+
+    def status(self, upload_id):
+        meta = self.get(upload_id)
+        return dict(meta, offset=self.offset(upload_id), chunk_size=self.chunk_size)
+
+    def write_chunk(self, upload_id, offset, stream, length, chunk_sha256=None):
+        """Escribe una parte en el desplazamiento indicado copiando el stream por bloques.
+
+        Si se indica `chunk_sha256`, la parte se verifica mientras se escribe y se descarta
+        si no coincide.
+        """
+        meta = self.get(upload_id)
+        current = self.offset(upload_id)
+        if offset != current:
+            raise UploadError(f'Desplazamiento incorrecto: se esperaba {current}.', 409)
+        if length is None or length <= 0 or length > self.chunk_size:
+            raise UploadError(f'Cada parte debe tener entre 1 y {self.chunk_size} bytes.')
+        if current + length > meta['size']:
+            raise UploadError('La parte excede el tamaño declarado del archivo.')
+
+        _, part_path = self._paths(upload_id)
+        digest = hashlib.sha256()
+        written = 0
+        with open(part_path, 'ab') as part_file:
+            while written < length:
+                data = stream.read(min(COPY_BUFFER_SIZE, length - written))
+                if not data:
+                    break
+                part_file.write(data)
+                digest.update(data)
+                written += len(data)
+            # Parte incompleta o corrupta: se descarta para que el cliente la reenvíe
+            if written != length:
+                part_file.truncate(current)
+                raise UploadError('La parte llegó incompleta.')
+            if chunk_sha256 and digest.hexdigest() != chunk_sha256.lower():
+                part_file.truncate(current)
+                raise UploadError('El checksum de la parte no coincide.', 422)
+        return current + written
+
+    def complete(self, upload_id):
+        """Verifica tamaño y checksum y mueve el archivo al almacén de blobs.
+
+        Devuelve la ruta del blob (relativa a `UPLOAD_FOLDER`).
+        """
+        meta = self.get(upload_id)
+        meta_path, part_path = self._paths(upload_id)
+        if self.offset(upload_id) != meta['size']:
+            raise UploadError('La subida aún no está completa.', 409)
+
+        # El mismo recorrido sirve para verificar el checksum y direccionar el blob
+        digest = hashlib.sha256()
+        with open(part_path, 'rb') as part_file:
+            for block in iter(lambda: part_file.read(COPY_BUFFER_SIZE), b''):
+                digest.update(block)
+        if meta['sha256'] and digest.hexdigest() != meta['sha256']:
+            self.discard(upload_id)
+            raise UploadError('El checksum no coincide; la subida fue descartada.', 422)
+
+        file_path = self.blob_store.put_file(part_path, meta['filename'], digest.hexdigest())
+        os.remove(meta_path)
+        return file_path
+
+    def discard(self, upload_id):
+        for path in self._paths(upload_id):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def expire(self, max_age):
+        """Elimina las subidas sin actividad en `max_age` segundos. Devuelve sus identificadores.
+
+        La actividad es la última modificación del `.part` o del `.json`; también se eliminan los
+        archivos que quedaron sin su pareja.
+        """
+        cutoff = time.time() - max_age
+        last_activity = {}
+        for name in os.listdir(self.partial_folder):
+            upload_id, ext = os.path.splitext(name)
+            if ext not in ('.json', '.part') or not upload_id.isalnum():
+                continue
+            try:
+                modified = os.path.getmtime(os.path.join(self.partial_folder, name))
+            except FileNotFoundError:
+                continue
+            last_activity[upload_id] = max(modified, last_activity.get(upload_id, 0))
+        expired = sorted(upload_id for upload_id, modified in last_activity.items() if modified < cutoff)
+        for upload_id in expired:
+            self.discard(upload_id)
+        return expired
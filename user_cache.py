@@ -0,0 +1,72 @@
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.orm import joinedload
+
+from models import db, Role, User
+
+_roles_lock = threading.Lock()
+_role_names = {}
+
+
+def get_role_name(role_id):
+    """Nombre del rol desde una caché del proceso (la tabla `roles` no cambia en ejecución)."""
+    name = _role_names.get(role_id)
+    if name is None:
+        with _roles_lock:
+            _role_names.update(dict(db.session.query(Role.id, Role.name).all()))
+        name = _role_names.get(role_id)
+    return name
+
+
+def clear_role_cache():
+    with _roles_lock:
+        _role_names.clear()
+
+
+class UserCache:
+    """Caché con TTL del usuario de la sesión, para no consultarlo en cada petición.
+
+    Guarda copias desprendidas (detached) de los usuarios con su rol ya cargado y las vuelve
+    a asociar a la sesión de la petición con `merge(load=False)`, sin ejecutar SQL. Con
+    `ttl=0` la caché está desactivada y cada petición hace una sola consulta (usuario + rol).
+    """
+
+    def __init__(self, ttl=0):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._users = {}
+
+    def load(self, user_id):
+        if self.ttl > 0:
+            with self._lock:
+                cached = self._users.get(user_id)
+            if cached and cached[1] > time.monotonic():
+                return db.session.merge(cached[0], load=False)
+
+        user = User.query.options(joinedload(User.role)).filter_by(id=user_id).first()
+        if user is None or self.ttl <= 0:
+            return user
+
+        db.session.expunge(user)
+        with self._lock:
+            self._users[user_id] = (user, time.monotonic() + self.ttl)
+        return db.session.merge(user, load=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._users.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._users.clear()
+
+
+user_cache = UserCache()
+
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def _invalidate_cached_user(mapper, connection, target):
+    user_cache.invalidate(target.id)
@@ -0,0 +1,257 @@
+import csv
+import io
+import json
+import multiprocessing
+import os
+import re
+import secrets
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import islice
+
+import bcrypt
+from sqlalchemy import select, func
+from sqlalchemy.exc import IntegrityError
+
+from models import db, Role, User
+
+REQUIRED_COLUMNS = ('username', 'email', 'password')
+DEFAULT_ROLE = 'student'
+EMAIL_PATTERN = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+MAX_FIELD_LENGTH = 150
+
+
+def _hash_password(args):
+    """Se ejecuta en los procesos del pool: mismo formato que `Bcrypt.generate_password_hash`."""
+    password, rounds = args
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+
+
+class ImportReport:
+    """Resultado de una importación: filas leídas, usuarios creados y errores por fila."""
+
+    def __init__(self, dry_run, status='done'):
+        self.dry_run = dry_run
+        self.status = status  # 'running', 'done' o 'failed' en las importaciones en segundo plano
+        self.rows = 0
+        self.created = 0
+        self.valid = 0
+        self.errors = []
+
+    def to_dict(self):
+        return {'dry_run': self.dry_run, 'status': self.status, 'rows': self.rows, 'created': self.created,
+                'valid': self.valid, 'errors': self.errors}
+
+    @classmethod
+    def from_dict(cls, data):
+        report = cls(data['dry_run'], data['status'])
+        report.rows, report.created, report.valid, report.errors = (
+            data['rows'], data['created'], data['valid'], data['errors']
+        )
+        return report
+
+    def add_error(self, line, username, message):
+        self.errors.append({'line': line, 'username': username, 'error': message})
+
+    def errors_csv(self):
+        """Reporte de errores en CSV (generador de líneas)."""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+
+        def flush():
+            line = buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+            return line
+
+        writer.writerow(['linea', 'usuario', 'error'])
+        yield flush()
+        for error in self.errors:
+            writer.writerow([error['line'], error['username'], error['error']])
+            yield flush()
+
+
+def _validate(line, row, roles, seen_usernames, seen_emails, report):
+    """Valida una fila sin consultar la base; devuelve el registro a insertar o None."""
+    username = (row.get('username') or '').strip()
+    email = (row.get('email') or '').strip().lower()
+    password = row.get('password') or ''
+    role_name = (row.get('role') or DEFAULT_ROLE).strip().lower()
+
+    if not username or not email or not password:
+        report.add_error(line, username, 'Faltan usuario, correo o contraseña.')
+    elif len(username) > MAX_FIELD_LENGTH or len(email) > MAX_FIELD_LENGTH:
+        report.add_error(line, username, f'Usuario y correo admiten hasta {MAX_FIELD_LENGTH} caracteres.')
+    elif not EMAIL_PATTERN.match(email):
+        report.add_error(line, username, f'Correo inválido: {email}')
+    elif role_name not in roles:
+        report.add_error(line, username, f'Rol desconocido: {role_name}')
+    elif username in seen_usernames:
+        report.add_error(line, username, 'Usuario repetido en el archivo.')
+    elif email in seen_emails:
+        report.add_error(line, username, f'Correo repetido en el archivo: {email}')
+    else:
+        seen_usernames.add(username)
+        seen_emails.add(email)
+        return {'line': line, 'username': username, 'email': email, 'password': password, 'role_id': roles[role_name]}
+    return None
+
+
+def _drop_existing(records, report):
+    """Descarta los registros cuyo usuario o correo ya existen (una consulta por columna y lote).
+
+    Los correos importados están en minúsculas; los guardados se comparan también en minúsculas.
+    """
+    if not records:
+        return records
+    existing_usernames = set(db.session.execute(
+        select(User.username).where(User.username.in_([record['username'] for record in records]))
+    ).scalars())
+    existing_emails = set(db.session.execute(
+        select(func.lower(User.email)).where(func.lower(User.email).in_([record['email'] for record in records]))
+    ).scalars())
+
+    kept = []
+    for record in records:
+        if record['username'] in existing_usernames:
+            report.add_error(record['line'], record['username'], 'El usuario ya existe.')
+        elif record['email'] in existing_emails:
+            report.add_error(record['line'], record['username'], f"El correo ya existe: {record['email']}")
+        else:
+            kept.append(record)
+    return kept
+
+
+def import_users(lines, dry_run=False, batch_size=500, processes=None, rounds=12):
+    """Importa usuarios desde un CSV (`username,email,password[,role]`) leído como iterable de líneas.
+
+    El archivo se procesa por lotes de `batch_size` filas: se valida cada fila, se descartan en
+    una consulta los usuarios y correos existentes, los hashes se calculan en un pool de
+    `processes` procesos (iniciados con 'spawn': el proceso que importa puede tener otros hilos)
+    y el lote se inserta con un solo `executemany` en su propia
+    transacción. Con `dry_run` solo se valida (no se calculan hashes ni se escribe nada).
+    """
+    report = ImportReport(dry_run)
+    reader = csv.DictReader(lines)
+    missing = [column for column in REQUIRED_COLUMNS if column not in (reader.fieldnames or [])]
+    if missing:
+        report.add_error(1, '', f"Faltan columnas en el encabezado: {', '.join(missing)}")
+        return report
+
+    roles = {name: role_id for role_id, name in db.session.query(Role.id, Role.name)}
+    seen_usernames, seen_emails = set(), set()
+    rows = enumerate(reader, start=2)  # la línea 1 es el encabezado
+
+    processes = processes or os.cpu_count() or 1
+    executor = None if dry_run else ProcessPoolExecutor(
+        max_workers=processes, mp_context=multiprocessing.get_context('spawn')
+    )
+    try:
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                break
+            report.rows += len(batch)
+            records = [
+                record for record in (
+                    _validate(line, row, roles, seen_usernames, seen_emails, report) for line, row in batch
+                )
+                if record is not None
+            ]
+            records = _drop_existing(records, report)
+            report.valid += len(records)
+            if dry_run or not records:
+                continue
+
+            hashes = executor.map(
+                _hash_password, [(record['password'], rounds) for record in records],
+                chunksize=max(1, len(records) // (processes * 4))
+            )
+            values = [
+                {'username': record['username'], 'email': record['email'], 'password': password_hash,
+                 'role_id': record['role_id']}
+                for record, password_hash in zip(records, hashes)
+            ]
+            try:
+                db.session.execute(User.__table__.insert(), values)
+                db.session.commit()
+                report.created += len(values)
+            except IntegrityError:
+                # Otro proceso creó alguno de estos usuarios mientras tanto: el lote no se inserta
+                db.session.rollback()
+                report.valid -= len(records)
+                for record in records:
+                    report.add_error(record['line'], record['username'], 'Conflicto al insertar el lote; reintente.')
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    report.errors.sort(key=lambda error: error['line'])
+    return report
+
+
+class BackgroundImports:
+    """Ejecuta las importaciones de la interfaz web en un hilo aparte, una a la vez.
+
+    El CSV subido se guarda en `instance/imports/<id>.csv` y el reporte en `<id>.json`, que
+    cualquier proceso de la aplicación puede leer. Como en `BackgroundDeletes`, los trabajos
+    pendientes viven en la memoria del proceso: si termina antes, la importación queda 'running'.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.folder = None
+        self._executor = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.folder = os.path.join(app.instance_path, 'imports')
+        os.makedirs(self.folder, exist_ok=True)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='user-import')
+
+    def _path(self, job_id, ext):
+        return os.path.join(self.folder, f'{job_id}.{ext}')
+
+    def _save(self, job_id, report):
+        tmp_path = self._path(job_id, 'json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as report_file:
+            json.dump(report.to_dict(), report_file)
+        os.replace(tmp_path, self._path(job_id, 'json'))
+
+    def submit(self, stream, **options):
+        """Guarda el CSV de `stream` y lo importa en el hilo con `import_users(**options)`.
+
+        Devuelve el identificador del trabajo.
+        """
+        job_id = secrets.token_hex(16)
+        with open(self._path(job_id, 'csv'), 'wb') as csv_file:
+            for block in iter(lambda: stream.read(64 * 1024), b''):
+                csv_file.write(block)
+        self._save(job_id, ImportReport(dry_run=False, status='running'))
+
+        def run():
+            with self.app.app_context():
+                try:
+                    with open(self._path(job_id, 'csv'), encoding='utf-8-sig', newline='') as lines:
+                        report = import_users(lines, **options)
+                except Exception:
+                    db.session.rollback()
+                    self.app.logger.exception('Error en la importación de usuarios %s', job_id)
+                    report = ImportReport(dry_run=False, status='failed')
+                finally:
+                    db.session.remove()
+                    os.remove(self._path(job_id, 'csv'))
+                self._save(job_id, report)
+        self._executor.submit(run)
+        return job_id
+
+    def report(self, job_id):
+        """Reporte del trabajo (con `status` 'running' mientras se ejecuta) o None si no existe."""
+        if not re.fullmatch(r'[0-9a-f]{32}', job_id or ''):
+            return None
+        try:
+            with open(self._path(job_id, 'json'), encoding='utf-8') as report_file:
+                return ImportReport.from_dict(json.load(report_file))
+        except FileNotFoundError:
+            return None